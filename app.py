@@ -1,33 +1,40 @@
-import signal
 import time
+APP_STARTED_AT = time.perf_counter()  # diambil sebelum import lain untuk mengukur waktu cold start
+
+import asyncio
+import socket
+import uuid
 import gradio as gr
 import os
-import subprocess
-from threading import Thread
-import queue
-import shutil # <<< BARU: Import shutil untuk membuat file zip
-
-active_subprocess = None
+from urllib.parse import quote
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
 
 # Menggunakan import asli dari struktur proyek Anda
-from src.coding_agent.main import EngineeringFlow
+from src.coding_agent import settings
+from src.coding_agent.archive import archive_cache
+from src.coding_agent.checkpoint import FlowCheckpoint
+from src.coding_agent.environments import project_runner
+from src.coding_agent.executor import BacklogFullError, FlowJob, flow_executor
+from src.coding_agent.flow_log import flow_log
+from src.coding_agent.metrics import Span, metrics_registry, summary_table
+from src.coding_agent.process_runs import process_runs
+from src.coding_agent.project_index import project_index
 from src.coding_agent.shared_queue import (
     TaskInfo,
-    shared_task_output_queue,
+    event_bus,
     add_to_queue,
 )
+from src.coding_agent.streaming import DeltaCoalescer
+from src.coding_agent.warmup import start_warm_up, startup_timer
 
-def enqueue_output(pipe, q):
-    """Membaca output dari pipe (stdout) baris per baris dan memasukkannya ke dalam queue."""
-    try:
-        for line in iter(pipe.readline, ''):
-            q.put(line)
-    finally:
-        pipe.close()
+# crewai, litellm dan kawan-kawan baru di-import saat flow pertama berjalan (atau saat warm-up),
+# sehingga server bisa melayani halaman secepat mungkin.
+startup_timer.started_at = APP_STARTED_AT
 
 # --- Fungsi untuk Interaksi dengan UI ---
 
-def run_and_stream(module_name: str, requirements: str):
+async def run_and_stream(module_name: str, requirements: str):
     # ... (fungsi ini tidak berubah)
     print("🚀 Background process started")
     
@@ -44,163 +51,233 @@ def run_and_stream(module_name: str, requirements: str):
         yield [{"role": "assistant", "content": f"### ❌ Gagal: Nama modul '{clean_module_name}' sudah ada. Silakan gunakan nama lain."}]
         return
 
-    thread = Thread(target=EngineeringFlow(clean_module_name, requirements).kickoff)
-    thread.start()
+    run_id = str(uuid.uuid4())
+    # Buka channel khusus run ini sebelum flow berjalan agar tidak ada event yang terlewat
+    channel = event_bus.open(run_id)
+    try:
+        ticket = flow_executor.submit(
+            FlowJob(run_id=run_id, module_name=clean_module_name, business_requirement=requirements)
+        )
+    except BacklogFullError:
+        event_bus.close(run_id)
+        gr.Warning("Antrian penuh, silakan coba beberapa saat lagi.")
+        yield [{"role": "assistant", "content": f"### ❌ Antrian penuh: sudah ada {flow_executor.max_backlog} permintaan yang menunggu. Silakan coba lagi nanti."}]
+        return
 
     print("🚀 Memonitor antrian...")
     messages = [{"role": "assistant", "content": "Memulai engineering crew... 🚀"}]
     yield messages
-    
-    while thread.is_alive() or not shared_task_output_queue.empty():
-        if not shared_task_output_queue.empty():
-            task = shared_task_output_queue.get()
-            print(f"🧲 {task.name} - {task.output}")
 
-            if messages[-1]['role'] != 'assistant':
-                    messages.append({"role": "assistant", "content": ""})
-            
-            stream_content = f"**{task.name}**: {task.output}\n\n"
-            for char in stream_content:
-                time.sleep(0.005)
-                messages[-1]["content"] += char
+    # Selama semua slot terpakai, tampilkan posisi antrian dan perkiraan waktu tunggu
+    last_position = None
+    # Handler ini async generator: menunggu tidak memakai thread, jadi ratusan run bisa dipantau sekaligus
+    while not ticket.started.is_set():
+        await asyncio.sleep(settings.EVENT_POLL_TIMEOUT)
+        if ticket.started.is_set():
+            break
+        position = ticket.position()
+        if position and position != last_position:
+            last_position = position
+            status = f"⏳ Menunggu giliran: posisi **{position}** dalam antrian, perkiraan mulai dalam ~{int(ticket.eta())} detik."
+            if len(messages) == 1:
+                messages.append({"role": "assistant", "content": status})
+            else:
+                messages[-1]["content"] = status
+            yield messages
+    if last_position is not None:
+        messages[-1]["content"] = f"▶️ Mendapat slot setelah menunggu {int(ticket.queue_wait)} detik."
+        messages.append({"role": "assistant", "content": ""})
+        yield messages
+
+    # Teks dikumpulkan lalu dikirim per potongan (delta) sesuai batas waktu/ukuran,
+    # bukan per karakter, agar jumlah yield ke UI tetap kecil. Jika token sudah di-stream
+    # langsung dari LLM, efek mengetik tidak diperlukan lagi.
+    coalescer = DeltaCoalescer(
+        settings.STREAM_FLUSH_INTERVAL,
+        settings.STREAM_FLUSH_BYTES,
+        settings.CHAT_TYPING_EFFECT and not settings.STREAM_TOKENS,
+    )
+    output_message = messages[-1]  # pesan utama tempat output final tiap langkah ditulis
+    live_messages = {}  # nama task -> pesan berisi token yang sedang di-stream
+    spans = []
+    try:
+        while not ticket.done.is_set() or not channel.empty() or coalescer.pending:
+            timeout = coalescer.wait_time() if coalescer.pending else settings.EVENT_POLL_TIMEOUT
+            task = await channel.get_async(timeout=timeout)
+            changed = False
+            if task is not None and task.type == "partial":
+                live = live_messages.get(task.name)
+                if live is None:
+                    # Keluarkan dulu teks yang tertunda agar urutan output tetap benar
+                    output_message["content"] += coalescer.flush(force=True)
+                    live = live_messages[task.name] = {"role": "assistant", "content": f"✍️ _{task.name} sedang menulis..._\n\n"}
+                    messages.append(live)
+                live["content"] += task.output
+                changed = True
+            elif task is not None and task.type == "span":
+                # Span hanya dikumpulkan untuk tabel ringkasan, tidak ditampilkan di chat
+                spans.append(Span.model_validate_json(task.output))
+                # Langkah yang selesai menulis artefak ke output/<modul>, tandai di index
+                project_index.invalidate(clean_module_name)
+                # Langkah selesai: pesan live digantikan oleh output finalnya
+                live = live_messages.pop(task.name, None)
+                if live is not None:
+                    messages.remove(live)
+                    changed = True
+            elif task is not None:
+                flow_log.debug("event", run_id=run_id, name=task.name, output=task.output)
+                coalescer.push(f"**{task.name}**: {task.output}\n\n")
+
+            delta = coalescer.flush()
+            if delta:
+                output_message["content"] += delta
+                changed = True
+            if changed:
                 yield messages
-        else:
-            time.sleep(0.2)
-    
-    thread.join()
+    finally:
+        event_bus.close(run_id)
+
+    if spans:
+        messages.append({"role": "assistant", "content": f"#### 📊 Ringkasan Waktu & Token\n\n{summary_table(spans)}"})
+    if ticket.error:
+        messages.append({"role": "assistant", "content": "# ❌ Proses gagal, lihat log server untuk detailnya."})
+        yield messages
+        return
+    # Flow bisa berakhir tanpa error sebelum tes dijalankan, mis. batas iterasi review tercapai
+    if not await asyncio.to_thread(FlowCheckpoint(clean_module_name).finished):
+        messages.append({"role": "assistant", "content": "# ⚠️ Proses berhenti sebelum selesai (mis. batas iterasi review tercapai), lihat log server untuk detailnya."})
+        yield messages
+        return
     messages.append({"role":"assistant", "content" : "# ✅ Semua Selesai!"})
     yield(messages)
 
 
-def update_project_explorer(root_dir: str = "output"):
-    # ... (fungsi ini tidak berubah)
-    if not os.path.exists(root_dir) or not os.listdir(root_dir):
-        tree_md = "Direktori 'output' kosong. Jalankan proses untuk membuat proyek baru."
-        projects = []
+def server_status():
+    """Ringkasan utilisasi slot flow dan waktu startup server untuk panel status."""
+    return {"executor": flow_executor.metrics(), "startup": startup_timer.report()}
+
+
+def update_project_explorer(query: str = "", page: int = 1, selected: str = None):
+    """Menampilkan satu halaman daftar proyek (bisa dicari) dari index yang di-cache, bukan os.walk penuh."""
+    result = project_index.page(query, page, settings.PROJECT_PAGE_SIZE)
+    if selected not in result.names:
+        selected = None
+    if result.total == 0:
+        page_info = "Tidak ada proyek yang cocok." if query else "Direktori 'output' kosong. Jalankan proses untuk membuat proyek baru."
     else:
-        tree = []
-        for root, dirs, files in os.walk(root_dir):
-            level = root.replace(root_dir, '').count(os.sep)
-            indent = ' ' * 4 * level
-            tree.append(f"{indent}📂 {os.path.basename(root)}/")
-            sub_indent = ' ' * 4 * (level + 1)
-            for f in files:
-                tree.append(f"{sub_indent}📄 {f}")
-        tree_md = "```\n" + '\n'.join(tree) + "\n```"
-        projects = [d for d in os.listdir(root_dir) if os.path.isdir(os.path.join(root_dir, d))]
-    project_dropdown_update = gr.Dropdown(choices=projects, label="Pilih Proyek untuk Diunduh")
-    return tree_md, project_dropdown_update
-
-
-def run_selected_project(project_name: str):
-    # ... (fungsi ini tidak berubah)
-    global active_subprocess
+        page_info = f"Halaman {result.page} dari {result.pages} ({result.total} proyek)"
+    project_dropdown_update = gr.Dropdown(choices=result.names, value=selected, label="Pilih Proyek untuk Diunduh")
+    return show_project_tree(selected), project_dropdown_update, page_info, result.page
+
+
+def show_project_tree(project_name: str):
+    """Hanya proyek yang dipilih yang dirender pohon filenya."""
+    if not project_name:
+        return "Pilih proyek untuk melihat isinya."
+    return project_index.tree(project_name) or f"Proyek '{project_name}' tidak ditemukan."
+
+
+def _free_port() -> int:
+    """Meminta port kosong dari OS untuk aplikasi hasil generate."""
+    with socket.socket() as s:
+        s.bind(("", 0))
+        return s.getsockname()[1]
+
+
+def run_selected_project(project_name: str, run_id: str):
+    """Menjalankan app.py milik proyek terpilih dan menampilkan tail log-nya secara berkala."""
     if not project_name:
         gr.Warning("Silakan pilih proyek terlebih dahulu!")
+        yield gr.skip(), gr.Button(interactive=True), gr.Button(visible=False), gr.Button(visible=False), run_id, None
         return
-    
-    # Hentikan proses lama jika ada yang masih berjalan
-    if active_subprocess:
-        active_subprocess.terminate()
-        active_subprocess = None
+
+    # Hanya run milik sesi ini yang dihentikan; run pengguna lain tetap berjalan
+    process_runs.stop(run_id)
 
     project_path = os.path.join("output", project_name)
     main_file_path = os.path.join(project_path, "app.py")
 
     if not os.path.exists(main_file_path):
-        gr.Error(f"File 'app.py' tidak ditemukan di dalam '{project_name}'!")
-        yield f"❌ Error: Tidak dapat menemukan 'app.py' di '{project_path}'.", gr.Button(interactive=True), gr.Button(visible=False), gr.Button(visible=False)
+        gr.Warning(f"File 'app.py' tidak ditemukan di dalam '{project_name}'!")
+        yield f"❌ Error: Tidak dapat menemukan 'app.py' di '{project_path}'.", gr.Button(interactive=True), gr.Button(visible=False), gr.Button(visible=False), None, None
         return
 
-    # Nonaktifkan tombol Run, tampilkan tombol Stop
-    yield "🚀 Memulai proses...", gr.Button(interactive=False), gr.Button(visible=True), gr.Button(visible=True)
+    # Environment dipakai bersama oleh proyek dengan dependensi yang sama; hanya run pertama yang menginstal
+    yield "📦 Menyiapkan environment...", gr.Button(interactive=False), gr.Button(visible=False), gr.Button(visible=False), None, None
 
+    # Setiap run mendapat port sendiri sehingga beberapa aplikasi bisa berjalan bersamaan
+    port = _free_port()
     try:
-        # Gunakan Popen untuk memulai proses di latar belakang
-        process = subprocess.Popen(
-            ["uv", "run", "app.py"],
-            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
-            cwd=project_path,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            encoding='utf-8'
-        )
-        active_subprocess = process
-
-        q = queue.Queue()
-        thread = Thread(target=enqueue_output, args=(process.stdout, q))
-        thread.daemon = True
-        thread.start()
-
-        full_output = ""
-        while True:
-            if process.poll() is not None and q.empty():
-                break
-            
-            try:
-                line = q.get_nowait()
-                full_output += line
-                yield full_output, gr.Button(interactive=False), gr.Button(visible=True), gr.Button(visible=True)
-            except queue.Empty:
-                time.sleep(0.1)
-        
-        gr.Info(f"Proses '{project_name}' telah selesai.")
-        yield full_output, gr.Button(interactive=True), gr.Button(visible=False), gr.Button(visible=False)
-
+        run = project_runner.launch(project_name, project_path, "app.py", env={"GRADIO_SERVER_PORT": str(port)})
     except Exception as e:
-        gr.Error("Gagal memulai proses!")
-        yield f"❌ Error: {str(e)}", gr.Button(interactive=True), gr.Button(visible=False), gr.Button(visible=False)
-    finally:
-        active_subprocess = None
-
+        gr.Warning("Gagal memulai proses!")
+        yield f"❌ Error: {str(e)}", gr.Button(interactive=True), gr.Button(visible=False), gr.Button(visible=False), None, None
+        return
 
-def stop_run():
-    # ... (fungsi ini tidak berubah)
-    global active_subprocess
-    if active_subprocess:
-        gr.Warning(f"Menghentikan proses (PID: {active_subprocess.pid})...")
-        active_subprocess.send_signal(signal.CTRL_BREAK_EVENT)
-        try:
-            active_subprocess.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            active_subprocess.kill()
-            gr.Error("Proses tidak merespon, terpaksa dihentikan.")
-            
-        active_subprocess = None
-        gr.Info("Proses berhasil dihentikan.")
-        return "Proses dihentikan oleh pengguna.", gr.Button(interactive=True), gr.Button(visible=False)
-    
-    return "Tidak ada proses yang berjalan.", gr.Button(interactive=True), gr.Button(visible=False)
+    # Nonaktifkan tombol Run, tampilkan tombol Stop
+    yield "🚀 Memulai proses...", gr.Button(interactive=False), gr.Button(visible=True), gr.Button(visible=True), run.id, port
+
+    # Log ditampung ring buffer berukuran tetap; UI hanya menerima tail-nya,
+    # paling sering sekali per RUN_LOG_FLUSH_INTERVAL dan hanya jika ada baris baru
+    version = 0
+    while True:
+        finished = run.done.wait(timeout=settings.RUN_LOG_FLUSH_INTERVAL)
+        if run.version != version:
+            version = run.version
+            yield run.tail(), gr.skip(), gr.skip(), gr.skip(), gr.skip(), gr.skip()
+        if finished:
+            break
+
+    gr.Info(f"Proses '{project_name}' telah selesai (exit code {run.returncode}).")
+    yield run.tail(), gr.Button(interactive=True), gr.Button(visible=False), gr.Button(visible=False), None, None
+
+
+def stop_run(run_id: str):
+    """Menghentikan run milik sesi ini saja."""
+    run = process_runs.get(run_id)
+    if run is None or run.done.is_set():
+        return "Tidak ada proses yang berjalan.", gr.Button(interactive=True), gr.Button(visible=False)
+
+    gr.Warning(f"Menghentikan proses (PID: {run.process.pid})...")
+    if run.stop():
+        gr.Warning("Proses tidak merespon, terpaksa dihentikan.")
+    gr.Info("Proses berhasil dihentikan.")
+    return run.tail() + "\n\nProses dihentikan oleh pengguna.", gr.Button(interactive=True), gr.Button(visible=False)
 
 # <<< FUNGSI BARU UNTUK DOWNLOAD PROYEK >>>
 def download_project(project_name: str):
-    """Menzip folder proyek yang dipilih dan mengembalikan path filenya."""
+    """Mengembalikan zip proyek dari cache; jika belum ada, memberi link unduhan yang di-stream sambil dikompresi."""
     if not project_name:
         gr.Warning("Silakan pilih proyek untuk diunduh!")
-        return None
-
-    project_path = os.path.join("output", project_name)
-    if not os.path.isdir(project_path):
-        gr.Error(f"Direktori proyek '{project_name}' tidak ditemukan!")
-        return None
-
-    # Tentukan direktori untuk menyimpan file zip
-    zip_dir = "zips"
-    os.makedirs(zip_dir, exist_ok=True)
-    
-    # Path untuk file zip (tanpa ekstensi .zip)
-    zip_path_base = os.path.join(zip_dir, project_name)
-    
-    # Buat arsip zip
-    try:
-        shutil.make_archive(zip_path_base, 'zip', project_path)
-        zip_file_path = f"{zip_path_base}.zip"
-        gr.Info(f"Proyek '{project_name}' berhasil di-zip!")
-        return zip_file_path
-    except Exception as e:
-        gr.Error(f"Gagal membuat file zip: {e}")
-        return None
+        return None, ""
+
+    if archive_cache.project_path(project_name) is None:
+        gr.Warning(f"Direktori proyek '{project_name}' tidak ditemukan!")
+        return None, ""
+
+    # Proyek yang isinya tidak berubah memakai arsip yang sama, tanpa kompresi ulang
+    zip_file_path = archive_cache.cached(project_name)
+    if zip_file_path is not None:
+        gr.Info(f"Proyek '{project_name}' siap diunduh!")
+        return str(zip_file_path), ""
+
+    # Arsip belum ada: jangan blokir worker Gradio, biarkan route /download mengirim byte sambil mengompresi
+    link = f"/download/{quote(project_name)}"
+    return None, f"📦 Arsip sedang dibuat, unduhan langsung dimulai: [{project_name}.zip]({link})"
+
+
+def stream_project_archive(project: str):
+    """Route unduhan: arsip dari cache jika ada, selain itu zip di-stream sambil dikompresi (dan disimpan ke cache)."""
+    if archive_cache.project_path(project) is None:
+        raise HTTPException(status_code=404, detail=f"Proyek '{project}' tidak ditemukan")
+    zip_file_path = archive_cache.cached(project)
+    if zip_file_path is not None:
+        return FileResponse(zip_file_path, media_type="application/zip", filename=f"{project}.zip")
+    return StreamingResponse(
+        archive_cache.stream(project),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{project}.zip"'},
+    )
 
 
 # --- UI dengan Gradio Blocks ---
@@ -212,20 +289,33 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
             gr.Markdown("## 🗂️ Project Explorer")
             
             with gr.Accordion("🚀 Unduh Proyek", open=True):
+                project_search = gr.Textbox(label="Cari Proyek", placeholder="Ketik sebagian nama modul...")
+                with gr.Row():
+                    prev_page_btn = gr.Button("◀️", size="sm")
+                    page_info = gr.Markdown("")
+                    next_page_btn = gr.Button("▶️", size="sm")
+                project_page = gr.State(1)
                 project_dropdown = gr.Dropdown(label="Pilih Proyek untuk Diunduh!")
                 with gr.Row():
-                    # run_project_btn = gr.Button("▶️ Run", variant="secondary")
-                    # stop_run_btn = gr.Button("⏹️ Stop", variant="stop", visible=False)
+                    run_project_btn = gr.Button("▶️ Run", variant="secondary")
+                    stop_run_btn = gr.Button("⏹️ Stop", variant="stop", visible=False)
                     # <<< TOMBOL DOWNLOAD BARU >>>
                     download_project_btn = gr.Button("📥 Download", variant="secondary")
                 
-                # project_output = gr.Code(label="Hasil Eksekusi Proyek", )
-                # open_project_btn = gr.Button("Buka Project", visible=False)
+                project_output = gr.Code(label="Hasil Eksekusi Proyek", language="shell")
+                open_project_btn = gr.Button("Buka Project", visible=False)
+                # id run & port milik sesi ini, agar setiap pengguna mengelola run-nya sendiri
+                project_run_id = gr.State(None)
+                project_run_port = gr.State(None)
                 # <<< KOMPONEN FILE BARU (TERSEMBUNYI) UNTUK DOWNLOAD >>>
                 download_file_output = gr.File(label="Download Link", visible=True)
+                download_link = gr.Markdown("")
 
             with gr.Accordion("📁 Direktori Output", open=True):
                 file_tree = gr.Markdown("Memuat...")
+
+            with gr.Accordion("⚙️ Status Worker", open=False):
+                worker_status = gr.JSON(label="Utilisasi slot, antrian & waktu startup")
             
             refresh_btn = gr.Button("🔄 Refresh Explorer")
 
@@ -244,37 +334,74 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
 
     # --- Interaktivitas Komponen UI ---
     
+    explorer_outputs = [file_tree, project_dropdown, page_info, project_page]
+
+    # Jumlah run dibatasi oleh flow_executor (slot + backlog), bukan oleh antrian event Gradio
     run_button.click(
-        fn=run_and_stream, inputs=[module_name, requirements], outputs=chat
+        fn=run_and_stream, inputs=[module_name, requirements], outputs=chat, concurrency_limit=None
     ).then(
-        fn=update_project_explorer, outputs=[file_tree, project_dropdown]
+        fn=update_project_explorer, inputs=[project_search, project_page, project_dropdown], outputs=explorer_outputs
     )
 
-    # run_project_btn.click(
-    #     fn=run_selected_project, 
-    #     inputs=[project_dropdown], 
-    #     outputs=[project_output, run_project_btn, stop_run_btn, open_project_btn]
-    # )
+    run_project_btn.click(
+        fn=run_selected_project,
+        inputs=[project_dropdown, project_run_id],
+        outputs=[project_output, run_project_btn, stop_run_btn, open_project_btn, project_run_id, project_run_port]
+    )
     
     # <<< EVENT HANDLER BARU UNTUK TOMBOL DOWNLOAD >>>
     download_project_btn.click(
         fn=download_project,
         inputs=[project_dropdown],
-        outputs=[download_file_output]
+        outputs=[download_file_output, download_link]
     )
 
-    # open_project_btn.click(
-    #     fn=None,  # No Python function needed for opening the link
-    #     js="() => { window.open(`http://127.0.0.1:7860`, '_blank'); }"
-    # )
-    
-    # stop_run_btn.click(
-    #     fn=stop_run,
-    #     inputs=None,
-    #     outputs=[project_output, run_project_btn, stop_run_btn]
-    # )
+    open_project_btn.click(
+        fn=None,  # No Python function needed for opening the link
+        inputs=[project_run_port],
+        js="(port) => { window.open(`${window.location.protocol}//${window.location.hostname}:${port}`, '_blank'); }"
+    )
 
-    refresh_btn.click(fn=update_project_explorer, outputs=[file_tree, project_dropdown])
-    demo.load(fn=update_project_explorer, outputs=[file_tree, project_dropdown])
+    stop_run_btn.click(
+        fn=stop_run,
+        inputs=[project_run_id],
+        outputs=[project_output, run_project_btn, stop_run_btn]
+    )
 
-demo.launch(server_name="0.0.0.0", server_port=7654)
\ No newline at end of file
+    # Pencarian selalu kembali ke halaman pertama; tombol halaman hanya menggeser nomor halaman
+    project_search.change(
+        fn=lambda query: update_project_explorer(query, 1), inputs=[project_search], outputs=explorer_outputs
+    )
+    prev_page_btn.click(
+        fn=lambda query, page: update_project_explorer(query, page - 1),
+        inputs=[project_search, project_page],
+        outputs=explorer_outputs,
+    )
+    next_page_btn.click(
+        fn=lambda query, page: update_project_explorer(query, page + 1),
+        inputs=[project_search, project_page],
+        outputs=explorer_outputs,
+    )
+    project_dropdown.input(fn=show_project_tree, inputs=[project_dropdown], outputs=file_tree)
+
+    refresh_btn.click(
+        fn=update_project_explorer, inputs=[project_search, project_page, project_dropdown], outputs=explorer_outputs
+    )
+    refresh_btn.click(fn=server_status, outputs=worker_status)
+    demo.load(fn=update_project_explorer, outputs=explorer_outputs)
+    demo.load(fn=server_status, outputs=worker_status)
+    demo.load(fn=lambda: startup_timer.mark("first_page"))
+
+# Worker proses (FLOW_EXECUTION_MODE=process) meng-import ulang modul ini, jadi server hanya dijalankan dari entry point utama
+if __name__ == "__main__":
+    demo.launch(server_name="0.0.0.0", server_port=7654, prevent_thread_lock=True)
+    # Route unduhan ditambahkan ke app FastAPI milik Gradio (baru ada setelah launch),
+    # dan diletakkan paling depan agar tidak tertutup route bawaan Gradio
+    demo.app.add_api_route("/download/{project}", stream_project_archive, methods=["GET"])
+    demo.app.router.routes.insert(0, demo.app.router.routes.pop())
+    startup_timer.mark("server_listening")
+    if settings.METRICS_PORT:
+        metrics_registry.serve(settings.METRICS_PORT)
+    if settings.WARMUP_ON_START:
+        start_warm_up()
+    demo.block_thread()
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""Micro-benchmark of the per-step crew setup cost in EngineeringFlow.
+
+Compares building a fresh EngineeringCrew for every step (the original behaviour)
+against cloning prototypes from the process-wide CrewRegistry. No LLM calls are made.
+
+    PYTHONPATH=src python benchmarks/crew_setup.py --iterations 50
+"""
+import argparse
+import statistics
+import time
+
+from crewai import Crew
+
+from coding_agent.crew import EngineeringCrew
+from coding_agent.crew_registry import CrewRegistry
+
+STEPS = [
+    ("development_lead", "design_task"),
+    ("backend_engineer", "backend_coding_task"),
+    ("code_reviewer", "code_review_task"),
+    ("frontend_engineer", "frontend_coding_task"),
+    ("code_reviewer", "frontend_code_review_task"),
+    ("test_engineer", "test_preparation_task"),
+]
+
+
+def fresh_crew(agent_name: str, task_name: str) -> Crew:
+    engineeringCrew = EngineeringCrew()
+    return Crew(
+        agents=[getattr(engineeringCrew, agent_name)()],
+        tasks=[getattr(engineeringCrew, task_name)()],
+    )
+
+
+def registry_crew(registry: CrewRegistry, agent_name: str, task_name: str) -> Crew:
+    agent, task = registry.build(agent_name, task_name)
+    return Crew(agents=[agent], tasks=[task])
+
+
+def measure(build, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        for agent_name, task_name in STEPS:
+            started = time.perf_counter()
+            build(agent_name, task_name)
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20, help="flows worth of steps to build")
+    args = parser.parse_args()
+
+    registry = CrewRegistry()
+    started = time.perf_counter()
+    registry.build(*STEPS[0])
+    warmup_ms = (time.perf_counter() - started) * 1000
+
+    results = {
+        "fresh EngineeringCrew": measure(fresh_crew, args.iterations),
+        "CrewRegistry clone": measure(lambda a, t: registry_crew(registry, a, t), args.iterations),
+    }
+    print(f"registry warm-up (one-off): {warmup_ms:.2f} ms")
+    print(f"{'strategy':<24}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, samples in results.items():
+        samples.sort()
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(f"{name:<24}{statistics.mean(samples):>10.2f}{statistics.median(samples):>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""OpenAI-compatible stand-in LLM server for offline benchmarks of EngineeringFlow.
+
+Answers /v1/chat/completions (plain and SSE streaming) with canned outputs chosen by
+the agent role found in the prompt, after a configurable latency and token rate.
+Code reviews pass or fail according to --review-fail-rate, so the review loops can be
+exercised. Point litellm at it with OPENAI_API_BASE=http://127.0.0.1:<port>/v1.
+
+    python benchmarks/fake_llm.py --port 18080 --latency 0.2 --tokens-per-second 200
+"""
+import argparse
+import datetime
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Canned final answers keyed by a marker of the agent's role in the prompt, checked in order.
+DEFAULT_OUTPUTS = {
+    "Senior Backend": "class Account:\n    def __init__(self):\n        self.balance = 0\n\n    def deposit(self, amount):\n        self.balance += amount\n\n\ndef add(a, b):\n    return a + b\n",
+    "Frontend Developer": "import gradio as gr\nimport backend\n\n\ndef ui(a, b):\n    return backend.add(a, b)\n\n\ngr.Interface(ui, ['number', 'number'], 'number').launch()\n",
+    "Test Engineer": "import unittest\nimport backend\n\n\nclass TestAdd(unittest.TestCase):\n    def test_add(self):\n        self.assertEqual(backend.add(1, 2), 3)\n",
+    "Development Lead": "# Design\n\n- `Account` class with `deposit(amount)` and `withdraw(amount)`\n- `add(a, b)` returns the sum\n",
+}
+REVIEWER_MARKER = "Code Reviewer"
+
+
+class FakeLLM:
+    """Decides what to answer and how long to take; shared by all request handlers."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        review_fail_rate: float = 0.0,
+        outputs: Optional[dict] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.review_fail_rate = review_fail_rate
+        self.outputs = outputs or DEFAULT_OUTPUTS
+        self.requests = 0
+        self.reviews_failed = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def answer(self, prompt: str) -> str:
+        with self._lock:
+            self.requests += 1
+            if REVIEWER_MARKER in prompt:
+                passed = self._random.random() >= self.review_fail_rate
+                self.reviews_failed += not passed
+                return json.dumps(
+                    {
+                        "code_being_reviewed": "",
+                        "review_comments_markdown": "- Looks good" if passed else "- Rename `add` to `add_numbers`",
+                        "review_timestamp": datetime.datetime.now().isoformat(),
+                        "passed_review": passed,
+                    }
+                )
+        for marker, output in self.outputs.items():
+            if marker in prompt:
+                return output
+        return "{}"
+
+    def delay(self, completion_tokens: int) -> float:
+        token_time = completion_tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+        return self.latency + token_time
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def make_handler(llm: FakeLLM):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload: dict):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send_json({"object": "list", "data": [{"id": "fake", "object": "model"}]})
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = "\n".join(str(message.get("content")) for message in body.get("messages", []))
+            content = "Thought: I now can give a great answer\nFinal Answer: " + llm.answer(prompt)
+            usage = {
+                "prompt_tokens": count_tokens(prompt),
+                "completion_tokens": count_tokens(content),
+                "total_tokens": count_tokens(prompt) + count_tokens(content),
+            }
+            model = body.get("model", "fake")
+
+            if not body.get("stream"):
+                time.sleep(llm.delay(usage["completion_tokens"]))
+                self._send_json(
+                    {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [
+                            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                        ],
+                        "usage": usage,
+                    }
+                )
+                return
+
+            # SSE: the latency comes before the first chunk, the token rate paces the rest.
+            time.sleep(llm.latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            chunk_chars = 16
+            for start in range(0, len(content), chunk_chars):
+                piece = content[start : start + chunk_chars]
+                if llm.tokens_per_second:
+                    time.sleep(count_tokens(piece) / llm.tokens_per_second)
+                self._send_event(model, {"role": "assistant", "content": piece}, None)
+            self._send_event(model, {}, "stop", usage)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+        def _send_event(self, model: str, delta: dict, finish_reason: Optional[str], usage: Optional[dict] = None):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if usage:
+                chunk["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+    return Handler
+
+
+def start_server(llm: FakeLLM, port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves `llm` from a daemon thread; port 0 picks a free port (see `server.server_port`)."""
+    server = ThreadingHTTPServer((host, port), make_handler(llm))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before every answer")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="completion token rate (0 = instant)")
+    parser.add_argument("--review-fail-rate", type=float, default=0.0, help="probability that a code review fails")
+    parser.add_argument("--outputs", help="JSON file mapping role markers to canned answers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    outputs = None
+    if args.outputs:
+        with open(args.outputs, encoding="utf-8") as f:
+            outputs = json.load(f)
+    llm = FakeLLM(args.latency, args.tokens_per_second, args.review_fail_rate, outputs, args.seed)
+    server = start_server(llm, args.port)
+    print(f"Fake LLM listening on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
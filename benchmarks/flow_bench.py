@@ -0,0 +1,228 @@
+"""End-to-end benchmark of EngineeringFlow runs against the fake LLM server.
+
+Drives complete flows through app.run_and_stream (executor -> main.py -> event bus ->
+chat generator) at several concurrency levels, without any real API calls, and
+reports end-to-end latency, per-step overhead over the simulated LLM time,
+events/sec through the event bus, bytes yielded to the UI and peak RSS.
+Results are written to benchmarks/results/<git sha>.json; pass --compare with an
+older result file to see the change per concurrency level.
+
+    python benchmarks/flow_bench.py --concurrency 1 8 32 --latency 0.05
+    python benchmarks/flow_bench.py --compare benchmarks/results/<old sha>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.fake_llm import FakeLLM, start_server  # noqa: E402
+
+REQUIREMENT = "A simple account management system with deposits, withdrawals and a balance report."
+
+
+def git_revision() -> str:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux; children covers process-mode workers.
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def consume(app, module_name: str, result: dict):
+    """Runs one flow through the chat generator, measuring what the UI would receive."""
+    from gradio.utils import diff
+
+    started = time.perf_counter()
+    previous, yields, ui_bytes = [], 0, 0
+    async for messages in app.run_and_stream(module_name, REQUIREMENT):
+        yields += 1
+        # gradio only ships the diff of a streamed output to the browser
+        ui_bytes += len(json.dumps(diff(previous, messages)))
+        previous = json.loads(json.dumps(messages))
+    result.update(
+        latency=time.perf_counter() - started,
+        yields=yields,
+        ui_bytes=ui_bytes,
+        ok="✅" in previous[-1]["content"] if previous else False,
+    )
+
+
+def step_overhead(spans: list[dict], llm: FakeLLM) -> dict:
+    """Per step: mean wall time and mean time not spent waiting on the simulated LLM."""
+    by_step = defaultdict(list)
+    for span in spans:
+        simulated = span["llm_calls"] * llm.latency
+        if llm.tokens_per_second:
+            simulated += span["completion_tokens"] / llm.tokens_per_second
+        by_step[span["step"]].append((span["wall_time"], span["wall_time"] - simulated))
+    return {
+        step: {
+            "count": len(values),
+            "mean_wall_s": round(statistics.mean(wall for wall, _ in values), 4),
+            "mean_overhead_s": round(statistics.mean(overhead for _, overhead in values), 4),
+        }
+        for step, values in by_step.items()
+    }
+
+
+def run_level(app, event_bus, llm: FakeLLM, concurrency: int) -> dict:
+    results = [{} for _ in range(concurrency)]
+    names = [f"bench_c{concurrency}_{index}" for index in range(concurrency)]
+
+    async def consume_all():
+        # all chat generators share one event loop, as they do in the Gradio server
+        await asyncio.gather(*(consume(app, name, result) for name, result in zip(names, results)))
+
+    events_before, requests_before = event_bus.published, llm.requests
+    started = time.perf_counter()
+    asyncio.run(consume_all())
+    elapsed = time.perf_counter() - started
+    events = event_bus.published - events_before
+
+    spans = []
+    for name in names:
+        metrics_file = Path("output") / name / "metrics.jsonl"
+        if metrics_file.exists():
+            spans += [json.loads(line) for line in metrics_file.read_text(encoding="utf-8").splitlines()]
+
+    latencies = [result["latency"] for result in results if "latency" in result]
+    return {
+        "concurrency": concurrency,
+        "runs": concurrency,
+        "failures": sum(1 for result in results if not result.get("ok")),
+        "wall_s": round(elapsed, 3),
+        "throughput_runs_per_s": round(concurrency / elapsed, 4),
+        "e2e_latency_s": {
+            "mean": round(statistics.mean(latencies), 3),
+            "p50": round(percentile(latencies, 0.5), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "max": round(max(latencies), 3),
+        },
+        "llm_requests": llm.requests - requests_before,
+        "events": events,
+        "events_per_s": round(events / elapsed, 2),
+        "ui_yields": sum(result.get("yields", 0) for result in results),
+        "ui_bytes": sum(result.get("ui_bytes", 0) for result in results),
+        "ui_bytes_per_run": round(sum(result.get("ui_bytes", 0) for result in results) / concurrency),
+        "peak_rss_mb": peak_rss_mb(),
+        "steps": step_overhead(spans, llm),
+    }
+
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    old_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    print(f"\nCompared with {baseline['revision']}:")
+    for level in current["levels"]:
+        old = old_levels.get(level["concurrency"])
+        if old is None:
+            continue
+        for label, key in (("p50 latency", "p50"), ("p95 latency", "p95")):
+            before, after = old["e2e_latency_s"][key], level["e2e_latency_s"][key]
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"  c={level['concurrency']:<3} {label}: {before:.3f}s -> {after:.3f}s ({change:+.1f}%)")
+        print(f"  c={level['concurrency']:<3} peak RSS: {old['peak_rss_mb']} -> {level['peak_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per LLM call")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="simulated completion token rate")
+    parser.add_argument("--review-fail-rate", type=float, default=0.2)
+    parser.add_argument("--mode", choices=["thread", "process", "async"], default="thread", help="FLOW_EXECUTION_MODE")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<git sha>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    llm = FakeLLM(args.latency, args.tokens_per_second, args.review_fail_rate, seed=args.seed)
+    server = start_server(llm)
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+
+    # settings are read at import time, so the environment is prepared before importing the app.
+    os.environ.update(
+        OPENAI_API_KEY="fake",
+        OPENAI_API_BASE=base_url,
+        OPENAI_BASE_URL=base_url,
+        CREWAI_DISABLE_TELEMETRY="true",
+        OTEL_SDK_DISABLED="true",
+        KICKOFF_CACHE_ENABLED="0",
+        DESIGN_REUSE="0",  # every run has the same requirement, so reuse would skip design_task
+        FLOW_EXECUTION_MODE=args.mode,
+        FLOW_MAX_CONCURRENT=str(max(args.concurrency)),
+        FLOW_MAX_BACKLOG=str(max(args.concurrency)),
+    )
+    revision = git_revision()
+    output = Path(args.output) if args.output else REPO_ROOT / "benchmarks" / "results" / f"{revision}.json"
+    output = output.resolve()
+    if args.compare:
+        args.compare = str(Path(args.compare).resolve())
+
+    workdir = tempfile.mkdtemp(prefix="flow_bench_")
+    os.chdir(workdir)  # flows write to ./output; keep benchmark runs out of the repo
+    import app
+    from src.coding_agent.shared_queue import event_bus
+    from src.coding_agent.warmup import warm_up
+
+    # cold start (imports, crew prototypes, worker processes) is not part of any level
+    warm_up_started = time.perf_counter()
+    warm_up()
+    warm_up_s = round(time.perf_counter() - warm_up_started, 3)
+
+    levels = []
+    for concurrency in args.concurrency:
+        level = run_level(app, event_bus, llm, concurrency)
+        levels.append(level)
+        latency = level["e2e_latency_s"]
+        print(
+            f"c={concurrency:<3} p50={latency['p50']:.3f}s p95={latency['p95']:.3f}s "
+            f"throughput={level['throughput_runs_per_s']:.2f} runs/s events/s={level['events_per_s']:.0f} "
+            f"ui_bytes/run={level['ui_bytes_per_run']} rss={level['peak_rss_mb']}MB failures={level['failures']}"
+        )
+
+    report = {
+        "revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "config": vars(args),
+        "warm_up_s": warm_up_s,
+        "levels": levels,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {output} (flow outputs in {workdir})")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Import-time profile of the web app's entry modules (`python -X importtime`, summarized).
+
+Each module is imported in a fresh interpreter. The report lists its total import time
+and the top-level packages that dominate it, and can fail when a budget is exceeded so
+cold-start regressions get caught:
+
+    python benchmarks/import_profile.py --output benchmarks/results/importtime.json \
+        --budget src.coding_agent.executor=300
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+DEFAULT_MODULES = ["gradio", "src.coding_agent.executor", "src.coding_agent.main"]
+
+
+def profile(module: str, top: int) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, ["src", os.getenv("PYTHONPATH")]))},
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    # lines look like: "import time:       123 |       4567 |   package.sub"
+    self_by_package: dict[str, int] = defaultdict(int)
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        self_by_package[name.split(".")[0]] += int(self_us)
+        if name == module:
+            total_us = int(cumulative_us)
+
+    heaviest = sorted(self_by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 1),
+        "top_packages_ms": {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="packages listed per module")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="fail if MODULE takes longer than MS to import")
+    args = parser.parse_args()
+
+    reports = [profile(module, args.top) for module in args.modules]
+    for report in reports:
+        print(f"{report['module']}: {report['total_ms']} ms")
+        for name, ms in report["top_packages_ms"].items():
+            print(f"    {name:<30}{ms:>10.1f} ms")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+    totals = {report["module"]: report["total_ms"] for report in reports}
+    over_budget = []
+    for budget in args.budget:
+        module, limit = budget.split("=")
+        if totals.get(module, 0) > float(limit):
+            over_budget.append(f"{module}: {totals[module]} ms > {limit} ms")
+    if over_budget:
+        sys.exit("Import-time budget exceeded:\n" + "\n".join(over_budget))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Content-addressed zip archives of generated projects, built once and streamed while compressing."""
+import hashlib
+import os
+import re
+import threading
+import zipfile
+from pathlib import Path
+from typing import Iterator, Optional
+
+from . import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkBuffer:
+    """Write-only, non-seekable sink for ZipFile that hands out what was written so far."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+class ArchiveCache:
+    """Zips of output/{project} stored as {directory}/{project}-{content hash}.zip.
+
+    An unchanged project maps to the same archive, so repeated downloads are served
+    from disk. A missing archive is streamed to the client while it is compressed and
+    written to the cache at the same time. Archives of older project versions and
+    least recently used ones are evicted once the cache exceeds `max_bytes`.
+    """
+
+    def __init__(self, root: str = "output", directory: str = "zips", max_bytes: int = 512 * 1024 * 1024):
+        self.root = Path(root)
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (path, size, mtime_ns) -> sha256 of the file, so unchanged files are not re-read
+        self._file_digests: dict[tuple[str, int, int], str] = {}
+
+    def project_path(self, project: str) -> Optional[Path]:
+        """The project's directory, or None for unknown names and anything outside the root."""
+        if not project or project in (".", "..") or os.path.basename(project) != project:
+            return None
+        path = self.root / project
+        return path if path.is_dir() else None
+
+    def _files(self, project_path: Path) -> list[Path]:
+        return sorted(path for path in project_path.rglob("*") if path.is_file())
+
+    def _file_digest(self, path: Path) -> str:
+        stat = path.stat()
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._file_digests.get(key)
+        if digest is None:
+            if len(self._file_digests) > 100_000:
+                self._file_digests.clear()
+            sha = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    sha.update(chunk)
+            digest = self._file_digests[key] = sha.hexdigest()
+        return digest
+
+    def content_hash(self, project_path: Path) -> str:
+        sha = hashlib.sha256()
+        for path in self._files(project_path):
+            sha.update(path.relative_to(project_path).as_posix().encode("utf-8"))
+            sha.update(self._file_digest(path).encode("ascii"))
+        return sha.hexdigest()[:16]
+
+    def archive_path(self, project: str) -> Optional[Path]:
+        """Path the project's current archive has (or will have) in the cache."""
+        project_path = self.project_path(project)
+        if project_path is None:
+            return None
+        return self.directory / f"{project}-{self.content_hash(project_path)}.zip"
+
+    def cached(self, project: str) -> Optional[Path]:
+        """The project's archive if it is already in the cache, marked as recently used."""
+        path = self.archive_path(project)
+        if path is None or not path.exists():
+            return None
+        os.utime(path)
+        return path
+
+    def stream(self, project: str) -> Iterator[bytes]:
+        """Yields the project's zip as it is being compressed and stores it in the cache."""
+        project_path = self.project_path(project)
+        if project_path is None:
+            raise FileNotFoundError(project)
+        target = self.directory / f"{project}-{self.content_hash(project_path)}.zip"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_suffix(f".{threading.get_ident()}.tmp")
+
+        buffer = _ChunkBuffer()
+        completed = False
+        try:
+            with open(tmp_path, "wb") as cache_file:
+
+                def emit() -> bytes:
+                    data = buffer.drain()
+                    cache_file.write(data)
+                    return data
+
+                with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                    for path in self._files(project_path):
+                        arcname = path.relative_to(project_path).as_posix()
+                        with open(path, "rb") as source, archive.open(arcname, "w") as entry:
+                            for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                                entry.write(chunk)
+                                data = emit()
+                                if data:
+                                    yield data
+                        data = emit()
+                        if data:
+                            yield data
+                data = emit()  # central directory
+                if data:
+                    yield data
+            completed = True
+        finally:
+            if completed:
+                os.replace(tmp_path, target)
+                self.evict(project, keep=target)
+            else:
+                tmp_path.unlink(missing_ok=True)
+
+    def build(self, project: str) -> Optional[Path]:
+        """Returns the cached archive, compressing it first if needed."""
+        path = self.cached(project)
+        if path is None and self.project_path(project) is not None:
+            for _ in self.stream(project):
+                pass
+            path = self.archive_path(project)
+        return path
+
+    def evict(self, project: Optional[str] = None, keep: Optional[Path] = None):
+        """Drops superseded archives of `project`, then the least recently used ones over budget."""
+        with self._lock:
+            archives = sorted(self.directory.glob("*.zip"), key=lambda path: path.stat().st_mtime, reverse=True)
+            if project is not None:
+                version = re.compile(re.escape(project) + r"-[0-9a-f]{16}\.zip")
+                for path in archives:
+                    if path != keep and version.fullmatch(path.name):
+                        path.unlink(missing_ok=True)
+                archives = [path for path in archives if path.exists()]
+            total = 0
+            for path in archives:
+                total += path.stat().st_size
+                if total > self.max_bytes and path != keep:
+                    path.unlink(missing_ok=True)
+
+
+archive_cache = ArchiveCache(max_bytes=settings.ARCHIVE_CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,236 @@
+"""Headless batch generation of many modules from a JSONL or YAML requirements file.
+
+Each entry needs a `module_name` and a `business_requirement` (and may set a
+`priority`). Entries run through a FlowExecutor with the requested concurrency,
+all LLM calls share one rate limit, and a summary report is written at the end:
+
+    batch catalogue.yaml --concurrency 8 --rate-limit 120 --report output/catalogue.json
+
+Modules whose checkpoint shows a finished flow are skipped; unfinished ones are
+resumed from their last checkpointed step, so an interrupted batch can simply be
+started again.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import yaml
+from pydantic import BaseModel
+
+from . import settings
+from .checkpoint import FINAL_STEP, FlowCheckpoint
+from .executor import FlowExecutor, FlowJob, FlowTicket
+from .rate_limit import llm_rate_limiter
+
+
+class BatchItem(BaseModel):
+    module_name: str
+    business_requirement: str
+    priority: int = 0
+
+
+class BatchResult(BaseModel):
+    module_name: str
+    status: str  # "done", "incomplete" (stopped before the tests, e.g. out of review rounds), "failed" or "skipped"
+    resumed: bool = False
+    latency: Optional[float] = None
+    queue_wait: Optional[float] = None
+    backend_review_iterations: int = 0
+    frontend_review_iterations: int = 0
+    tests_passed: Optional[int] = None
+    tests_total: Optional[int] = None
+    error: Optional[str] = None
+
+
+def load_items(path: str) -> list[BatchItem]:
+    """Reads a JSONL file (one object per line) or a YAML list (optionally under `modules:`)."""
+    text = Path(path).read_text(encoding="utf-8")
+    if path.endswith((".yaml", ".yml")):
+        data = yaml.safe_load(text) or []
+        if isinstance(data, dict):
+            data = data.get("modules", [])
+    else:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    items = [BatchItem(**entry) for entry in data]
+
+    names = [item.module_name for item in items]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate module names in {path}: {', '.join(duplicates)}")
+    return items
+
+
+def review_iterations(module_name: str) -> tuple[int, int]:
+    """Backend and frontend review rounds recorded in the module's latest checkpoint."""
+    records = FlowCheckpoint(module_name).records()
+    if not records:
+        return 0, 0
+    state = records[-1]["state"]
+    return len(state["backend_code_review_feedbacks"]), len(state["frontend_code_review_feedbacks"])
+
+
+def test_results(module_name: str) -> tuple[Optional[int], Optional[int]]:
+    """Passed and total generated test cases recorded in the module's latest checkpoint."""
+    records = FlowCheckpoint(module_name).records()
+    report = records[-1]["state"].get("test_report") if records else None
+    if not report:
+        return None, None
+    return report["passed"], report["total"]
+
+
+def outcome(module_name: str, error: Optional[str]) -> tuple[str, Optional[str]]:
+    """Status and error line of a finished run, from its exception or where its checkpoint ends."""
+    if error:
+        return "failed", error.strip().splitlines()[-1]
+    records = FlowCheckpoint(module_name).records()
+    if records and records[-1]["step"] == FINAL_STEP:
+        return "done", None
+    if not records:
+        return "incomplete", "no checkpoint recorded"
+    return "incomplete", f"stopped after {records[-1]['step']}: {records[-1]['result']}"
+
+
+def run_batch(items: list[BatchItem], executor: FlowExecutor) -> tuple[list[BatchResult], float]:
+    """Runs every item through `executor`; returns the results and the batch wall time."""
+    started = time.monotonic()
+    results: dict[str, BatchResult] = {}
+    tickets: list[tuple[BatchItem, FlowTicket]] = []
+    for item in items:
+        records = FlowCheckpoint(item.module_name).records()
+        if records and records[-1]["step"] == FINAL_STEP:
+            results[item.module_name] = BatchResult(module_name=item.module_name, status="skipped")
+            continue
+        job = FlowJob(
+            run_id=str(uuid.uuid4()),
+            module_name=item.module_name,
+            business_requirement=item.business_requirement,
+            priority=item.priority,
+            resume=bool(records),
+        )
+        tickets.append((item, executor.submit(job)))
+
+    for item, ticket in tickets:
+        ticket.done.wait()
+        backend_iterations, frontend_iterations = review_iterations(item.module_name)
+        tests_passed, tests_total = test_results(item.module_name)
+        status, error = outcome(item.module_name, ticket.error)
+        result = BatchResult(
+            module_name=item.module_name,
+            status=status,
+            resumed=ticket.job.resume,
+            latency=round(ticket.finished_at - ticket.started_at, 3),
+            queue_wait=round(ticket.queue_wait, 3),
+            backend_review_iterations=backend_iterations,
+            frontend_review_iterations=frontend_iterations,
+            tests_passed=tests_passed,
+            tests_total=tests_total,
+            error=error,
+        )
+        results[item.module_name] = result
+        print(f"{'✅' if result.status == 'done' else '❌'} {item.module_name}: {result.latency:.1f}s")
+
+    return [results[item.module_name] for item in items], time.monotonic() - started
+
+
+def summarize(results: list[BatchResult], wall_time: float, concurrency: int, rate_limit: float) -> dict:
+    finished = [result for result in results if result.status == "done"]
+    latencies = [result.latency for result in finished]
+    return {
+        "modules": len(results),
+        "done": len(finished),
+        "incomplete": sum(result.status == "incomplete" for result in results),
+        "failed": sum(result.status == "failed" for result in results),
+        "skipped": sum(result.status == "skipped" for result in results),
+        "concurrency": concurrency,
+        "rate_limit_per_minute": rate_limit,
+        "wall_time_s": round(wall_time, 3),
+        "modules_per_hour": round(len(finished) / wall_time * 3600, 2) if wall_time else 0.0,
+        "latency_s": {
+            "mean": round(statistics.mean(latencies), 3),
+            "p50": round(statistics.median(latencies), 3),
+            "max": round(max(latencies), 3),
+        }
+        if latencies
+        else None,
+        "mean_review_iterations": round(
+            statistics.mean(r.backend_review_iterations + r.frontend_review_iterations for r in finished), 2
+        )
+        if finished
+        else None,
+    }
+
+
+def report_markdown(summary: dict, results: list[BatchResult]) -> str:
+    lines = [
+        "# Batch report",
+        "",
+        f"- Modules: {summary['modules']} ({summary['done']} done, {summary['incomplete']} incomplete, {summary['failed']} failed, {summary['skipped']} skipped)",
+        f"- Wall time: {summary['wall_time_s']:.1f}s at concurrency {summary['concurrency']}",
+        f"- Throughput: {summary['modules_per_hour']} modules/hour",
+        "",
+        "| Module | Status | Latency (s) | Queue wait (s) | Backend reviews | Frontend reviews | Tests passed | Error |",
+        "|---|---|---:|---:|---:|---:|---:|---|",
+    ]
+    for result in results:
+        latency = f"{result.latency:.1f}" if result.latency is not None else "-"
+        queue_wait = f"{result.queue_wait:.1f}" if result.queue_wait is not None else "-"
+        status = f"{result.status} (resumed)" if result.resumed else result.status
+        tests = f"{result.tests_passed}/{result.tests_total}" if result.tests_total is not None else "-"
+        lines.append(
+            f"| {result.module_name} | {status} | {latency} | {queue_wait} | {result.backend_review_iterations} "
+            f"| {result.frontend_review_iterations} | {tests} | {result.error or ''} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate many modules concurrently from a requirements file.")
+    parser.add_argument("requirements", help="JSONL or YAML file with module_name/business_requirement entries")
+    parser.add_argument("--concurrency", type=int, default=settings.FLOW_MAX_CONCURRENT)
+    parser.add_argument("--rate-limit", type=float, default=settings.LLM_RATE_LIMIT_RPM,
+                        help="LLM calls per minute across all runs (0 = unlimited)")
+    parser.add_argument("--mode", choices=["thread", "process", "async"], default=settings.FLOW_EXECUTION_MODE)
+    parser.add_argument("--report", default=f"output/batch-{time.strftime('%Y%m%d-%H%M%S')}.json",
+                        help="JSON report path; a Markdown version is written next to it")
+    args = parser.parse_args(argv)
+
+    items = load_items(args.requirements)
+    llm_rate_limiter.configure(args.rate_limit, settings.LLM_RATE_LIMIT_BURST)
+    if args.mode == "process":
+        # worker processes read the limit from the environment and each enforce their share
+        os.environ["LLM_RATE_LIMIT_RPM"] = str(args.rate_limit / args.concurrency)
+    executor = FlowExecutor(
+        args.concurrency,
+        max_backlog=max(1, len(items)),
+        default_duration=settings.FLOW_ETA_DEFAULT,
+        mode=args.mode,
+        worker_max_tasks=settings.FLOW_WORKER_MAX_TASKS,
+        worker_max_rss=settings.FLOW_WORKER_MAX_RSS_MB * 1024 * 1024,
+        async_threads=settings.FLOW_ASYNC_THREADS,
+    )
+    print(f"🚀 Running {len(items)} modules, {args.concurrency} at a time")
+    results, wall_time = run_batch(items, executor)
+    summary = summarize(results, wall_time, args.concurrency, args.rate_limit)
+
+    report_path = Path(args.report)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(
+        json.dumps({"summary": summary, "results": [result.model_dump() for result in results]}, indent=2),
+        encoding="utf-8",
+    )
+    markdown = report_markdown(summary, results)
+    report_path.with_suffix(".md").write_text(markdown, encoding="utf-8")
+    print(markdown)
+    print(f"📄 Report written to {report_path}")
+    if summary["failed"] or summary["incomplete"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Append-only checkpoints of the flow state, one JSON line per finished flow step.
+
+A resumed flow replays the recorded steps in order: each checkpointed method whose
+record is next in line restores the state saved after it and returns its recorded
+result (so routers take the same branch) instead of running again. The first step
+without a record runs normally, and from there on the flow continues as usual.
+"""
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from .flow_log import flow_log
+
+# the flow's last step: a checkpoint ending anywhere else belongs to a flow that stopped early
+FINAL_STEP = "run_test_cases"
+
+
+class FlowCheckpoint:
+    """The checkpoint file of one module: output/{module_name}/checkpoint.jsonl."""
+
+    def __init__(self, module_name: str, directory: str = "output"):
+        self.path = Path(directory) / module_name / "checkpoint.jsonl"
+        self._lock = threading.Lock()
+        self._pending: list[dict] = []
+
+    def records(self) -> list[dict]:
+        """Records of the most recent flow in the file, i.e. the one a resume continues."""
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # a line torn by a crash mid-write
+        if not records:
+            return []
+        state_id = records[-1]["state_id"]
+        return [record for record in records if record["state_id"] == state_id]
+
+    def finished(self) -> bool:
+        """Whether the most recent flow ran through to FINAL_STEP."""
+        records = self.records()
+        return bool(records) and records[-1]["step"] == FINAL_STEP
+
+    def start_replay(self) -> list[dict]:
+        with self._lock:
+            self._repair()
+            self._pending = self.records()
+            return list(self._pending)
+
+    def _repair(self):
+        # drop a torn last line so the next append starts on a line of its own
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return
+        if data and not data.endswith(b"\n"):
+            with open(self.path, "r+b") as f:
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def replay(self, step: str) -> Optional[dict]:
+        """The record of `step` if it is the next one to replay, otherwise None."""
+        with self._lock:
+            if not self._pending:
+                return None
+            if self._pending[0]["step"] == step:
+                return self._pending.pop(0)
+            flow_log.warning("checkpoint_replay_diverged", path=str(self.path), step=step, expected=self._pending[0]["step"])
+            self._pending = []
+            return None
+
+    def append(self, step: str, result: Any, state: BaseModel):
+        record = {
+            "step": step,
+            "result": result,
+            "state_id": state.id,
+            "state": state.model_dump(mode="json"),
+            "at": time.time(),
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def restore_state(state: BaseModel, data: dict):
+    """Overwrites the fields of `state` in place with the values saved in a checkpoint."""
+    restored = type(state).model_validate(data)
+    for name in type(state).model_fields:
+        setattr(state, name, getattr(restored, name))
+
+
+def checkpointed(method):
+    """Checkpoints the flow state after `method` finishes and replays it on resume.
+
+    The flow has to expose a `checkpoint` (FlowCheckpoint) and a
+    `checkpoint_restored(step)` hook, called whenever a step is replayed.
+    Apply it below crewai's @start/@listen/@router decorators.
+    """
+    step = method.__name__
+
+    def replayed(flow):
+        record = flow.checkpoint.replay(step)
+        if record is None:
+            return False, None
+        restore_state(flow.state, record["state"])
+        flow.checkpoint_restored(step)
+        return True, record["result"]
+
+    if asyncio.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def async_wrapper(flow, *args, **kwargs):
+            done, result = replayed(flow)
+            if done:
+                return result
+            result = await method(flow, *args, **kwargs)
+            # append fsyncs, which must not block the event loop the other flows share
+            await asyncio.to_thread(flow.checkpoint.append, step, result, flow.state)
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(flow, *args, **kwargs):
+        done, result = replayed(flow)
+        if done:
+            return result
+        result = method(flow, *args, **kwargs)
+        flow.checkpoint.append(step, result, flow.state)
+        return result
+
+    return wrapper
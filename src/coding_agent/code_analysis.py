@@ -0,0 +1,204 @@
+"""Lightweight static analysis of generated Python modules."""
+import ast
+import builtins
+import re
+from typing import Optional
+
+
+def _signature(node: ast.AST) -> str:
+    args = node.args  # type: ignore[attr-defined]
+    names = [a.arg for a in args.posonlyargs + args.args]
+    if args.vararg:
+        names.append(f"*{args.vararg.arg}")
+    names.extend(a.arg for a in args.kwonlyargs)
+    if args.kwarg:
+        names.append(f"**{args.kwarg.arg}")
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    return f"{prefix} {node.name}({', '.join(names)})"  # type: ignore[attr-defined]
+
+
+def public_interface(code: Optional[str]) -> str:
+    """Summarizes the public classes, methods and functions of a module, one signature per line.
+
+    Two versions of a module with the same summary are interchangeable for callers, which is
+    what decides whether dependent code (the frontend) has to be regenerated. Code that does
+    not parse is returned unchanged so any edit to it counts as an interface change.
+    """
+    if not code:
+        return ""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code
+
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith("_"):
+            lines.append(_signature(node))
+        elif isinstance(node, ast.ClassDef) and not node.name.startswith("_"):
+            lines.append(f"class {node.name}:")
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and (
+                    not item.name.startswith("_") or item.name == "__init__"
+                ):
+                    lines.append(f"    {_signature(item)}")
+    return "\n".join(lines)
+
+
+FENCE = re.compile(r"^[ \t]*```([\w+-]*)[ \t]*\n(.*?)^[ \t]*```[ \t]*$", re.MULTILINE | re.DOTALL)
+PYTHON_FENCES = {"", "python", "python3", "py"}
+# `def name(` and `class Name` signatures at the start of a line (optionally as a list item or in backticks)
+SIGNATURE = re.compile(
+    r"^[ \t]*(?:(?:[-*+]|\d+[.)])[ \t]+)?`*(?:async[ \t]+)?(?:def[ \t]+([A-Za-z_]\w*)[ \t]*\(|class[ \t]+([A-Za-z_]\w*))",
+    re.MULTILINE,
+)
+HEADING = re.compile(r"^(#{1,6})[ \t]+(.*)$", re.MULTILINE)
+BACKEND_HEADING = re.compile(r"backend", re.IGNORECASE)
+OTHER_HEADING = re.compile(r"frontend|\bui\b|gradio|app\.py|\btests?\b", re.IGNORECASE)
+
+
+def strip_code_fences(text: Optional[str]) -> str:
+    """Removes the markdown fences (and any prose around them) LLMs wrap code in despite being told not to.
+
+    Python-tagged or untagged blocks are kept and joined; text without fences is returned as is.
+    """
+    text = text or ""
+    if "```" not in text:
+        return text
+    blocks = [body for language, body in FENCE.findall(text) if language.lower() in PYTHON_FENCES]
+    if blocks:
+        return "\n\n".join(block.strip("\n") for block in blocks) + "\n"
+    # an unterminated fence: just drop the fence lines
+    return "\n".join(line for line in text.splitlines() if not line.lstrip().startswith("```")) + "\n"
+
+
+def defined_names(tree: ast.AST) -> set[str]:
+    """Every function, method and class defined anywhere in the module."""
+    return {
+        node.name
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    }
+
+
+def top_level_names(tree: ast.Module) -> set[str]:
+    """Names a `from module import name` can resolve: top-level definitions, assignments and imports."""
+    names = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                names.update(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+    return names
+
+
+def backend_section(design: str) -> str:
+    """The parts of the design under a backend heading; without one, everything not under a frontend/test heading."""
+    headings = list(HEADING.finditer(design))
+    has_backend = any(BACKEND_HEADING.search(h.group(2)) and not OTHER_HEADING.search(h.group(2)) for h in headings)
+    # text before the first heading only counts when no section is explicitly about the backend
+    parts = [] if has_backend else [design[: headings[0].start()] if headings else design]
+    stack: list[tuple[int, bool]] = []  # (heading level, section included)
+    for index, heading in enumerate(headings):
+        level, title = len(heading.group(1)), heading.group(2)
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        inherited = stack[-1][1] if stack else not has_backend
+        if OTHER_HEADING.search(title):
+            included = False
+        elif BACKEND_HEADING.search(title):
+            included = True
+        else:
+            included = inherited
+        stack.append((level, included))
+        if included:
+            end = headings[index + 1].start() if index + 1 < len(headings) else len(design)
+            parts.append(design[heading.end() : end])
+    return "\n".join(parts)
+
+
+def design_names(design: Optional[str]) -> list[str]:
+    """Functions and classes whose signatures the backend part of the design spells out, in order of appearance.
+
+    Only `def name(` / `class Name` signatures count; names in headings and prose, and
+    anything under a frontend or test heading, are left to the LLM reviewer.
+    """
+    names = []
+    for function, cls in SIGNATURE.findall(backend_section(design or "")):
+        name = function or cls
+        if name not in names and not hasattr(builtins, name) and not name.startswith("__"):
+            names.append(name)
+    return names
+
+
+def _parse(code: str, filename: str) -> tuple[Optional[ast.Module], list[str]]:
+    try:
+        tree = ast.parse(code, filename)
+        compile(tree, filename, "exec")  # catches what parses but cannot compile, e.g. `return` outside a function
+        return tree, []
+    except SyntaxError as e:
+        line = (e.text or "").strip()
+        return None, [f"`{filename}` does not compile: {e.msg} at line {e.lineno}" + (f": `{line}`" if line else "")]
+    except ValueError as e:  # e.g. null bytes
+        return None, [f"`{filename}` does not compile: {e}"]
+
+
+def static_review_backend(code: str, design: Optional[str] = None) -> list[str]:
+    """Problems found in the backend without running it: syntax errors and design functions it lacks."""
+    tree, problems = _parse(code, "backend.py")
+    if tree is None:
+        return problems
+    if not tree.body:
+        return ["`backend.py` is empty."]
+    missing = [name for name in design_names(design) if name not in defined_names(tree)]
+    if missing:
+        problems.append(
+            "Functions or classes from the design are not implemented: "
+            + ", ".join(f"`{name}`" for name in missing)
+        )
+    return problems
+
+
+def static_review_frontend(code: str, backend_code: Optional[str] = None, module_name: str = "") -> list[str]:
+    """Problems found in the frontend without running it: syntax errors and imports the backend cannot satisfy."""
+    tree, problems = _parse(code, "app.py")
+    if tree is None:
+        return problems
+
+    backend_tree = None
+    try:
+        backend_tree = ast.parse(backend_code or "")
+    except SyntaxError:
+        pass
+    available = top_level_names(backend_tree) if backend_tree is not None else None
+
+    uses_backend = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            modules = [node.module or ""]
+        else:
+            continue
+        for module in modules:
+            top = module.split(".")[0]
+            if top == "backend":
+                uses_backend = True
+                if isinstance(node, ast.ImportFrom) and available is not None:
+                    missing = [a.name for a in node.names if a.name != "*" and a.name not in available]
+                    if missing:
+                        problems.append(
+                            f"Line {node.lineno} imports {', '.join(f'`{name}`' for name in missing)} "
+                            "from `backend`, which does not define them."
+                        )
+            elif module_name and top == module_name:
+                problems.append(
+                    f"Line {node.lineno} imports `{module}`; the backend module is named `backend`."
+                )
+    if not uses_backend:
+        problems.append("`app.py` never imports the `backend` module, so the UI is not wired to the backend.")
+    return problems
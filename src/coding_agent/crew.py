@@ -2,15 +2,27 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
-from litellm import Field
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import datetime
 
+from .flow_log import agent_verbose
+
 class CodeReviewFeedback(BaseModel):
     code_being_reviewed: str = Field(description="the snippet of code being reviewed")
     review_comments_markdown: str = Field(description="Review comments in markdown format")
     review_timestamp: datetime.datetime = Field(description="Timestamp when review was performed")
     passed_review: bool = Field(description="Does the code pass your review or not?")
+    open_items: list[str] = Field(default=[], description="Comments the engineer still has to act on, one per item")
+
+
+class ReviewVerdict(BaseModel):
+    """The part of a CodeReviewFeedback the reviewer writes; the code and timestamp are filled in locally."""
+    review_comments_markdown: str = Field(description="Review comments in markdown format")
+    passed_review: bool = Field(description="Does the code pass your review or not?")
+    open_items: list[str] = Field(
+        default=[],
+        description="Every comment the engineer still has to act on, one per item (resolved points and praise left out)",
+    )
 
 
 @CrewBase
@@ -25,23 +37,23 @@ class EngineeringCrew():
 
     @agent
     def development_lead(self) -> Agent:
-        return Agent(config=self.agents_config["development_lead"], verbose=True)  # type: ignore[index]
+        return Agent(config=self.agents_config["development_lead"], verbose=agent_verbose("development_lead"))  # type: ignore[index]
     
     @agent
     def backend_engineer(self) -> Agent:
-        return Agent(config=self.agents_config["backend_engineer"], verbose=True) # type: ignore[index]
+        return Agent(config=self.agents_config["backend_engineer"], verbose=agent_verbose("backend_engineer")) # type: ignore[index]
 
     @agent
     def code_reviewer(self) -> Agent:
-        return Agent(config=self.agents_config["code_reviewer"], verbose=True, output_pydantic= CodeReviewFeedback) # type: ignore[index]
+        return Agent(config=self.agents_config["code_reviewer"], verbose=agent_verbose("code_reviewer")) # type: ignore[index]
     
     @agent
     def frontend_engineer(self) -> Agent:
-        return Agent(config=self.agents_config["frontend_engineer"], verbose=True) # type: ignore[index]
+        return Agent(config=self.agents_config["frontend_engineer"], verbose=agent_verbose("frontend_engineer")) # type: ignore[index]
 
     @agent
     def test_engineer(self) -> Agent:
-        return Agent(config=self.agents_config["test_engineer"], verbose=True) # type: ignore[index]
+        return Agent(config=self.agents_config["test_engineer"], verbose=agent_verbose("test_engineer")) # type: ignore[index]
 
     @task
     def design_task(self) -> Task:
@@ -53,11 +65,11 @@ class EngineeringCrew():
 
     @task
     def code_review_task(self) -> Task:
-        return Task(config=self.tasks_config["code_review_task"], verbose=True, output_pydantic=CodeReviewFeedback) # type: ignore[index]
+        return Task(config=self.tasks_config["code_review_task"], verbose=True) # type: ignore[index]
 
     @task
     def frontend_code_review_task(self) -> Task:
-        return Task(config=self.tasks_config["frontend_code_review_task"], verbose=True, output_pydantic=CodeReviewFeedback) # type: ignore[index]
+        return Task(config=self.tasks_config["frontend_code_review_task"], verbose=True) # type: ignore[index]
 
     @task
     def test_preparation_task(self) -> Task:
@@ -0,0 +1,51 @@
+"""Process-wide prototypes of the EngineeringCrew agents and tasks."""
+import threading
+from typing import Optional
+
+from crewai import Agent, Task
+
+from .crew import EngineeringCrew
+
+
+class CrewRegistry:
+    """Builds every agent and task of EngineeringCrew once and hands out cheap clones.
+
+    Instantiating EngineeringCrew re-reads agents.yaml/tasks.yaml and constructs fresh
+    Agent/Task objects; @agent's memoization also keeps each of those instances alive
+    for the life of the process. The registry pays that cost once and clones the
+    templates per kickoff, so per-run interpolation never touches the shared templates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._crew: Optional[EngineeringCrew] = None
+        self._agents: dict[str, Agent] = {}
+        self._tasks: dict[str, Task] = {}
+        self._task_mapping: dict[str, Task] = {}
+
+    def _templates(self) -> EngineeringCrew:
+        if self._crew is None:
+            with self._lock:
+                if self._crew is None:
+                    crew = EngineeringCrew()
+                    self._agents = {name: getattr(crew, name)() for name in crew.agents_config}
+                    self._tasks = {name: getattr(crew, name)() for name in crew.tasks_config}
+                    self._task_mapping = {task.key: task for task in self._tasks.values()}
+                    self._crew = crew
+        return self._crew
+
+    def preload(self):
+        self._templates()
+
+    def agent(self, agent_name: str) -> Agent:
+        self._templates()
+        return self._agents[agent_name].copy()
+
+    def build(self, agent_name: str, task_name: str) -> tuple[Agent, Task]:
+        """Returns a fresh agent and a fresh task assigned to it."""
+        agent = self.agent(agent_name)
+        task = self._tasks[task_name].copy([agent], self._task_mapping)
+        return agent, task
+
+
+crew_registry = CrewRegistry()
@@ -0,0 +1,197 @@
+"""Local similarity index over past requirements, used to reuse or adapt earlier designs.
+
+Every generated module is stored as a MinHash signature of its business requirement
+(word unigrams and bigrams) plus a hash of the normalized requirement text. Only the
+low 16 bits of each minimum are kept (b-bit MinHash), which halves the memory a
+lookup scans at a negligible 1/65536 chance of false agreement. A lookup compares the
+query signature with all stored ones in a single vectorized NumPy operation, a few
+milliseconds for 50,000 modules.
+The index lives in an append-only JSONL file, so entries added by other processes
+(flow workers) are picked up on the next lookup.
+"""
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from . import settings
+from .checkpoint import FlowCheckpoint
+
+WORD = re.compile(r"\w+")
+
+
+class DesignMatch(BaseModel):
+    module_name: str
+    requirement: str
+    design: str
+    similarity: float
+    exact: bool
+
+
+def normalize(requirement: str) -> str:
+    return " ".join(WORD.findall((requirement or "").lower()))
+
+
+def requirement_hash(requirement: str) -> str:
+    return hashlib.sha256(normalize(requirement).encode("utf-8")).hexdigest()
+
+
+def shingles(requirement: str) -> np.ndarray:
+    """64-bit hashes of the requirement's words and word pairs."""
+    words = normalize(requirement).split()
+    grams = set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little") for g in grams],
+        dtype=np.uint64,
+    )
+
+
+class DesignIndex:
+    """MinHash index of {module_name: requirement}; designs are read from output/{module}/design.md."""
+
+    def __init__(self, root: str = "output", directory: str = ".cache/design_index", num_perm: int = 128, seed: int = 1):
+        if num_perm % 8 or num_perm >= 8 * 256:
+            raise ValueError("num_perm must be a multiple of 8 below 2048")
+        self.root = Path(root)
+        self.path = Path(directory) / "index.jsonl"
+        self.num_perm = num_perm
+        rng = np.random.default_rng(seed)
+        # multiply-shift hashing: h(x) = (a * x + b) >> 32 with odd a, wrapping in 64 bits
+        self._a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._signatures = np.empty((0, num_perm), dtype=np.uint16)
+        self._modules: list[str] = []
+        self._requirements: list[str] = []
+        self._rows: dict[str, int] = {}  # module -> its latest row; earlier rows are masked out
+        self._exact: dict[str, int] = {}  # requirement hash -> latest row
+        self._live = np.empty(0, dtype=bool)
+
+    def signature(self, requirement: str) -> np.ndarray:
+        hashes = shingles(requirement)
+        if hashes.size == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint16).max, dtype=np.uint16)
+        with np.errstate(over="ignore"):
+            values = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return (values.min(axis=1) & np.uint64(0xFFFF)).astype(np.uint16)
+
+    def _agreement(self, signature: np.ndarray) -> np.ndarray:
+        """Number of positions where each stored signature equals `signature`."""
+        equal = self._signatures == signature
+        # sum the booleans 8 at a time as uint64 words: every byte lane counts at most num_perm / 8
+        # matches, so lanes never carry into each other and their sum is the row total
+        lanes = equal.view(np.uint64).sum(axis=1, dtype=np.uint64)
+        return lanes.view(np.uint8).reshape(-1, 8).sum(axis=1, dtype=np.int64)
+
+    def _sync(self):
+        """Loads entries appended since the last call, bootstrapping from output/ the first time."""
+        if not self.path.exists():
+            self._bootstrap()
+            if not self.path.exists():
+                return
+        if self.path.stat().st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # only complete lines; a line still being written is read next time
+        data = data[: data.rfind(b"\n") + 1]
+        self._offset += len(data)
+        entries = [json.loads(line) for line in data.splitlines() if line.strip()]
+        if not entries:
+            return
+
+        start = len(self._modules)
+        signatures = np.stack([np.frombuffer(bytes.fromhex(e["signature"]), dtype=np.uint16) for e in entries])
+        self._signatures = np.concatenate([self._signatures, signatures])
+        self._live = np.concatenate([self._live, np.ones(len(entries), dtype=bool)])
+        for row, entry in enumerate(entries, start):
+            previous = self._rows.get(entry["module_name"])
+            if previous is not None:
+                self._live[previous] = False
+            self._rows[entry["module_name"]] = row
+            self._exact[entry["hash"]] = row
+            self._modules.append(entry["module_name"])
+            self._requirements.append(entry["requirement"])
+
+    def _bootstrap(self):
+        """Indexes the modules generated before the index existed (requirement from their checkpoint)."""
+        if not self.root.is_dir():
+            return
+        lines = []
+        for design_path in sorted(self.root.glob("*/design.md")):
+            module_name = design_path.parent.name
+            records = FlowCheckpoint(module_name, str(self.root)).records()
+            requirement = records[-1]["state"].get("business_requirement") if records else None
+            if requirement:
+                lines.append(self._entry(module_name, requirement))
+        if lines:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+
+    def _entry(self, module_name: str, requirement: str) -> str:
+        return json.dumps(
+            {
+                "module_name": module_name,
+                "requirement": requirement,
+                "hash": requirement_hash(requirement),
+                "signature": self.signature(requirement).tobytes().hex(),
+            }
+        ) + "\n"
+
+    def add(self, module_name: str, requirement: str):
+        """Records the requirement a module's design.md was generated for."""
+        with self._lock:
+            self._sync()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(self._entry(module_name, requirement))
+
+    def _design(self, row: int) -> Optional[str]:
+        try:
+            return (self.root / self._modules[row] / "design.md").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def lookup(self, requirement: str, threshold: float) -> Optional[DesignMatch]:
+        """The most similar earlier module whose estimated Jaccard similarity reaches `threshold`."""
+        with self._lock:
+            self._sync()
+            if not self._modules:
+                return None
+            row = self._exact.get(requirement_hash(requirement))
+            if row is not None and self._live[row] and (design := self._design(row)) is not None:
+                return DesignMatch(
+                    module_name=self._modules[row],
+                    requirement=self._requirements[row],
+                    design=design,
+                    similarity=1.0,
+                    exact=True,
+                )
+
+            similarities = self._agreement(self.signature(requirement)) / self.num_perm
+            similarities[~self._live] = -1
+            candidates = np.argpartition(similarities, -min(5, len(similarities)))[-5:]
+            for row in candidates[np.argsort(similarities[candidates])[::-1]]:
+                if similarities[row] < threshold:
+                    break
+                design = self._design(row)
+                if design is not None:
+                    return DesignMatch(
+                        module_name=self._modules[row],
+                        requirement=self._requirements[row],
+                        design=design,
+                        similarity=round(float(similarities[row]), 3),
+                        exact=False,
+                    )
+        return None
+
+
+design_index = DesignIndex(directory=settings.DESIGN_INDEX_DIR)
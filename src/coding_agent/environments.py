@@ -0,0 +1,222 @@
+"""Shared, dependency-cached virtualenvs and pre-warmed interpreters for running generated projects.
+
+A project's third-party imports are inferred with pipreqs and hashed; every project
+with the same requirement set runs in the same venv under RUN_ENV_DIR, created once
+(with uv when it is installed, else venv + pip). For recently used venvs a few
+interpreters are kept started with the requirements already imported, waiting on
+stdin for the script to run, so launching a project does not pay for interpreter
+start-up or for importing gradio.
+"""
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from . import settings
+from .flow_log import flow_log
+from .process_runs import ProcessRun, process_runs
+
+# Runs inside a pooled interpreter: import the requirements up front, then wait for
+# {"cwd", "script", "env"} on stdin and execute the script as __main__.
+BOOTSTRAP = """
+import importlib, json, os, runpy, sys
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except Exception:
+        pass
+job = json.loads(sys.stdin.readline() or "null")
+if job is None:
+    sys.exit(0)
+os.environ.update(job["env"])
+os.chdir(job["cwd"])
+sys.path.insert(0, job["cwd"])
+sys.argv = [job["script"]]
+runpy.run_path(job["script"], run_name="__main__")
+"""
+
+
+class Requirements(BaseModel):
+    imports: list[str]  # top-level modules imported by the project
+    packages: list[str]  # the PyPI distributions providing them
+
+    @property
+    def key(self) -> str:
+        """Hash identifying the venv these requirements run in."""
+        sha = hashlib.sha256(f"{sys.version_info.major}.{sys.version_info.minor}".encode())
+        for package in self.packages:
+            sha.update(b"\0" + package.lower().replace("_", "-").encode())
+        return sha.hexdigest()[:16]
+
+
+def infer_requirements(project_path: str) -> Requirements:
+    """Third-party imports of the project's .py files (local modules and the stdlib excluded)."""
+    from pipreqs import pipreqs
+
+    imports = sorted(set(pipreqs.get_all_imports(project_path)))
+    return Requirements(imports=imports, packages=sorted(set(pipreqs.get_pkg_names(imports))))
+
+
+class EnvironmentCache:
+    """One venv per requirement hash at {root}/{hash}, marked ready once installed."""
+
+    def __init__(self, root: str):
+        self.root = Path(root).absolute()  # interpreters are started from other working directories
+        self._lock = threading.Lock()
+        self._locks: dict[str, threading.Lock] = {}
+
+    def python(self, key: str) -> Path:
+        return self.root / key / "bin" / "python"
+
+    def is_ready(self, key: str) -> bool:
+        return (self.root / key / ".ready").exists()
+
+    def ensure(self, requirements: Requirements) -> Path:
+        """Returns the interpreter of the venv for `requirements`, creating it on first use."""
+        key = requirements.key
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if not self.is_ready(key):
+                self._create(key, requirements)
+        return self.python(key)
+
+    def _create(self, key: str, requirements: Requirements):
+        path = self.root / key
+        shutil.rmtree(path, ignore_errors=True)  # leftovers of an interrupted install
+        path.mkdir(parents=True)
+        (path / "requirements.txt").write_text("\n".join(requirements.packages) + "\n", encoding="utf-8")
+        python = str(self.python(key))
+        flow_log.info("environment_create", key=key, packages=", ".join(requirements.packages) or "(no packages)")
+
+        uv = shutil.which("uv")
+        if uv:
+            subprocess.run([uv, "venv", "--quiet", "--python", sys.executable, str(path)], check=True)
+            if requirements.packages:
+                subprocess.run([uv, "pip", "install", "--quiet", "--python", python, *requirements.packages], check=True)
+        else:
+            subprocess.run([sys.executable, "-m", "venv", str(path)], check=True)
+            if requirements.packages:
+                subprocess.run([python, "-m", "pip", "install", "--quiet", *requirements.packages], check=True)
+        (path / ".ready").write_text(json.dumps(requirements.model_dump()), encoding="utf-8")
+
+
+def _app_env(python: Path) -> dict[str, str]:
+    """A minimal environment for generated code: none of the server's variables (API keys etc.)."""
+    bin_dir = Path(os.path.abspath(python.parent))
+    venv = bin_dir.parent
+    return {
+        "PATH": os.pathsep.join([str(bin_dir), os.environ.get("PATH", os.defpath)]),
+        "HOME": os.environ.get("HOME", str(venv)),
+        "LANG": os.environ.get("LANG", "C.UTF-8"),
+        "VIRTUAL_ENV": str(venv),
+        "PYTHONUNBUFFERED": "1",
+    }
+
+
+def _popen(python: Path, imports: list[str]) -> subprocess.Popen:
+    # start_new_session puts the interpreter (and anything it spawns) in its own process group
+    return subprocess.Popen(
+        [str(python), "-u", "-c", BOOTSTRAP, *imports],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        env=_app_env(python),
+        start_new_session=True,
+    )
+
+
+class InterpreterPool:
+    """Keeps `size` idle interpreters for each of the `max_envs` most recently used venvs."""
+
+    def __init__(self, size: int, max_envs: int):
+        self.size = size
+        self.max_envs = max_envs
+        self._idle: OrderedDict[str, list[subprocess.Popen]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> Optional[subprocess.Popen]:
+        """An idle interpreter for the venv, or None when none is warm."""
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                process = idle.pop()
+                if process.poll() is None:
+                    return process
+        return None
+
+    def refill(self, key: str, python: Path, imports: list[str]):
+        """Tops the venv's idle interpreters up to `size` in the background, dropping the least recently used venvs."""
+        if self.size <= 0:
+            return
+
+        def fill():
+            with self._lock:
+                self._idle.setdefault(key, [])
+                self._idle.move_to_end(key)
+                evicted = []
+                while len(self._idle) > self.max_envs:
+                    evicted.extend(self._idle.popitem(last=False)[1])
+                missing = self.size - len(self._idle[key])
+            for process in evicted:
+                _kill_group(process)
+            for _ in range(missing):
+                process = _popen(python, imports)
+                with self._lock:
+                    self._idle.setdefault(key, []).append(process)
+
+        threading.Thread(target=fill, name=f"interpreter-pool-{key[:8]}", daemon=True).start()
+
+    def shutdown(self):
+        with self._lock:
+            processes = [process for idle in self._idle.values() for process in idle]
+            self._idle.clear()
+        for process in processes:
+            _kill_group(process)
+
+
+def _kill_group(process: subprocess.Popen, sig: int = signal.SIGKILL):
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+class ProjectRunner:
+    """Starts a project's script in its cached venv, from the warm pool when possible."""
+
+    def __init__(self, environments: EnvironmentCache, pool: InterpreterPool):
+        self.environments = environments
+        self.pool = pool
+
+    def prepare(self, project_path: str) -> tuple[Requirements, Path]:
+        """Infers the requirements and makes sure their venv exists (slow only the first time)."""
+        requirements = infer_requirements(project_path)
+        return requirements, self.environments.ensure(requirements)
+
+    def launch(self, project: str, project_path: str, script: str = "app.py", env: Optional[dict] = None) -> ProcessRun:
+        requirements, python = self.prepare(project_path)
+        process = self.pool.acquire(requirements.key) or _popen(python, requirements.imports)
+        job = {"cwd": os.path.abspath(project_path), "script": script, "env": env or {}}
+        process.stdin.write(json.dumps(job) + "\n")
+        process.stdin.close()
+        self.pool.refill(requirements.key, python, requirements.imports)
+        return process_runs.attach(project, process)
+
+
+interpreter_pool = InterpreterPool(settings.RUN_POOL_SIZE, settings.RUN_POOL_MAX_ENVS)
+project_runner = ProjectRunner(EnvironmentCache(settings.RUN_ENV_DIR), interpreter_pool)
+atexit.register(interpreter_pool.shutdown)
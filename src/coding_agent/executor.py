@@ -0,0 +1,427 @@
+"""Bounded worker pool that admits EngineeringFlow runs into a fixed number of slots."""
+import asyncio
+import heapq
+import itertools
+import math
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from pydantic import BaseModel
+
+from . import settings
+from .flow_log import flow_log
+from .metrics import Span, metrics_registry
+from .shared_queue import TaskInfo, event_bus
+from .warmup import startup_timer
+
+
+class BacklogFullError(RuntimeError):
+    """Raised when a run is submitted while the waiting queue is at capacity."""
+
+
+class FlowJob(BaseModel):
+    run_id: str
+    module_name: str
+    business_requirement: str
+    priority: int = 0
+    # seconds the job waited for a slot, filled in when it is admitted
+    queue_wait: float = 0.0
+    # continue the module's flow from its checkpoint instead of starting over
+    resume: bool = False
+
+
+class FlowTicket:
+    """Handle on a submitted run: its queue position, lifecycle events and outcome."""
+
+    def __init__(self, job: FlowJob, executor: "FlowExecutor"):
+        self.job = job
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self._executor = executor
+
+    @property
+    def queue_wait(self) -> float:
+        return (self.started_at or time.monotonic()) - self.submitted_at
+
+    def position(self) -> int:
+        """1-based position in the waiting queue, or 0 once the run holds a slot."""
+        return self._executor.position(self)
+
+    def eta(self) -> float:
+        """Estimated seconds until the run gets a slot."""
+        return self._executor.eta(self)
+
+
+def _current_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _process_worker_main(conn):
+    """Entry point of a flow worker process: runs jobs received over `conn`.
+
+    Events the flow publishes on the child's own event bus are relayed back over the
+    pipe as ("event", TaskInfo dict) messages; each job ends with a ("done", ...) message.
+    """
+    from .crew_registry import crew_registry
+    from .main import EngineeringFlow
+
+    crew_registry.preload()
+    while True:
+        try:
+            payload = conn.recv()
+        except EOFError:
+            return
+        if payload is None:
+            return
+
+        job = FlowJob(**payload)
+        channel = event_bus.open(job.run_id)
+        finished = threading.Event()
+
+        def relay():
+            while not finished.is_set() or not channel.empty():
+                task = channel.get(timeout=settings.EVENT_POLL_TIMEOUT)
+                if task is not None:
+                    conn.send(("event", task.model_dump(mode="json")))
+
+        relay_thread = threading.Thread(target=relay, daemon=True)
+        relay_thread.start()
+        error = None
+        try:
+            EngineeringFlow(
+                job.module_name,
+                job.business_requirement,
+                run_id=job.run_id,
+                queue_wait=job.queue_wait,
+                resume=job.resume,
+            ).kickoff()
+        except Exception:
+            error = traceback.format_exc()
+        finally:
+            finished.set()
+            relay_thread.join()
+            event_bus.close(job.run_id)
+        conn.send(("done", {"error": error, "rss": _current_rss()}))
+
+
+def _log_failure(ticket: FlowTicket):
+    # the exception line at ERROR; the end of the traceback (LOG_MAX_FIELD_CHARS) with LOG_LEVEL=DEBUG
+    error = ticket.error.strip()
+    flow_log.error("flow_failed", run_id=ticket.job.run_id, module=ticket.job.module_name, error=error.splitlines()[-1])
+    flow_log.debug("flow_traceback", run_id=ticket.job.run_id, traceback=error[-settings.LOG_MAX_FIELD_CHARS :])
+
+
+class ProcessWorker:
+    """Child process bound to one executor slot, recycled after `max_tasks` runs or `max_rss` bytes."""
+
+    def __init__(self, max_tasks: int, max_rss: int):
+        self.max_tasks = max_tasks
+        self.max_rss = max_rss
+        self.tasks = 0
+        self.recycled = 0
+        self._process = None
+        self._conn = None
+
+    def _spawn(self):
+        # spawn rather than fork: the parent is a threaded web server.
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_process_worker_main, args=(child_conn,), daemon=True)
+        self._process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self):
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+        except OSError:
+            pass
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._conn.close()
+        self._process = None
+        self._conn = None
+        self.recycled += 1
+
+    def start(self):
+        if self._process is None or not self._process.is_alive():
+            self._spawn()
+
+    def run(self, job: FlowJob):
+        self.start()
+        self._conn.send(job.model_dump())
+        try:
+            while True:
+                kind, payload = self._conn.recv()
+                if kind == "event":
+                    startup_timer.mark("first_flow")
+                    task = TaskInfo(**payload)
+                    if task.type == "span":
+                        # the child's registry is not served; aggregate its spans here.
+                        metrics_registry.observe(Span.model_validate_json(task.output))
+                    event_bus.publish(job.run_id, task)
+                elif kind == "done":
+                    break
+        except (EOFError, OSError):
+            self.stop()
+            raise RuntimeError(f"Flow worker process died while running {job.run_id}")
+
+        self.tasks += 1
+        if self.tasks >= self.max_tasks or payload["rss"] > self.max_rss:
+            self.stop()
+        if payload["error"]:
+            raise RuntimeError(f"Flow {job.run_id} failed in worker process:\n{payload['error']}")
+
+
+class SlotStats:
+    def __init__(self):
+        self.runs = 0
+        self.busy_seconds = 0.0
+        self.current_run: Optional[str] = None
+        self.current_since: Optional[float] = None
+
+
+class FlowExecutor:
+    """Runs at most `max_concurrent` flows at once; further runs wait in a priority queue.
+
+    Higher `FlowJob.priority` values are admitted first, equal priorities in FIFO order.
+    Submissions beyond `max_backlog` waiting runs are rejected with BacklogFullError.
+    In "thread" mode flows run on the slot threads themselves; in "process" mode each
+    slot hands its flows to a recycled ProcessWorker. In "async" mode slots are only
+    bookkeeping: every admitted flow is a task on one shared event loop, and the
+    loop's default executor (`async_threads` threads) carries the blocking crew
+    kickoffs, so a waiting flow holds no thread.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_backlog: int,
+        default_duration: float,
+        mode: str = "thread",
+        worker_max_tasks: int = 20,
+        worker_max_rss: int = 2048 * 1024 * 1024,
+        async_threads: int = 256,
+    ):
+        if mode not in ("thread", "process", "async"):
+            raise ValueError(f"Unknown flow execution mode: {mode}")
+        self.max_concurrent = max_concurrent
+        self.max_backlog = max_backlog
+        self.default_duration = default_duration
+        self.mode = mode
+        self.async_threads = async_threads
+        self.created_at = time.monotonic()
+        self.slots = [SlotStats() for _ in range(max_concurrent)]
+        self.process_workers = (
+            [ProcessWorker(worker_max_tasks, worker_max_rss) for _ in range(max_concurrent)]
+            if mode == "process"
+            else []
+        )
+        self._waiting: list[tuple[int, int, FlowTicket]] = []
+        self._sequence = itertools.count()
+        self._durations: deque[float] = deque(maxlen=20)
+        self._cond = threading.Condition()
+        self._workers: list[threading.Thread] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: set[asyncio.Task] = set()  # the loop only keeps weak references to its tasks
+
+    def _ensure_workers(self):
+        if self._workers:
+            return
+        if self.mode == "async":
+            self._loop = asyncio.new_event_loop()
+            self._loop.set_default_executor(ThreadPoolExecutor(self.async_threads, thread_name_prefix="flow-io"))
+            worker = threading.Thread(target=self._loop.run_forever, name="flow-loop", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+            return
+        for index in range(self.max_concurrent):
+            worker = threading.Thread(target=self._work, args=(index,), name=f"flow-slot-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def prestart(self):
+        """Starts the slot threads (the event loop in async mode) and, in process mode, spawns every worker process."""
+        with self._cond:
+            self._ensure_workers()
+        for worker in self.process_workers:
+            worker.start()
+
+    def submit(self, job: FlowJob) -> FlowTicket:
+        with self._cond:
+            if len(self._waiting) >= self.max_backlog:
+                raise BacklogFullError(f"{len(self._waiting)} runs are already waiting (limit {self.max_backlog})")
+            self._ensure_workers()
+            ticket = FlowTicket(job, self)
+            heapq.heappush(self._waiting, (-job.priority, next(self._sequence), ticket))
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._dispatch)
+            else:
+                self._cond.notify()
+            return ticket
+
+    def position(self, ticket: FlowTicket) -> int:
+        with self._cond:
+            for index, (_, _, waiting) in enumerate(sorted(self._waiting)):
+                if waiting is ticket:
+                    return index + 1
+            return 0
+
+    def average_duration(self) -> float:
+        with self._cond:
+            if not self._durations:
+                return self.default_duration
+            return sum(self._durations) / len(self._durations)
+
+    def eta(self, ticket: FlowTicket) -> float:
+        position = self.position(ticket)
+        if position == 0:
+            return 0.0
+        return math.ceil(position / self.max_concurrent) * self.average_duration()
+
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        uptime = max(now - self.created_at, 1e-9)
+        with self._cond:
+            slots = []
+            for index, slot in enumerate(self.slots):
+                busy = slot.busy_seconds + (now - slot.current_since if slot.current_since else 0.0)
+                slots.append(
+                    {
+                        "slot": index,
+                        "runs": slot.runs,
+                        "busy_seconds": round(busy, 3),
+                        "utilization": round(busy / uptime, 4),
+                        "current_run": slot.current_run,
+                    }
+                )
+                if self.process_workers:
+                    slots[-1]["worker_recycles"] = self.process_workers[index].recycled
+            return {
+                "mode": self.mode,
+                "max_concurrent": self.max_concurrent,
+                "running": sum(1 for slot in self.slots if slot.current_run),
+                "waiting": len(self._waiting),
+                "max_backlog": self.max_backlog,
+                "average_duration": round(self.average_duration(), 3) if self._durations else None,
+                "slots": slots,
+            }
+
+    def _admit(self, index: int) -> FlowTicket:
+        """Moves the next waiting run into slot `index`; called with the condition held."""
+        slot = self.slots[index]
+        _, _, ticket = heapq.heappop(self._waiting)
+        ticket.started_at = time.monotonic()
+        slot.current_run = ticket.job.run_id
+        slot.current_since = ticket.started_at
+        ticket.job.queue_wait = ticket.queue_wait
+        return ticket
+
+    def _finish(self, index: int, ticket: FlowTicket):
+        slot = self.slots[index]
+        ticket.finished_at = time.monotonic()
+        duration = ticket.finished_at - ticket.started_at
+        with self._cond:
+            slot.runs += 1
+            slot.busy_seconds += duration
+            slot.current_run = None
+            slot.current_since = None
+            self._durations.append(duration)
+        ticket.done.set()
+
+    def _work(self, index: int):
+        while True:
+            with self._cond:
+                while not self._waiting:
+                    self._cond.wait()
+                ticket = self._admit(index)
+            ticket.started.set()
+
+            try:
+                self._run(index, ticket.job)
+            except Exception:
+                ticket.error = traceback.format_exc()
+                _log_failure(ticket)
+            finally:
+                self._finish(index, ticket)
+
+    def _dispatch(self):
+        """Starts waiting runs on the event loop while free slots remain (async mode, runs on the loop)."""
+        with self._cond:
+            free = [index for index, slot in enumerate(self.slots) if slot.current_run is None]
+            admitted = [(index, self._admit(index)) for index in free[: len(self._waiting)]]
+        for index, ticket in admitted:
+            task = self._loop.create_task(self._run_async(index, ticket))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_async(self, index: int, ticket: FlowTicket):
+        from .main import EngineeringFlow
+
+        ticket.started.set()
+        job = ticket.job
+        try:
+            flow = EngineeringFlow(
+                job.module_name,
+                job.business_requirement,
+                run_id=job.run_id,
+                queue_wait=job.queue_wait,
+                resume=job.resume,
+            )
+            startup_timer.mark("first_flow")
+            await flow.kickoff_async()
+        except Exception:
+            ticket.error = traceback.format_exc()
+            _log_failure(ticket)
+        finally:
+            self._finish(index, ticket)
+            self._dispatch()
+
+    def _run(self, index: int, job: FlowJob):
+        if self.process_workers:
+            self.process_workers[index].run(job)
+            return
+
+        from .main import EngineeringFlow
+
+        flow = EngineeringFlow(
+            job.module_name,
+            job.business_requirement,
+            run_id=job.run_id,
+            queue_wait=job.queue_wait,
+            resume=job.resume,
+        )
+        startup_timer.mark("first_flow")
+        flow.kickoff()
+
+
+flow_executor = FlowExecutor(
+    settings.FLOW_MAX_CONCURRENT,
+    settings.FLOW_MAX_BACKLOG,
+    settings.FLOW_ETA_DEFAULT,
+    mode=settings.FLOW_EXECUTION_MODE,
+    worker_max_tasks=settings.FLOW_WORKER_MAX_TASKS,
+    worker_max_rss=settings.FLOW_WORKER_MAX_RSS_MB * 1024 * 1024,
+    async_threads=settings.FLOW_ASYNC_THREADS,
+)
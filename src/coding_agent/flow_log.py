@@ -0,0 +1,99 @@
+"""Compact, structured log events for flow runs.
+
+An event is a name plus key=value fields, written as one line (or one JSON object
+with LOG_FORMAT=json). Fields are only rendered when the event's level is enabled,
+and rendering is size-capped: generated code and designs are logged as their length
+and a short hash, other long strings are cut at LOG_MAX_FIELD_CHARS, lists are
+reduced to their count and last item. The flow state therefore costs a few hundred
+bytes per step instead of every code body and review.
+"""
+import hashlib
+import json
+import logging
+import re
+import sys
+import time
+from typing import Any
+
+from pydantic import BaseModel
+
+from . import settings
+
+# fields holding code or design bodies; logged as a hash so runs can still be compared
+BODY_FIELD = re.compile(r"(^|_)(code|design|raw)(_|$)")
+ICONS = {logging.DEBUG: "🔎", logging.INFO: "🧭", logging.WARNING: "⚠️", logging.ERROR: "❌"}
+
+
+def digest(text: str) -> str:
+    return f"<{len(text)} chars sha256:{hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]}>"
+
+
+def summarize(value: Any, name: str = "", max_chars: int = 200) -> Any:
+    """A JSON-serializable, size-capped rendering of `value` (the field called `name`)."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, BaseModel):
+        return {field: summarize(getattr(value, field), field, max_chars) for field in type(value).model_fields}
+    if isinstance(value, dict):
+        return {str(key): summarize(item, str(key), max_chars) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) <= 1:
+            return [summarize(item, name, max_chars) for item in value]
+        return {"count": len(value), "last": summarize(value[-1], name, max_chars)}
+    text = value if isinstance(value, str) else str(value)
+    if text and BODY_FIELD.search(name):
+        return digest(text)
+    if len(text) > max_chars:
+        return f"{text[:max_chars]}…(+{len(text) - max_chars} chars)"
+    return text
+
+
+class FlowLogger:
+    """Levelled event logger; `info("step", step=..., state=flow.state)` formats nothing when INFO is off."""
+
+    def __init__(self, name: str, level: str = "INFO", fmt: str = "text", max_field_chars: int = 200):
+        self.fmt = fmt
+        self.max_field_chars = max_field_chars
+        self._logger = logging.getLogger(name)
+        self._logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+        if not self._logger.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+            self._logger.propagate = False
+
+    def log(self, level: int, event: str, **fields):
+        if not self._logger.isEnabledFor(level):
+            return
+        fields = {key: summarize(value, key, self.max_field_chars) for key, value in fields.items()}
+        if self.fmt == "json":
+            line = json.dumps(
+                {"ts": round(time.time(), 3), "level": logging.getLevelName(level), "event": event, **fields},
+                ensure_ascii=False,
+                default=str,
+            )
+        else:
+            pairs = " ".join(f"{key}={json.dumps(value, ensure_ascii=False, default=str)}" for key, value in fields.items())
+            line = f"{ICONS.get(level, '')} {event} {pairs}".rstrip()
+        self._logger.log(level, line)
+
+    def debug(self, event: str, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event: str, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event: str, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event: str, **fields):
+        self.log(logging.ERROR, event, **fields)
+
+
+def agent_verbose(agent_name: str) -> bool:
+    """Whether crewai's verbose output is on for `agent_name` (AGENT_VERBOSE: "all", "none" or agent names)."""
+    names = {name.strip() for name in settings.AGENT_VERBOSE.split(",") if name.strip()}
+    return "all" in names or agent_name in names
+
+
+flow_log = FlowLogger("coding_agent.flow", settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_MAX_FIELD_CHARS)
@@ -0,0 +1,165 @@
+"""Content-addressed on-disk cache for single-task crew kickoffs.
+
+Entries are keyed on the agent and task YAML config, the model and the prompt inputs,
+so replaying a requirement (or retrying a crashed run) skips LLM calls whose prompt
+has already been answered.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Type
+
+import yaml
+from pydantic import BaseModel
+
+from . import settings
+from .metrics import metrics_registry
+
+CONFIG_DIR = Path(__file__).parent / "config"
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+PROMPT_FIELDS = ("role", "goal", "backstory", "description", "expected_output")
+
+
+class KickoffResult(BaseModel):
+    raw: str
+    pydantic: Optional[Any] = None
+    cached: bool = False
+    # CrewOutput of a fresh kickoff (token usage for metrics); never cached.
+    output: Optional[Any] = None
+
+
+def _load_config(filename: str) -> dict:
+    with open(CONFIG_DIR / filename, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.replace("\r\n", "\n").strip()
+    return value
+
+
+class KickoffCache:
+    """LRU cache of kickoff results, bounded by entry count, total size and idle age."""
+
+    def __init__(self, directory: str, max_entries: int, max_bytes: int, max_age: float):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._configs: dict[str, tuple[float, dict]] = {}
+
+    def _config(self, filename: str) -> dict:
+        mtime = os.path.getmtime(CONFIG_DIR / filename)
+        cached = self._configs.get(filename)
+        if cached is None or cached[0] != mtime:
+            cached = self._configs[filename] = (mtime, _load_config(filename))
+        return cached[1]
+
+    def key(self, agent_name: str, task_name: str, model: str, inputs: dict) -> str:
+        agent_config = self._config("agents.yaml").get(agent_name, {})
+        task_config = self._config("tasks.yaml").get(task_name, {})
+        # Only inputs that actually end up in the prompt take part in the key, so run ids,
+        # iteration counters and output paths don't defeat the cache.
+        referenced = set()
+        for config in (agent_config, task_config):
+            for field in PROMPT_FIELDS:
+                referenced.update(PLACEHOLDER.findall(str(config.get(field, ""))))
+        payload = {
+            "agent": agent_config,
+            "task": {k: v for k, v in task_config.items() if k != "output_file"},
+            "model": model,
+            "inputs": {k: _normalize(v) for k, v in sorted(inputs.items()) if k in referenced},
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str, pydantic_model: Optional[Type[BaseModel]] = None) -> Optional[KickoffResult]:
+        """The cached result, with its structured answer validated as `pydantic_model`; None on a miss.
+
+        An entry that no longer validates (e.g. the model gained a required field) counts as a miss.
+        """
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                raise FileNotFoundError(path)
+            data = json.loads(path.read_text(encoding="utf-8"))
+            parsed = data.get("pydantic")
+            if parsed is not None and pydantic_model is not None:
+                parsed = pydantic_model.model_validate(parsed)
+            os.utime(path)  # mark as most recently used
+        except (OSError, ValueError):  # ValidationError is a ValueError
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return KickoffResult(raw=data["raw"], pydantic=parsed, cached=True)
+
+    def put(self, key: str, result: KickoffResult):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        parsed = result.pydantic
+        if isinstance(parsed, BaseModel):
+            parsed = parsed.model_dump(mode="json")
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({"raw": result.raw, "pydantic": parsed}), encoding="utf-8")
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones until within budget."""
+        entries = []
+        now = time.time()
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and count <= self.max_entries and total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            count -= 1
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+kickoff_cache: Optional[KickoffCache] = (
+    KickoffCache(
+        settings.KICKOFF_CACHE_DIR,
+        settings.KICKOFF_CACHE_MAX_ENTRIES,
+        settings.KICKOFF_CACHE_MAX_BYTES,
+        settings.KICKOFF_CACHE_MAX_AGE,
+    )
+    if settings.KICKOFF_CACHE_ENABLED
+    else None
+)
+if kickoff_cache is not None:
+    # exported on /metrics as coding_agent_kickoff_cache_{hits,misses,evictions}_total
+    metrics_registry.add_counter_source(
+        lambda: {f"coding_agent_kickoff_cache_{key}_total": value for key, value in kickoff_cache.stats().items()}
+    )
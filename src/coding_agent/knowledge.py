@@ -0,0 +1,223 @@
+"""Retrieval over the knowledge/ directory, so tasks get the few chunks relevant to them.
+
+Text files under knowledge/ are split into paragraph-aligned chunks and indexed as
+hashed TF-IDF vectors. The index is kept under KNOWLEDGE_INDEX_DIR as sparse .npy
+arrays (postings sorted by term) that are memory-mapped for lookups. When files change, only those files are
+re-chunked and re-tokenized (per-file results are cached by content hash); the IDF
+weights are then recomputed over the whole corpus, which is a cheap vectorized step.
+A lookup only touches the postings of the query's terms and returns the top chunks
+within a token budget, so prompt size stays flat as the knowledge grows.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from . import settings
+from .flow_log import flow_log
+
+TEXT_SUFFIXES = {".txt", ".md", ".rst", ".py", ".yaml", ".yml", ".json", ".toml", ".csv"}
+TOKEN = re.compile(r"[a-z0-9_]{2,}")
+DIM = 2**20  # hashed feature space; collisions are negligible at this size
+
+
+def tokens(text: str) -> list[str]:
+    return TOKEN.findall(text.lower())
+
+
+def term_counts(text: str) -> tuple[np.ndarray, np.ndarray]:
+    """Hashed term ids of `text` and how often each occurs."""
+    ids = np.array([zlib.crc32(token.encode("utf-8")) & (DIM - 1) for token in tokens(text)], dtype=np.int32)
+    return np.unique(ids, return_counts=True)
+
+
+def chunk_text(text: str, max_words: int) -> list[str]:
+    """Packs consecutive paragraphs into chunks of at most `max_words` words (long paragraphs are split)."""
+    chunks, current, size = [], [], 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = paragraph.split()
+        if not words:
+            continue
+        block = paragraph.strip()
+        while len(words) > max_words:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            chunks.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+            block = " ".join(words)
+        if size + len(words) > max_words and current:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(block)
+        size += len(words)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+class KnowledgeBase:
+    """TF-IDF index over the text files of `root`, rebuilt incrementally when they change."""
+
+    def __init__(self, root: str, directory: str, chunk_words: int = 200, refresh_interval: float = 2.0):
+        self.root = Path(root)
+        self.directory = Path(directory)
+        self.chunk_words = chunk_words
+        self.refresh_interval = refresh_interval
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._snapshot: Optional[dict] = None
+        self._index: Optional[dict] = None
+
+    def _files(self) -> dict[str, list[int]]:
+        """{relative path: [size, mtime_ns]} of the indexable files."""
+        files = {}
+        if self.root.is_dir():
+            for path in sorted(self.root.rglob("*")):
+                if path.suffix.lower() in TEXT_SUFFIXES and path.is_file():
+                    stat = path.stat()
+                    files[path.relative_to(self.root).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+        return files
+
+    def _file_entry(self, relative: str, previous: dict) -> dict:
+        """Chunks and term counts of one file, from the per-file cache when its content is unchanged."""
+        data = (self.root / relative).read_bytes()
+        digest = hashlib.sha256(data + f":{self.chunk_words}".encode()).hexdigest()
+        cache = self.directory / "files" / f"{digest}.npz"
+        if previous.get("sha256") != digest or not cache.exists():
+            chunks = chunk_text(data.decode("utf-8", errors="replace"), self.chunk_words)
+            counted = [term_counts(chunk) for chunk in chunks]
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.npz")
+            np.savez(
+                tmp,
+                chunks=np.array(json.dumps(chunks)),
+                lengths=np.array([len(ids) for ids, _ in counted], dtype=np.int64),
+                ids=np.concatenate([ids for ids, _ in counted]) if counted else np.empty(0, np.int32),
+                counts=np.concatenate([c for _, c in counted]) if counted else np.empty(0, np.int64),
+            )
+            os.replace(tmp, cache)
+        return {"sha256": digest}
+
+    def _build(self, files: dict[str, list[int]], manifest: dict):
+        entries, chunks, sources, rows, ids, counts = {}, [], [], [], [], []
+        for relative, stat in files.items():
+            previous = manifest.get("files", {}).get(relative, {})
+            if previous.get("stat") == stat and (self.directory / "files" / f"{previous['sha256']}.npz").exists():
+                entry = previous
+            else:
+                entry = {**self._file_entry(relative, previous), "stat": stat}
+            entries[relative] = entry
+            with np.load(self.directory / "files" / f"{entry['sha256']}.npz") as cached:
+                file_chunks = json.loads(str(cached["chunks"]))
+                lengths = cached["lengths"]
+                rows.append(np.repeat(np.arange(len(chunks), len(chunks) + len(file_chunks)), lengths))
+                ids.append(cached["ids"])
+                counts.append(cached["counts"])
+            chunks.extend(file_chunks)
+            sources.extend([relative] * len(file_chunks))
+
+        rows = np.concatenate(rows).astype(np.int32) if rows else np.empty(0, np.int32)
+        ids = np.concatenate(ids).astype(np.int32) if ids else np.empty(0, np.int32)
+        counts = np.concatenate(counts).astype(np.float32) if counts else np.empty(0, np.float32)
+        # smoothed idf, sublinear tf, rows normalized to unit length
+        document_frequency = np.bincount(ids, minlength=DIM).astype(np.float32)
+        idf = (np.log((1 + len(chunks)) / (1 + document_frequency)) + 1).astype(np.float32)
+        weights = (1 + np.log(counts)) * idf[ids]
+        norms = np.sqrt(np.bincount(rows, weights=weights**2, minlength=len(chunks))).astype(np.float32)
+        weights = (weights / np.maximum(norms[rows], 1e-12)).astype(np.float32)
+        order = np.argsort(ids, kind="stable")  # postings grouped by term
+        rows, ids, weights = rows[order], ids[order], weights[order]
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        suffix = f"{os.getpid()}.{threading.get_ident()}"
+        for name, array in (("rows", rows), ("ids", ids), ("weights", weights), ("idf", idf)):
+            np.save(self.directory / f"{name}.{suffix}.npy", array)
+            os.replace(self.directory / f"{name}.{suffix}.npy", self.directory / f"{name}.npy")
+        (self.directory / f"chunks.{suffix}.json").write_text(
+            json.dumps({"chunks": chunks, "sources": sources}), encoding="utf-8"
+        )
+        os.replace(self.directory / f"chunks.{suffix}.json", self.directory / "chunks.json")
+        manifest = {"chunk_words": self.chunk_words, "files": entries}
+        (self.directory / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        referenced = {f"{entry['sha256']}.npz" for entry in entries.values()}
+        for path in (self.directory / "files").glob("*.npz"):
+            if path.name not in referenced and path.name.count(".") == 1:  # keep other writers' temp files
+                path.unlink(missing_ok=True)
+        flow_log.info("knowledge_index_rebuilt", files=len(files), chunks=len(chunks))
+
+    def refresh(self):
+        """Rebuilds the on-disk index if files were added, changed or removed, and (re)maps it.
+
+        The directory is scanned at most once per `refresh_interval` seconds.
+        """
+        if self._index is not None and time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = time.monotonic()
+        files = self._files()
+        with self._lock:
+            if files == self._snapshot and self._index is not None:
+                return
+            manifest_path = self.directory / "manifest.json"
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+            current = manifest.get("chunk_words") == self.chunk_words and {
+                relative: entry["stat"] for relative, entry in manifest.get("files", {}).items()
+            } == files
+            if not current or not (self.directory / "chunks.json").exists():
+                self._build(files, manifest if manifest.get("chunk_words") == self.chunk_words else {})
+            chunks = json.loads((self.directory / "chunks.json").read_text(encoding="utf-8"))
+            self._index = {
+                name: np.load(self.directory / f"{name}.npy", mmap_mode="r") for name in ("rows", "ids", "weights", "idf")
+            }
+            self._index.update(chunks)
+            self._snapshot = files
+
+    def search(self, query: str, k: int = 3) -> list[tuple[float, str, str]]:
+        """The `k` chunks most similar to `query` as (score, source file, text), best first."""
+        self.refresh()
+        index = self._index
+        if not index["chunks"]:
+            return []
+        query_ids, query_counts = term_counts(query)
+        if not len(query_ids):
+            return []
+        query_weights = (1 + np.log(query_counts)) * index["idf"][query_ids]
+        starts = np.searchsorted(index["ids"], query_ids, side="left")
+        ends = np.searchsorted(index["ids"], query_ids, side="right")
+        postings = [np.arange(start, end) for start, end in zip(starts, ends) if end > start]
+        if not postings:
+            return []
+        positions = np.concatenate(postings)
+        term_weights = np.repeat(query_weights, ends - starts)
+        scores = np.bincount(
+            index["rows"][positions], weights=index["weights"][positions] * term_weights, minlength=len(index["chunks"])
+        )
+        top = np.argpartition(scores, -min(k, len(scores)))[-k:]
+        return [
+            (float(scores[row]), index["sources"][row], index["chunks"][row])
+            for row in top[np.argsort(scores[top])[::-1]]
+            if scores[row] > 0
+        ]
+
+    def context(self, query: str, k: int = 3, max_tokens: int = 600) -> str:
+        """Top chunks for `query` formatted for a prompt, cut off at roughly `max_tokens` tokens."""
+        parts, budget = [], max_tokens * 4  # ~4 characters per token
+        for _, source, text in self.search(query, k):
+            part = f"[{source}]\n{text}"
+            if len(part) > budget:
+                if not parts:
+                    parts.append(part[:budget])
+                break
+            parts.append(part)
+            budget -= len(part)
+        return "\n\n".join(parts)
+
+
+knowledge_base = KnowledgeBase(settings.KNOWLEDGE_DIR, settings.KNOWLEDGE_INDEX_DIR, settings.KNOWLEDGE_CHUNK_WORDS)
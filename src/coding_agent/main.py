@@ -1,18 +1,35 @@
 #!/usr/bin/env python
+import asyncio
 import datetime
+import sys
 from random import randint
-from datetime import time
+import time
 import random
 from typing import Optional
+from contextlib import nullcontext
+from pathlib import Path
 from crewai import Crew
 from crewai.flow.flow import router, or_
+from crewai.utilities.token_counter_callback import TokenCalcHandler
 from pydantic import BaseModel
 from crewai.flow import Flow, listen, start
-from coding_agent.crew import (
-    CodeReviewFeedback,
-    EngineeringCrew,
-)
+from . import settings
+from .checkpoint import FlowCheckpoint, checkpointed
+from .code_analysis import public_interface, static_review_backend, static_review_frontend, strip_code_fences
+from .crew import CodeReviewFeedback, EngineeringCrew, ReviewVerdict
+from .crew_registry import crew_registry
+from .design_index import DesignMatch, design_index
+from .environments import project_runner
+from .flow_log import flow_log
+from .kickoff_cache import KickoffResult, kickoff_cache
+from .knowledge import knowledge_base
+from .metrics import RunMetrics, Span, metrics_registry
+from .rate_limit import llm_rate_limiter
+from .review_context import estimate_tokens, review_input, unresolved_comments
 from .shared_queue import TaskInfo, add_to_queue
+from .streaming import stream_tokens
+from .structured_output import parse, repair, schema_prompt, supports_schema
+from .test_runner import report_markdown, run_tests, write_report
 
 
 class EngineeringState(BaseModel):
@@ -24,9 +41,15 @@ class EngineeringState(BaseModel):
     unit_test_code: Optional[str] = ""
     backend_code_review_feedbacks: list[CodeReviewFeedback] = []
     frontend_code_review_feedbacks: list[CodeReviewFeedback] = []
+    last_reviewed_backend_code: Optional[str] = ""
+    last_reviewed_frontend_code: Optional[str] = ""
+    prompt_token_usage: list[dict] = []
+    llm_reviews_avoided: int = 0
+    test_report: Optional[dict] = None
 
 
 MAX_REVIEW_ITERATIONS = 3
+STATIC_CHECK_HEADER = "**Static check failed** (found before the LLM review):"
 BUSINESS_REQUIREMENTS: list[EngineeringState] = [
     EngineeringState(
         module_name="mod_series_eval",
@@ -38,15 +61,208 @@ BUSINESS_REQUIREMENTS: list[EngineeringState] = [
 
 
 class EngineeringFlow(Flow[EngineeringState]):
-
-    def __init__(self, module_name:str, business_requirement:str):
+    """Design, build, review and test a module.
+
+    The steps are coroutines that await their LLM calls, so kickoff() runs a flow on an
+    event loop of its own while kickoff_async() lets many flows share one loop.
+    """
+
+    def __init__(
+        self,
+        module_name: str,
+        business_requirement: str,
+        run_id: Optional[str] = None,
+        queue_wait: float = 0.0,
+        resume: bool = False,
+    ):
         super().__init__()
         self.module_name = module_name
         self.business_requirement = business_requirement
+        # events are published to the run's own channel on the event bus, keyed by this id.
+        self.run_id = run_id or self.state.id
+        self.metrics = RunMetrics(self.run_id, module_name, queue_wait)
+        self.checkpoint = FlowCheckpoint(module_name)
+        if resume:
+            self.checkpoint.start_replay()
+
+    def _log_step(self, step: str):
+        """Logs the start of a step; the flow state, size-capped, only at DEBUG level."""
+        flow_log.info("step", run_id=self.run_id, module=self.state.module_name or self.module_name, step=step)
+        flow_log.debug("state", run_id=self.run_id, step=step, state=self.state)
+
+    def _log_review(self, kind: str, feedback: CodeReviewFeedback):
+        flow_log.info(
+            f"{kind}_code_review",
+            run_id=self.run_id,
+            passed=feedback.passed_review,
+            comments=feedback.review_comments_markdown,
+        )
+
+    def checkpoint_restored(self, step: str):
+        add_to_queue(
+            TaskInfo(
+                name="Restored From Checkpoint",
+                type="markdown",
+                output=f"Skipping {step}, restored from checkpoint.",
+            ),
+            self.run_id,
+        )
+
+    async def _kickoff(
+        self, agent_name: str, task_name: str, inputs: dict, iteration: int = 0, output_model=None
+    ) -> KickoffResult:
+        """Runs a single-task crew inside a metrics span, answering from the kickoff cache when it is enabled.
+
+        With an `output_model`, the task is asked for JSON matching its schema and the
+        answer is parsed into `result.pydantic` locally (see structured_output).
+        """
+        agent, task = crew_registry.build(agent_name, task_name)
+        inputs = {**inputs, "knowledge": await self._knowledge(inputs)}
+        if output_model is not None:
+            inputs["output_schema"] = schema_prompt(output_model)
+            if settings.STRUCTURED_OUTPUT_NATIVE and supports_schema(agent.llm):
+                # the agent's llm is a per-clone copy, so this does not touch the prototype
+                agent.llm.response_format = output_model
+        model = getattr(agent.llm, "model", str(agent.llm))
+        span = self.metrics.start(task_name, agent_name, model, iteration)
+        # the cache, knowledge index, design index, checkpoint and metrics files are read and
+        # written off the event loop, so a slow disk does not stall the other flows on it
+        cache_key, result = await asyncio.to_thread(
+            self._cached_result, agent_name, task_name, task, model, inputs, output_model
+        )
+        if result is None:
+            # only real LLM calls count against the global rate limit
+            span.queue_wait += await llm_rate_limiter.acquire_async()
+        started = time.perf_counter()
+        try:
+            if result is None:
+                result = await self._run_crew(task_name, agent, task, inputs)
+                if output_model is not None:
+                    await self._parse_structured(span, agent, result, output_model)
+                if cache_key is not None:
+                    await asyncio.to_thread(kickoff_cache.put, cache_key, result)
+            elif output_model is not None:
+                await self._parse_structured(span, agent, result, output_model)
+        except Exception as e:
+            await asyncio.to_thread(self._record_span, span, started, task.retry_count, error=repr(e))
+            raise
+        span.cached = result.cached
+        await asyncio.to_thread(self._record_span, span, started, task.retry_count, result.output)
+        return result
+
+    async def _parse_structured(self, span: Span, agent, result: KickoffResult, output_model):
+        """Fills `result.pydantic` from the raw answer, with one repair call when local parsing fails.
+
+        The path taken ("native", "parsed", "repaired" or "failed") is recorded on the span.
+        """
+        result.pydantic = parse(result.raw, output_model)
+        if result.pydantic is not None:
+            span.structured_output = "native" if getattr(agent.llm, "response_format", None) is output_model else "parsed"
+            return
+        flow_log.warning("structured_output_invalid", run_id=self.run_id, step=span.step, model=output_model.__name__, raw=result.raw)
+        span.queue_wait += await llm_rate_limiter.acquire_async()
+        token_process = getattr(agent, "_token_process", None)
+        callbacks = [TokenCalcHandler(token_process)] if token_process is not None else None
+        try:
+            result.pydantic = await asyncio.to_thread(repair, agent.llm, result.raw, output_model, callbacks)
+        except Exception as e:
+            flow_log.error("structured_output_repair_failed", run_id=self.run_id, step=span.step, error=repr(e))
+        if token_process is not None and result.output is not None:
+            # the crew's usage was summed before the repair call; include its tokens in the span
+            result.output.token_usage = token_process.get_summary()
+        else:
+            span.llm_calls += 1
+        if result.pydantic is None:
+            span.structured_output = "failed"
+            return
+        span.structured_output = "repaired"
+        # cache the repaired answer, so a cache hit parses on the first try
+        result.raw = result.pydantic.model_dump_json()
+
+    def _review_feedback(self, kind: str, iteration: int, code: str, result: KickoffResult) -> CodeReviewFeedback:
+        """CodeReviewFeedback from the reviewer's verdict, written to output/{module}/{kind}_code_review_{iteration}.json.
+
+        An answer that could not be parsed even after the repair call fails the review
+        with the raw answer as its comments, rather than breaking the flow.
+        """
+        verdict = result.pydantic or ReviewVerdict(review_comments_markdown=result.raw, passed_review=False)
+        feedback = CodeReviewFeedback(
+            code_being_reviewed=code,
+            review_comments_markdown=verdict.review_comments_markdown,
+            review_timestamp=datetime.datetime.now(),
+            passed_review=verdict.passed_review,
+            open_items=verdict.open_items,
+        )
+        review_path = Path("output") / self.state.module_name / f"{kind}_code_review_{iteration}.json"
+        review_path.parent.mkdir(parents=True, exist_ok=True)
+        review_path.write_text(feedback.model_dump_json(), encoding="utf-8")
+        return feedback
+
+    async def _knowledge(self, inputs: dict) -> str:
+        """The knowledge/ chunks most relevant to a task's inputs, "" when none match."""
+        if settings.KNOWLEDGE_TOP_K <= 0:
+            return ""
+        query = "\n".join(value[:2000] for key, value in inputs.items() if key != "id" and isinstance(value, str))
+        try:
+            # the first lookup builds (or refreshes) the index
+            return await asyncio.to_thread(
+                knowledge_base.context, query, settings.KNOWLEDGE_TOP_K, settings.KNOWLEDGE_MAX_TOKENS
+            )
+        except Exception as e:
+            flow_log.warning("knowledge_lookup_failed", run_id=self.run_id, error=repr(e))
+            return ""
+
+    def _record_span(self, span: Span, started: float, retries: int = 0, output=None, error: Optional[str] = None):
+        self.metrics.finish(span, started, output, retries=retries, error=error)
+        metrics_registry.observe(span)
+        add_to_queue(TaskInfo(name=span.step, type="span", output=span.model_dump_json()), self.run_id)
+
+    def _cached_result(
+        self, agent_name: str, task_name: str, task, model: str, inputs: dict, output_model=None
+    ) -> tuple[Optional[str], Optional[KickoffResult]]:
+        """The kickoff cache key (None when caching is off) and the cached result, if any.
+
+        A cached structured answer is validated as `output_model` (or the task's output_pydantic).
+        """
+        if kickoff_cache is None:
+            return None, None
+        cache_key = kickoff_cache.key(agent_name, task_name, model, inputs)
+        cached = kickoff_cache.get(cache_key, output_model or task.output_pydantic)
+        if cached is not None and task.output_file:
+            # crewai writes output_file during kickoff, so a cache hit has to do it itself.
+            output_path = Path(task.output_file.format(**inputs))
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(
+                cached.pydantic.model_dump_json() if isinstance(cached.pydantic, BaseModel) else cached.raw,
+                encoding="utf-8",
+            )
+        return cache_key, cached
+
+    async def _run_crew(self, task_name: str, agent, task, inputs: dict) -> KickoffResult:
+        """Kicks off a single-task crew for `agent` and `task`.
+
+        crewai runs the kickoff on the event loop's default executor, so only the LLM
+        call itself holds a thread while the flow awaits it.
+        """
+        mycrew = Crew(agents=[agent], tasks=[task])
+        if settings.STREAM_TOKENS and hasattr(agent.llm, "stream"):
+            # the agent's llm is a per-clone copy, so this does not touch the prototype
+            agent.llm.stream = True
+            streaming = stream_tokens(
+                lambda delta: add_to_queue(TaskInfo(name=task_name, type="partial", output=delta), self.run_id),
+                settings.STREAM_FLUSH_INTERVAL,
+                settings.STREAM_FLUSH_BYTES,
+            )
+        else:
+            streaming = nullcontext()
+        with streaming:
+            output = await mycrew.kickoff_async(inputs=inputs)
+        return KickoffResult(raw=output.raw, pydantic=output.tasks_output[0].pydantic, output=output)
 
     @start()
-    def generate_business_requirement(self):
-        print("Generating business requirement")
+    @checkpointed
+    async def generate_business_requirement(self):
+        self._log_step("generate_business_requirement")
         self.state.business_requirement = self.business_requirement
         self.state.module_name = self.module_name
 
@@ -55,7 +271,8 @@ class EngineeringFlow(Flow[EngineeringState]):
                 name="Gathering Business Requirements",
                 type="markdown",
                 output=f"Gathering Business Requirements for {self.state.module_name}...",
-            )
+            ),
+            self.run_id,
         )
 
         # chosen_requirement = random.choice(BUSINESS_REQUIREMENTS)
@@ -66,261 +283,478 @@ class EngineeringFlow(Flow[EngineeringState]):
                 name="Gather Business Requirements",
                 type="markdown",
                 output=f"#### Business Requirements for {self.state.module_name}: \n{self.state.business_requirement}",
-            )
+            ),
+            self.run_id,
         )
 
     @listen(generate_business_requirement)
-    def design_product(self):
-        print("Designing product for requirement: ", self.state)
+    @checkpointed
+    async def design_product(self):
+        self._log_step("design_product")
         add_to_queue(
             TaskInfo(
                 name="Generating Design",
                 type="markdown",
                 output=f"Designing the product ...",
-            )
+            ),
+            self.run_id,
         )
 
-        engineeringCrew = EngineeringCrew()
-
-        mycrew = Crew(
-            agents=[engineeringCrew.development_lead()],
-            tasks=[engineeringCrew.design_task()],
-        )
-        result = mycrew.kickoff(
-            inputs={
-                "id": self.state.id,
-                "requirement": self.state.business_requirement,
-                "module_name": self.state.module_name,
-                "review_comments": "",
-            }
-        )
+        match = await asyncio.to_thread(self._similar_design)
+        if match is not None and match.exact:
+            add_to_queue(
+                TaskInfo(
+                    name="Reusing Design",
+                    type="markdown",
+                    output=f"Requirement is identical to {match.module_name}'s, reusing its design ...",
+                ),
+                self.run_id,
+            )
+            self.state.technical_design = match.design
+            design_path = Path("output") / self.state.module_name / "design.md"
+            design_path.parent.mkdir(parents=True, exist_ok=True)
+            design_path.write_text(match.design, encoding="utf-8")
+        else:
+            reference_design = ""
+            if match is not None:
+                add_to_queue(
+                    TaskInfo(
+                        name="Adapting Design",
+                        type="markdown",
+                        output=f"Adapting the design of the similar module {match.module_name} ({match.similarity:.0%} similar) ...",
+                    ),
+                    self.run_id,
+                )
+                reference_design = f"Design of {match.module_name}, written for: {match.requirement}\n\n{match.design}"
+            result = await self._kickoff(
+                "development_lead",
+                "design_task",
+                {
+                    "id": self.state.id,
+                    "requirement": self.state.business_requirement,
+                    "module_name": self.state.module_name,
+                    "review_comments": "",
+                    "reference_design": reference_design,
+                },
+            )
 
-        print("Product Design Created", result.raw)
-        self.state.technical_design = result.raw
+            flow_log.info("design_created", run_id=self.run_id, design=result.raw)
+            self.state.technical_design = result.raw
+        if settings.DESIGN_REUSE:
+            await asyncio.to_thread(design_index.add, self.state.module_name, self.state.business_requirement)
         add_to_queue(
             TaskInfo(
                 name="Generate Design",
                 type="markdown",
                 output=f"{self.state.technical_design}",
-            )
+            ),
+            self.run_id,
         )
 
-    @listen(or_("design_product", "REWRITE_BACKEND_CODE"))
-    def develop_backend(self):
-        print("Developing backend : ", self.state)
+    def _similar_design(self) -> Optional[DesignMatch]:
+        """The design of an earlier module with the same or a similar requirement, if any."""
+        if not settings.DESIGN_REUSE:
+            return None
+        span = self.metrics.start("design_lookup", "design_index", "local")
+        started = time.perf_counter()
+        match = design_index.lookup(self.state.business_requirement, settings.DESIGN_REUSE_THRESHOLD)
+        span.llm_calls_avoided = int(match is not None and match.exact)
+        self._record_span(span, started)
+        return match
+
+    def _track_prompt_tokens(self, step: str, iteration: int, sent: str, full: str) -> dict:
+        usage = {
+            "step": step,
+            "iteration": iteration,
+            "tokens": estimate_tokens(sent),
+            "full_tokens": estimate_tokens(full),
+        }
+        self.state.prompt_token_usage.append(usage)
+        return usage
+
+    def _review_comments(self, step: str, feedbacks: list[CodeReviewFeedback]) -> str:
+        """Feedback for the engineer: only the unresolved comments in incremental mode."""
+        if not feedbacks:
+            return ""
+        full = feedbacks[-1].review_comments_markdown
+        sent = unresolved_comments(feedbacks[-1]) if settings.INCREMENTAL_REVIEW else full
+        self._track_prompt_tokens(step, len(feedbacks), sent, full)
+        return sent
+
+    def _code_for_review(
+        self, step: str, code: str, last_reviewed: Optional[str], feedbacks: list[CodeReviewFeedback]
+    ) -> tuple[str, dict]:
+        """Code for the reviewer: a diff plus feedback summary on re-reviews in incremental mode."""
+        sent = review_input(code, last_reviewed, feedbacks) if settings.INCREMENTAL_REVIEW else code
+        return sent, self._track_prompt_tokens(step, len(feedbacks), sent, code)
+
+    def _static_review(self, kind: str, feedbacks: list[CodeReviewFeedback]) -> Optional[CodeReviewFeedback]:
+        """Local checks run before the LLM review of the `kind` ("backend" or "frontend") code.
+
+        Strips markdown fences from the code (rewriting its output file), then returns
+        machine-generated feedback if the code does not compile, misses functions from
+        the design or imports what the backend does not define. None means the code goes
+        on to the LLM reviewer, which also happens when the previous round already sent
+        back exactly the same findings, so a false positive cannot loop until the
+        iteration limit.
+        """
+        filename = "backend.py" if kind == "backend" else "app.py"
+        code = getattr(self.state, f"{kind}_code") or ""
+        stripped = strip_code_fences(code)
+        if stripped != code:
+            code = stripped
+            setattr(self.state, f"{kind}_code", code)
+            output_path = Path("output") / self.state.module_name / filename
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(code, encoding="utf-8")
+        if not settings.STATIC_REVIEW:
+            return None
+
+        iteration = len(feedbacks)
+        span = self.metrics.start(f"{kind}_static_check", "static_validator", "local", iteration)
+        started = time.perf_counter()
+        if kind == "backend":
+            problems = static_review_backend(code, self.state.technical_design)
+        else:
+            problems = static_review_frontend(code, self.state.backend_code, self.state.module_name)
+        comments = "\n".join([STATIC_CHECK_HEADER, *(f"- {problem}" for problem in problems)])
+        if not problems or (feedbacks and feedbacks[-1].review_comments_markdown == comments):
+            self._record_span(span, started)
+            return None
+
+        feedback = CodeReviewFeedback(
+            code_being_reviewed=code,
+            review_comments_markdown=comments,
+            review_timestamp=datetime.datetime.now(),
+            passed_review=False,
+        )
+        review_path = Path("output") / self.state.module_name / f"{kind}_code_review_{iteration}.json"
+        review_path.parent.mkdir(parents=True, exist_ok=True)
+        review_path.write_text(feedback.model_dump_json(), encoding="utf-8")
+        self.state.llm_reviews_avoided += 1
+        span.llm_calls_avoided = 1
+        self._record_span(span, started)
         add_to_queue(
             TaskInfo(
-                name="Generating Backend Code",
+                name=f"{kind.capitalize()} Static Check Failed",
                 type="markdown",
-                output=f"Generating Backend Code ...",
-            )
+                output=f"#### {kind.capitalize()} Static Check Iteration {iteration} for {self.state.module_name}: \n{comments}\n\n_LLM review skipped ({self.state.llm_reviews_avoided} avoided in this run)_",
+            ),
+            self.run_id,
         )
-        engineeringCrew = EngineeringCrew()
+        return feedback
 
-        mycrew = Crew(
-            agents=[engineeringCrew.backend_engineer()],
-            tasks=[engineeringCrew.backend_coding_task()],
+    async def _generate_backend(self):
+        add_to_queue(
+            TaskInfo(
+                name="Generating Backend Code",
+                type="markdown",
+                output=f"Generating Backend Code ...",
+            ),
+            self.run_id,
         )
-        result = mycrew.kickoff(
-            inputs={
+        review_comments = self._review_comments("backend_coding_task", self.state.backend_code_review_feedbacks)
+        result = await self._kickoff(
+            "backend_engineer",
+            "backend_coding_task",
+            {
                 "id": self.state.id,
                 "requirement": self.state.business_requirement,
                 "module_name": self.state.module_name,
-                "review_comments": (
-                    self.state.backend_code_review_feedbacks[
-                        -1
-                    ].review_comments_markdown
-                    if self.state.backend_code_review_feedbacks
-                    else ""
-                ),
-            }
+                "review_comments": review_comments,
+            },
+            iteration=len(self.state.backend_code_review_feedbacks),
         )
 
-        print("Backend Code Created", result.raw)
+        flow_log.info("backend_code_created", run_id=self.run_id, code=result.raw)
         self.state.backend_code = result.raw
         add_to_queue(
             TaskInfo(
                 name="Generate Backend Code",
                 type="markdown",
                 output=f"#### Backend Code for {self.state.module_name}: \n ```{self.state.backend_code}\n```",
-            )
+            ),
+            self.run_id,
         )
-        return "BACKEND_CODE_CREATED"
 
-    @router(develop_backend)
-    def review_backend_code(self):
-        print("Reviewing backend code : ", self.state)
+    async def _review_backend(self) -> str:
         if len(self.state.backend_code_review_feedbacks) >= MAX_REVIEW_ITERATIONS:
             add_to_queue(
                 TaskInfo(
                     name="Maximum Iterations Exceeded!",
                     type="markdown",
                     output=f"#### Maximum Iterations Exceeded!",
-                )
+                ),
+                self.run_id,
             )
             return "MAX_REVIEW_ITERATIONS_EXCEEDED"
-        engineeringCrew = EngineeringCrew()
+        if self.state.backend_code_review_feedbacks is None:
+            self.state.backend_code_review_feedbacks = []
+        static_feedback = await asyncio.to_thread(self._static_review, "backend", self.state.backend_code_review_feedbacks)
+        if static_feedback is not None:
+            self.state.backend_code_review_feedbacks.append(static_feedback)
+            return "REWRITE_BACKEND_CODE"
         add_to_queue(
             TaskInfo(
                 name="Reviewing Backend Code",
                 type="markdown",
                 output=f"Reviewing Backend Code ...",
-            )
+            ),
+            self.run_id,
         )
-
-        mycrew = Crew(
-            agents=[engineeringCrew.code_reviewer()],
-            tasks=[engineeringCrew.code_review_task()],
+        reviewed_code = self.state.backend_code
+        code_for_review, usage = self._code_for_review(
+            "code_review_task",
+            reviewed_code,
+            self.state.last_reviewed_backend_code,
+            self.state.backend_code_review_feedbacks,
         )
-        if self.state.backend_code_review_feedbacks is None:
-            self.state.backend_code_review_feedbacks = []
 
-        result = mycrew.kickoff(
-            inputs={
+        result = await self._kickoff(
+            "code_reviewer",
+            "code_review_task",
+            {
                 "id": self.state.id,
                 "requirement": self.state.business_requirement,
                 "module_name": self.state.module_name,
-                "backend_code": self.state.backend_code,
+                "backend_code": code_for_review,
                 "iteration": len(self.state.backend_code_review_feedbacks),
-            }
+            },
+            iteration=len(self.state.backend_code_review_feedbacks),
+            output_model=ReviewVerdict,
         )
 
-        codeReviewFeedback: CodeReviewFeedback = result.tasks_output[0].pydantic  # type: ignore[index]
-        print(codeReviewFeedback)
+        codeReviewFeedback = await asyncio.to_thread(
+            self._review_feedback, "backend", len(self.state.backend_code_review_feedbacks), reviewed_code, result
+        )
+        self._log_review("backend", codeReviewFeedback)
         add_to_queue(
             TaskInfo(
                 name="Generate Backend Code Review",
                 type="markdown",
-                output=f"#### Backend Code Review Iteration {len(self.state.backend_code_review_feedbacks)} for {self.state.module_name}: \n{codeReviewFeedback.review_comments_markdown}",
-            )
+                output=f"#### Backend Code Review Iteration {len(self.state.backend_code_review_feedbacks)} for {self.state.module_name}: \n{codeReviewFeedback.review_comments_markdown}\n\n_Review input: {usage['tokens']} tokens (full code: {usage['full_tokens']})_",
+            ),
+            self.run_id,
         )
         self.state.backend_code_review_feedbacks.append(codeReviewFeedback)
+        self.state.last_reviewed_backend_code = reviewed_code
 
         if codeReviewFeedback.passed_review:
             return "BACKEND_CODE_REVIEWED"
         else:
             return "REWRITE_BACKEND_CODE"
 
-    @listen(or_("BACKEND_CODE_REVIEWED", "REWRITE_FRONTEND_CODE"))
-    def develop_frontend(self):
-        print("Developing frontend : ", self.state)
+    async def _generate_frontend(self):
         add_to_queue(
             TaskInfo(
                 name="Developing Frontend Code",
                 type="markdown",
                 output=f"Developing Frontend Code ...",
-            )
-        )
-        engineeringCrew = EngineeringCrew()
-
-        mycrew = Crew(
-            agents=[engineeringCrew.frontend_engineer()],
-            tasks=[engineeringCrew.frontend_coding_task()],
+            ),
+            self.run_id,
         )
-        result = mycrew.kickoff(
-            inputs={
+        review_comments = self._review_comments("frontend_coding_task", self.state.frontend_code_review_feedbacks)
+        result = await self._kickoff(
+            "frontend_engineer",
+            "frontend_coding_task",
+            {
                 "id": self.state.id,
                 "requirement": self.state.business_requirement,
                 "module_name": self.state.module_name,
-                "review_comments": (
-                    self.state.frontend_code_review_feedbacks[
-                        -1
-                    ].review_comments_markdown
-                    if self.state.frontend_code_review_feedbacks
-                    else ""
-                ),
-            }
+                "backend_interface": public_interface(self.state.backend_code),
+                "review_comments": review_comments,
+            },
+            iteration=len(self.state.frontend_code_review_feedbacks),
         )
 
-        print("Frontend Code Created", result.raw)
+        flow_log.info("frontend_code_created", run_id=self.run_id, code=result.raw)
         self.state.frontend_code = result.raw
         add_to_queue(
             TaskInfo(
                 name="Generate Frontend Code",
                 type="markdown",
                 output=f"#### Frontend Code for {self.state.module_name}:\n ```{self.state.frontend_code}```",
-            )
+            ),
+            self.run_id,
         )
-        return "FRONTEND_CODE_CREATED"
 
-    @router(develop_frontend)
-    def review_frontend_code(self):
-        print("Reviewing frontkend code : ", self.state)
+    async def _review_frontend(self) -> str:
         if len(self.state.frontend_code_review_feedbacks) >= MAX_REVIEW_ITERATIONS:
             add_to_queue(
                 TaskInfo(
                     name="Maximum Iterations Exceeded!",
                     type="markdown",
                     output=f"#### Maximum Iterations Exceeded!",
-                )
+                ),
+                self.run_id,
             )
             return "MAX_REVIEW_ITERATIONS_EXCEEDED"
-        engineeringCrew = EngineeringCrew()
+        if self.state.frontend_code_review_feedbacks is None:
+            self.state.frontend_code_review_feedbacks = []
+        static_feedback = await asyncio.to_thread(self._static_review, "frontend", self.state.frontend_code_review_feedbacks)
+        if static_feedback is not None:
+            self.state.frontend_code_review_feedbacks.append(static_feedback)
+            return "REWRITE_FRONTEND_CODE"
         add_to_queue(
             TaskInfo(
                 name="Reviewing Frontend Code",
                 type="markdown",
                 output=f"Reviewing Frontend Code ...",
-            )
+            ),
+            self.run_id,
         )
-
-        mycrew = Crew(
-            agents=[engineeringCrew.code_reviewer()],
-            tasks=[engineeringCrew.frontend_code_review_task()],
+        reviewed_code = self.state.frontend_code
+        code_for_review, usage = self._code_for_review(
+            "frontend_code_review_task",
+            reviewed_code,
+            self.state.last_reviewed_frontend_code,
+            self.state.frontend_code_review_feedbacks,
         )
-        if self.state.frontend_code_review_feedbacks is None:
-            self.state.frontend_code_review_feedbacks = []
 
-        result = mycrew.kickoff(
-            inputs={
+        result = await self._kickoff(
+            "code_reviewer",
+            "frontend_code_review_task",
+            {
                 "id": self.state.id,
                 "requirement": self.state.business_requirement,
                 "module_name": self.state.module_name,
-                "frontend_code": self.state.frontend_code,
+                "frontend_code": code_for_review,
                 "iteration": len(self.state.frontend_code_review_feedbacks),
-            }
+            },
+            iteration=len(self.state.frontend_code_review_feedbacks),
+            output_model=ReviewVerdict,
         )
 
-        codeReviewFeedback: CodeReviewFeedback = result.tasks_output[0].pydantic  # type: ignore[index]
-        print(codeReviewFeedback)
+        codeReviewFeedback = await asyncio.to_thread(
+            self._review_feedback, "frontend", len(self.state.frontend_code_review_feedbacks), reviewed_code, result
+        )
+        self._log_review("frontend", codeReviewFeedback)
         add_to_queue(
             TaskInfo(
                 name="Generate Frontend Code Review",
                 type="markdown",
-                output=f"#### Frontend Code Review Iteration {len(self.state.frontend_code_review_feedbacks)} for {self.state.module_name}: \n{codeReviewFeedback.review_comments_markdown}",
-            )
+                output=f"#### Frontend Code Review Iteration {len(self.state.frontend_code_review_feedbacks)} for {self.state.module_name}: \n{codeReviewFeedback.review_comments_markdown}\n\n_Review input: {usage['tokens']} tokens (full code: {usage['full_tokens']})_",
+            ),
+            self.run_id,
         )
         self.state.frontend_code_review_feedbacks.append(codeReviewFeedback)
+        self.state.last_reviewed_frontend_code = reviewed_code
 
         if codeReviewFeedback.passed_review:
             return "FRONTEND_CODE_REVIEWED"
         else:
             return "REWRITE_FRONTEND_CODE"
 
+    @router(design_product)
+    @checkpointed
+    async def schedule_build(self):
+        if settings.FLOW_SCHEDULING == "overlap":
+            return "OVERLAPPED_BUILD"
+        return "SERIAL_BUILD"
+
+    @listen(or_("SERIAL_BUILD", "REWRITE_BACKEND_CODE"))
+    @checkpointed
+    async def develop_backend(self):
+        self._log_step("develop_backend")
+        await self._generate_backend()
+        return "BACKEND_CODE_CREATED"
+
+    @router(develop_backend)
+    @checkpointed
+    async def review_backend_code(self):
+        self._log_step("review_backend_code")
+        return await self._review_backend()
+
+    @listen(or_("BACKEND_CODE_REVIEWED", "REWRITE_FRONTEND_CODE"))
+    @checkpointed
+    async def develop_frontend(self):
+        self._log_step("develop_frontend")
+        await self._generate_frontend()
+        return "FRONTEND_CODE_CREATED"
+
+    @router(develop_frontend)
+    @checkpointed
+    async def review_frontend_code(self):
+        self._log_step("review_frontend_code")
+        return await self._review_frontend()
+
+    @router("OVERLAPPED_BUILD")
+    @checkpointed
+    async def build_overlapped(self):
+        """Runs the backend and frontend pipelines concurrently.
+
+        The frontend starts as soon as the first backend draft exists and is only rebuilt
+        after its own review when the backend's public interface changed underneath it.
+        """
+        self._log_step("build_overlapped")
+        backend_draft = asyncio.Event()
+        backend_done = asyncio.Event()
+        backend_route, frontend_route = await asyncio.gather(
+            self._backend_branch(backend_draft, backend_done),
+            self._frontend_branch(backend_draft, backend_done),
+        )
+
+        if backend_route != "BACKEND_CODE_REVIEWED":
+            return "MAX_REVIEW_ITERATIONS_EXCEEDED"
+        return frontend_route
+
+    async def _backend_branch(self, backend_draft: asyncio.Event, backend_done: asyncio.Event) -> str:
+        try:
+            while True:
+                await self._generate_backend()
+                backend_draft.set()
+                route = await self._review_backend()
+                if route != "REWRITE_BACKEND_CODE":
+                    return route
+        finally:
+            backend_draft.set()
+            backend_done.set()
+
+    async def _frontend_branch(self, backend_draft: asyncio.Event, backend_done: asyncio.Event) -> str:
+        await backend_draft.wait()
+        while True:
+            built_against = public_interface(self.state.backend_code)
+            await self._generate_frontend()
+            route = await self._review_frontend()
+            if route != "FRONTEND_CODE_REVIEWED":
+                if route == "MAX_REVIEW_ITERATIONS_EXCEEDED":
+                    return route
+                continue
+
+            await backend_done.wait()
+            if public_interface(self.state.backend_code) == built_against:
+                return route
+            add_to_queue(
+                TaskInfo(
+                    name="Backend Interface Changed",
+                    type="markdown",
+                    output="Backend public API changed during review, rebuilding the frontend ...",
+                ),
+                self.run_id,
+            )
+
     @listen("FRONTEND_CODE_REVIEWED")
-    def write_test_cases(self):
-        print("Writing test cases : ", self.state)
+    @checkpointed
+    async def write_test_cases(self):
+        self._log_step("write_test_cases")
         add_to_queue(
             TaskInfo(
                 name="Writing Test Cases",
                 type="markdown",
                 output=f"Writing Test Cases ...",
-            )
+            ),
+            self.run_id,
         )
-        engineeringCrew = EngineeringCrew()
-
-        mycrew = Crew(
-            agents=[engineeringCrew.test_engineer()],
-            tasks=[engineeringCrew.test_preparation_task()],
-        )
-        result = mycrew.kickoff(
-            inputs={
+        result = await self._kickoff(
+            "test_engineer",
+            "test_preparation_task",
+            {
                 "id": self.state.id,
                 "requirement": self.state.business_requirement,
                 "module_name": self.state.module_name,
                 "backend_code": self.state.backend_code,
                 "frontend_code": self.state.frontend_code,
-            }
+            },
         )
 
         self.state.unit_test_code = result.raw
@@ -329,21 +763,132 @@ class EngineeringFlow(Flow[EngineeringState]):
                 name="Generate Test Cases",
                 type="markdown",
                 output=f"#### Test Cases for {self.state.module_name}: \n```{self.state.unit_test_code}```",
-            )
+            ),
+            self.run_id,
         )
 
         return "TEST_CASES_PREPARED"
 
+    def _test_interpreter(self, project_path: Path) -> str:
+        """The interpreter of the project's cached environment, or this one if it cannot be prepared."""
+        try:
+            _, python = project_runner.prepare(str(project_path))
+            return str(python)
+        except Exception as e:
+            flow_log.warning("test_environment_failed", run_id=self.run_id, project=str(project_path), error=repr(e), python=sys.executable)
+            return sys.executable
+
+    @listen(write_test_cases)
+    @checkpointed
+    async def run_test_cases(self):
+        if not settings.RUN_TESTS:
+            return "TESTS_SKIPPED"
+        self._log_step("run_test_cases")
+        add_to_queue(
+            TaskInfo(
+                name="Running Test Cases",
+                type="markdown",
+                output=f"Running Test Cases ...",
+            ),
+            self.run_id,
+        )
+        project_path = Path("output") / self.state.module_name
+        test_code = strip_code_fences(self.state.unit_test_code)
+        if test_code != self.state.unit_test_code:
+            self.state.unit_test_code = test_code
+            (project_path / "test.py").write_text(test_code, encoding="utf-8")
+
+        # preparing the venv and running the test processes block, so they run off the event loop
+        span = self.metrics.start("run_test_cases", "test_runner", "local")
+        started = time.perf_counter()
+        python = await asyncio.to_thread(self._test_interpreter, project_path)
+        report = await asyncio.to_thread(
+            run_tests, str(project_path), self.state.module_name, python, settings.TEST_TIMEOUT
+        )
+        await asyncio.to_thread(self._record_span, span, started)
+        await asyncio.to_thread(write_report, report, str(project_path))
+        self.state.test_report = report.model_dump(exclude={"cases"})
+
+        add_to_queue(
+            TaskInfo(
+                name="Test Results",
+                type="markdown",
+                output=f"#### Test Results for {self.state.module_name}: \n{report_markdown(report)}",
+            ),
+            self.run_id,
+        )
+        return "TESTS_PASSED" if report.ok else "TESTS_FAILED"
+
 
 def kickoff():
-    engineering_flow = EngineeringFlow()
+    chosen_requirement = random.choice(BUSINESS_REQUIREMENTS)
+    engineering_flow = EngineeringFlow(chosen_requirement.module_name, chosen_requirement.business_requirement)
     engineering_flow.kickoff()
 
 
+def run():
+    kickoff()
+
+
 def plot():
-    engineering_flow = EngineeringFlow()
+    engineering_flow = EngineeringFlow("plot", "")
     engineering_flow.plot()
 
 
+def _sample_inputs() -> dict:
+    """Inputs for every placeholder of the crew's tasks, taken from the first sample requirement."""
+    requirement = BUSINESS_REQUIREMENTS[0]
+    return {
+        "id": "sample",
+        "requirement": requirement.business_requirement,
+        "module_name": requirement.module_name,
+        "review_comments": "",
+        "reference_design": "",
+        "knowledge": "",
+        "backend_code": "",
+        "backend_interface": "",
+        "frontend_code": "",
+        "iteration": 0,
+        "output_schema": schema_prompt(ReviewVerdict),
+    }
+
+
+def replay():
+    """
+    Resume the flow of a module from its last checkpointed step.
+    """
+    if len(sys.argv) < 2:
+        raise Exception("Usage: replay <module_name>")
+    module_name = sys.argv[1]
+    records = FlowCheckpoint(module_name).records()
+    if not records:
+        raise Exception(f"No checkpoint found for module '{module_name}'")
+
+    print(f"Resuming {module_name} after {records[-1]['step']} ({len(records)} steps checkpointed)")
+    business_requirement = records[-1]["state"]["business_requirement"]
+    engineering_flow = EngineeringFlow(module_name, business_requirement, resume=True)
+    engineering_flow.kickoff()
+
+
+def train():
+    """
+    Train the crew for a given number of iterations.
+    """
+    try:
+        EngineeringCrew().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=_sample_inputs())
+    except Exception as e:
+        raise Exception(f"An error occurred while training the crew: {e}")
+
+
+def test():
+    """
+    Test the crew execution and returns the results.
+    """
+    try:
+        EngineeringCrew().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=_sample_inputs())
+    except Exception as e:
+        raise Exception(f"An error occurred while testing the crew: {e}")
+
+
 if __name__ == "__main__":
     kickoff()
@@ -0,0 +1,230 @@
+"""Per-step spans around crew kickoffs, exported as JSONL per run and as Prometheus text."""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from pydantic import BaseModel
+
+from .flow_log import flow_log
+
+# Upper bounds (seconds) of the step duration histogram buckets.
+DURATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200)
+
+
+class Span(BaseModel):
+    run_id: str
+    module_name: str
+    step: str
+    agent: str
+    model: str
+    iteration: int = 0
+    started_at: float
+    wall_time: float = 0.0
+    # seconds spent waiting before the step could run (executor slot for the first step)
+    queue_wait: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    llm_calls: int = 0
+    retries: int = 0
+    cost: float = 0.0
+    cached: bool = False
+    # LLM calls the step made unnecessary (a static check that sent code straight back)
+    llm_calls_avoided: int = 0
+    # how a structured answer was obtained: "native", "parsed", "repaired" or "failed"
+    structured_output: Optional[str] = None
+    error: Optional[str] = None
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of a call according to litellm's price table, 0.0 for unknown models."""
+    if not prompt_tokens and not completion_tokens:
+        return 0.0
+    try:
+        from litellm import cost_per_token
+
+        prompt_cost, completion_cost = cost_per_token(
+            model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+        return prompt_cost + completion_cost
+    except Exception:
+        return 0.0
+
+
+class RunMetrics:
+    """Collects the spans of one flow run and appends them to output/{module}/metrics.jsonl."""
+
+    def __init__(self, run_id: str, module_name: str, queue_wait: float = 0.0, directory: str = "output"):
+        self.run_id = run_id
+        self.module_name = module_name
+        self.path = Path(directory) / module_name / "metrics.jsonl"
+        self.spans: list[Span] = []
+        self._pending_wait = queue_wait
+        self._lock = threading.Lock()
+
+    def start(self, step: str, agent: str, model: str, iteration: int = 0) -> Span:
+        with self._lock:
+            queue_wait, self._pending_wait = self._pending_wait, 0.0
+        return Span(
+            run_id=self.run_id,
+            module_name=self.module_name,
+            step=step,
+            agent=agent,
+            model=model,
+            iteration=iteration,
+            started_at=time.time(),
+            queue_wait=queue_wait,
+        )
+
+    def finish(self, span: Span, started: float, output=None, retries: int = 0, error: Optional[str] = None) -> Span:
+        """Completes `span` from the CrewOutput of its kickoff (None for cache hits and failures)."""
+        span.wall_time = round(time.perf_counter() - started, 3)
+        span.retries = retries
+        span.error = error
+        usage = getattr(output, "token_usage", None)
+        if usage is not None:
+            span.prompt_tokens = usage.prompt_tokens
+            span.completion_tokens = usage.completion_tokens
+            span.cached_prompt_tokens = usage.cached_prompt_tokens
+            span.llm_calls += usage.successful_requests  # on top of calls made outside the crew
+            span.cost = estimate_cost(span.model, span.prompt_tokens, span.completion_tokens)
+        with self._lock:
+            self.spans.append(span)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(span.model_dump_json() + "\n")
+        return span
+
+
+def summary_table(spans: Iterable[Span]) -> str:
+    """Markdown table with one row per step (iterations summed) and a total row."""
+    rows: dict[str, dict] = {}
+    for span in spans:
+        row = rows.setdefault(
+            span.step,
+            {"calls": 0, "wall": 0.0, "wait": 0.0, "prompt": 0, "completion": 0, "cost": 0.0, "retries": 0, "cached": 0},
+        )
+        row["calls"] += 1
+        row["wall"] += span.wall_time
+        row["wait"] += span.queue_wait
+        row["prompt"] += span.prompt_tokens
+        row["completion"] += span.completion_tokens
+        row["cost"] += span.cost
+        row["retries"] += span.retries
+        row["cached"] += span.cached
+    if not rows:
+        return ""
+
+    total = {key: sum(row[key] for row in rows.values()) for key in next(iter(rows.values()))}
+    lines = [
+        "| Step | Runs | Wall (s) | Wait (s) | Prompt tok | Completion tok | Cost ($) | Retries | Cached |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for step, row in [*rows.items(), ("**Total**", total)]:
+        lines.append(
+            f"| {step} | {row['calls']} | {row['wall']:.1f} | {row['wait']:.1f} | {row['prompt']} "
+            f"| {row['completion']} | {row['cost']:.4f} | {row['retries']} | {row['cached']} |"
+        )
+    return "\n".join(lines)
+
+
+class MetricsRegistry:
+    """Process-wide aggregates of observed spans, rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: tuple = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = defaultdict(float)
+        self._histograms: dict[str, list[int]] = {}
+        self._durations: dict[str, list[float]] = defaultdict(lambda: [0.0, 0])
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._counter_sources: list[Callable[[], dict[str, float]]] = []
+
+    def add_counter_source(self, source: Callable[[], dict[str, float]]):
+        """Adds counters kept elsewhere (e.g. by the kickoff cache); `source` returns {name: value} at render time."""
+        with self._lock:
+            self._counter_sources.append(source)
+
+    def observe(self, span: Span):
+        step, model = span.step, span.model
+        with self._lock:
+            self._counters[("coding_agent_step_runs_total", step, model, "")] += 1
+            self._counters[("coding_agent_step_errors_total", step, model, "")] += span.error is not None
+            self._counters[("coding_agent_step_cache_hits_total", step, model, "")] += span.cached
+            self._counters[("coding_agent_step_tokens_total", step, model, "prompt")] += span.prompt_tokens
+            self._counters[("coding_agent_step_tokens_total", step, model, "completion")] += span.completion_tokens
+            self._counters[("coding_agent_step_cost_usd_total", step, model, "")] += span.cost
+            self._counters[("coding_agent_step_retries_total", step, model, "")] += span.retries
+            self._counters[("coding_agent_step_queue_wait_seconds_total", step, model, "")] += span.queue_wait
+            self._counters[("coding_agent_step_llm_calls_avoided_total", step, model, "")] += span.llm_calls_avoided
+            if span.structured_output:
+                self._counters[("coding_agent_structured_output_total", step, model, span.structured_output)] += 1
+
+            counts = self._histograms.setdefault(step, [0] * len(self.buckets))
+            for index in range(bisect.bisect_left(self.buckets, span.wall_time), len(self.buckets)):
+                counts[index] += 1
+            self._durations[step][0] += span.wall_time
+            self._durations[step][1] += 1
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            seen = set()
+            for (name, step, model, kind), value in sorted(self._counters.items()):
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                labels = f'step="{step}",model="{model}"' + (f',kind="{kind}"' if kind else "")
+                lines.append(f"{name}{{{labels}}} {value:g}")
+            # sources reporting the same name are summed, so every series appears once
+            sourced: dict[str, float] = defaultdict(float)
+            for source in self._counter_sources:
+                for name, value in source().items():
+                    sourced[name] += value
+            for name, value in sorted(sourced.items()):
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {value:g}")
+
+            if self._histograms:
+                lines.append("# TYPE coding_agent_step_duration_seconds histogram")
+            for step, counts in sorted(self._histograms.items()):
+                total, count = self._durations[step]
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'coding_agent_step_duration_seconds_bucket{{step="{step}",le="{bound}"}} {bucket_count}')
+                lines.append(f'coding_agent_step_duration_seconds_bucket{{step="{step}",le="+Inf"}} {count}')
+                lines.append(f'coding_agent_step_duration_seconds_sum{{step="{step}"}} {total:g}')
+                lines.append(f'coding_agent_step_duration_seconds_count{{step="{step}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """Serves `render()` at /metrics from a daemon thread."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        flow_log.info("metrics_server_started", url=f"http://{host}:{port}/metrics")
+        return self._server
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,198 @@
+"""Bounded log capture for generated projects started from the UI, tracked per run id."""
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+from . import settings
+
+# Longest line kept in the ring buffer; longer output is split into several lines.
+MAX_LINE_CHARS = 4000
+
+
+class ProcessRun:
+    """One subprocess with its output kept in a fixed-size ring buffer.
+
+    A reader thread drains stdout into the buffer (and, when `log_path` is set, into
+    a log file on disk of at most `max_log_bytes`), so memory and disk stay bounded
+    however chatty the process is.
+    `version` increases with every captured line, letting consumers skip unchanged tails.
+    """
+
+    def __init__(
+        self,
+        project: str,
+        process: subprocess.Popen,
+        max_lines: int,
+        log_path: Optional[Path] = None,
+        max_log_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.id = str(uuid.uuid4())
+        self.project = project
+        self.process = process
+        self.log_path = log_path
+        self.max_log_bytes = max_log_bytes
+        self.started_at = time.time()
+        self.version = 0
+        self.total_lines = 0
+        self.done = threading.Event()
+        self._lines: deque[str] = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name=f"run-log-{self.id[:8]}", daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        log_file = open(self.log_path, "w", encoding="utf-8") if self.log_path else None
+        logged = 0
+        try:
+            for line in iter(lambda: self.process.stdout.readline(MAX_LINE_CHARS), ""):
+                if log_file:
+                    logged += len(line.encode("utf-8"))
+                    if logged > self.max_log_bytes:
+                        log_file.write(f"... log truncated at {self.max_log_bytes} bytes\n")
+                        log_file.close()
+                        log_file = None
+                    else:
+                        log_file.write(line)
+                with self._lock:
+                    self._lines.append(line.rstrip("\n"))
+                    self.total_lines += 1
+                    self.version += 1
+        finally:
+            self.process.stdout.close()
+            if log_file:
+                log_file.close()
+            self.process.wait()
+            self.done.set()
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.process.poll()
+
+    def tail(self) -> str:
+        """The buffered lines, prefixed with a note when older ones were dropped."""
+        with self._lock:
+            lines = list(self._lines)
+            dropped = self.total_lines - len(lines)
+        if dropped:
+            note = f"... {dropped} earlier lines omitted"
+            if self.log_path:
+                note += f" (full log: {self.log_path})"
+            lines.insert(0, note)
+        return "\n".join(lines)
+
+    def _signal_group(self, sig: int):
+        try:
+            os.killpg(self.process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def stop(self, timeout: float = 5) -> bool:
+        """Sends SIGTERM to the run's process group, then SIGKILL after `timeout`; True if it had to be killed.
+
+        Runs are started in their own session, so this also reaches servers and
+        workers the script spawned.
+        """
+        if self.returncode is not None:
+            return False
+        self._signal_group(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=timeout)
+            self._signal_group(signal.SIGKILL)  # children that outlived the script
+            return False
+        except subprocess.TimeoutExpired:
+            self._signal_group(signal.SIGKILL)
+            self.process.wait()
+            return True
+
+
+class ProcessRunManager:
+    """Independent runs keyed by id, so one user's run never stops another's."""
+
+    def __init__(
+        self,
+        max_lines: int,
+        log_dir: Optional[str] = None,
+        keep_finished: int = 20,
+        max_log_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.max_lines = max_lines
+        self.log_dir = Path(log_dir) if log_dir else None
+        self.keep_finished = keep_finished
+        self.max_log_bytes = max_log_bytes
+        self._runs: dict[str, ProcessRun] = {}
+        self._lock = threading.Lock()
+
+    def start(self, project: str, command: list[str], cwd: str, **popen_kwargs) -> ProcessRun:
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            start_new_session=True,
+            **popen_kwargs,
+        )
+        return self.attach(project, process)
+
+    def attach(self, project: str, process: subprocess.Popen) -> ProcessRun:
+        """Tracks an already started process, which must lead its own session (start_new_session=True)."""
+        log_path = None
+        if self.log_dir:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            log_path = self.log_dir / f"{project}-{int(time.time())}-{process.pid}.log"
+        run = ProcessRun(project, process, self.max_lines, log_path, self.max_log_bytes)
+        with self._lock:
+            self._runs[run.id] = run
+            self._prune()
+            self._evict_logs()
+        return run
+
+    def _prune(self):
+        finished = [run for run in self._runs.values() if run.done.is_set()]
+        for run in sorted(finished, key=lambda run: run.started_at)[: max(0, len(finished) - self.keep_finished)]:
+            del self._runs[run.id]
+
+    def _evict_logs(self):
+        """Deletes the oldest log files once RUN_LOG_DIR exceeds its budget; logs of live runs are kept."""
+        if not self.log_dir:
+            return
+        live = {run.log_path for run in self._runs.values() if not run.done.is_set()}
+        logs = []
+        for path in self.log_dir.glob("*.log"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            logs.append((stat.st_mtime, stat.st_size, path))
+        total = 0
+        for _, size, path in sorted(logs, reverse=True):
+            total += size
+            if total > self.max_log_bytes and path not in live:
+                path.unlink(missing_ok=True)
+
+    def get(self, run_id: Optional[str]) -> Optional[ProcessRun]:
+        with self._lock:
+            return self._runs.get(run_id) if run_id else None
+
+    def active(self) -> list[ProcessRun]:
+        with self._lock:
+            return [run for run in self._runs.values() if not run.done.is_set()]
+
+    def stop(self, run_id: Optional[str]) -> Optional[ProcessRun]:
+        run = self.get(run_id)
+        if run is not None:
+            run.stop()
+        return run
+
+
+process_runs = ProcessRunManager(
+    settings.RUN_LOG_MAX_LINES, settings.RUN_LOG_DIR or None, max_log_bytes=settings.RUN_LOG_MAX_MB * 1024 * 1024
+)
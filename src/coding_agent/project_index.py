@@ -0,0 +1,106 @@
+"""Cached, incrementally updated index of the generated projects under output/."""
+import math
+import os
+import threading
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ProjectPage(BaseModel):
+    names: list[str]
+    total: int
+    page: int
+    pages: int
+
+
+class ProjectIndex:
+    """Lists project directories without walking them, and builds file trees on demand.
+
+    The top-level listing is rescanned only when the root directory's mtime changes
+    (a project was created or removed) or after `invalidate()`. A project's file tree
+    is built only when it is asked for and cached together with the mtimes of its
+    directories, so it is rebuilt only after files were added, removed or renamed.
+    """
+
+    def __init__(self, root: str = "output"):
+        self.root = root
+        self._lock = threading.Lock()
+        self._root_mtime: Optional[int] = None
+        self._projects: dict[str, int] = {}  # name -> directory mtime (ns)
+        self._stale: set[str] = set()
+        self._trees: dict[str, tuple[dict[str, int], str]] = {}  # name -> (dir mtimes, markdown)
+
+    def invalidate(self, name: Optional[str] = None):
+        """Marks one project (or, without a name, the whole index) as changed."""
+        with self._lock:
+            if name is None:
+                self._root_mtime = None
+                self._trees.clear()
+            else:
+                self._stale.add(name)
+                self._trees.pop(name, None)
+
+    def _refresh(self):
+        try:
+            root_mtime = os.stat(self.root).st_mtime_ns
+        except FileNotFoundError:
+            self._root_mtime, self._projects, self._stale = None, {}, set()
+            return
+        if root_mtime != self._root_mtime:
+            with os.scandir(self.root) as entries:
+                self._projects = {entry.name: entry.stat().st_mtime_ns for entry in entries if entry.is_dir()}
+            self._root_mtime = root_mtime
+            self._trees = {name: tree for name, tree in self._trees.items() if name in self._projects}
+        elif self._stale:
+            for name in self._stale:
+                try:
+                    self._projects[name] = os.stat(os.path.join(self.root, name)).st_mtime_ns
+                except FileNotFoundError:
+                    self._projects.pop(name, None)
+        self._stale.clear()
+
+    def page(self, query: str = "", page: int = 1, page_size: int = 20) -> ProjectPage:
+        """Projects whose name contains `query` (case-insensitive), most recently changed first."""
+        with self._lock:
+            self._refresh()
+            needle = (query or "").strip().lower()
+            matches = sorted(
+                (name for name in self._projects if needle in name.lower()),
+                key=lambda name: self._projects[name],
+                reverse=True,
+            )
+        pages = max(1, math.ceil(len(matches) / page_size))
+        page = min(max(1, int(page or 1)), pages)
+        start = (page - 1) * page_size
+        return ProjectPage(names=matches[start : start + page_size], total=len(matches), page=page, pages=pages)
+
+    def tree(self, name: str) -> Optional[str]:
+        """Markdown file tree of one project, or None if it does not exist."""
+        project_path = os.path.join(self.root, name)
+        with self._lock:
+            cached = self._trees.get(name)
+        if cached is not None:
+            dir_mtimes, markdown = cached
+            try:
+                if all(os.stat(path).st_mtime_ns == mtime for path, mtime in dir_mtimes.items()):
+                    return markdown
+            except FileNotFoundError:
+                pass
+        if not os.path.isdir(project_path):
+            return None
+
+        dir_mtimes, lines = {}, []
+        for root, dirs, files in os.walk(project_path):
+            dirs.sort()
+            dir_mtimes[root] = os.stat(root).st_mtime_ns
+            level = os.path.relpath(root, project_path).count(os.sep) + (root != project_path)
+            lines.append(f"{' ' * 4 * level}📂 {os.path.basename(root)}/")
+            lines.extend(f"{' ' * 4 * (level + 1)}📄 {f}" for f in sorted(files))
+        markdown = "```\n" + "\n".join(lines) + "\n```"
+        with self._lock:
+            self._trees[name] = (dir_mtimes, markdown)
+        return markdown
+
+
+project_index = ProjectIndex()
@@ -0,0 +1,57 @@
+"""Process-wide token bucket limiting how fast crew kickoffs may call the LLM."""
+import asyncio
+import threading
+import time
+
+from . import settings
+
+
+class RateLimiter:
+    """Token bucket refilled at `per_minute` tokens a minute, holding at most `burst` tokens.
+
+    A rate of 0 disables limiting. The bucket is per process: in the "process"
+    execution mode every worker process gets its own budget.
+    """
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self._lock = threading.Lock()
+        self.configure(per_minute, burst)
+
+    def configure(self, per_minute: float, burst: int = 1):
+        with self._lock:
+            self.per_minute = per_minute
+            self.burst = max(1, burst)
+            self._tokens = float(self.burst)
+            self._updated = time.monotonic()
+
+    def _reserve(self) -> float:
+        """Takes a token if one is available; otherwise returns the seconds until one will be."""
+        with self._lock:
+            now = time.monotonic()
+            rate = self.per_minute / 60
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / rate
+
+    def acquire(self) -> float:
+        """Blocks until a call may proceed; returns the seconds spent waiting."""
+        if not self.per_minute:
+            return 0.0
+        started = time.monotonic()
+        while (wait := self._reserve()) > 0:
+            time.sleep(wait)
+        return time.monotonic() - started
+
+    async def acquire_async(self) -> float:
+        """Like acquire(), but waits without holding a thread."""
+        if not self.per_minute:
+            return 0.0
+        started = time.monotonic()
+        while (wait := self._reserve()) > 0:
+            await asyncio.sleep(wait)
+        return time.monotonic() - started
+
+llm_rate_limiter = RateLimiter(settings.LLM_RATE_LIMIT_RPM, settings.LLM_RATE_LIMIT_BURST)
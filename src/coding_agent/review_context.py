@@ -0,0 +1,73 @@
+"""Compact prompt inputs for the incremental code review loop."""
+import difflib
+import re
+from typing import Optional, Sequence
+
+from .crew import CodeReviewFeedback
+
+LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*\S)")
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count of `text` for `model`, falling back to ~4 characters per token."""
+    if not text:
+        return 0
+    try:
+        from litellm import token_counter
+
+        return token_counter(model=model or "gpt-4o-mini", text=text)
+    except Exception:
+        return max(1, len(text) // 4)
+
+
+def review_items(feedback: CodeReviewFeedback) -> list[str]:
+    """The individual list items of a review, or its whole text when it has none."""
+    markdown = feedback.review_comments_markdown or ""
+    items = [m.group(1) for m in map(LIST_ITEM.match, markdown.splitlines()) if m]
+    return items or ([markdown.strip()] if markdown.strip() else [])
+
+
+def unresolved_comments(feedback: CodeReviewFeedback) -> str:
+    """Review comments the engineer still has to act on.
+
+    These are the items the reviewer marked as open in its verdict; when it marked none,
+    a failed review passes every one of its items on.
+    """
+    items = feedback.open_items or (review_items(feedback) if not feedback.passed_review else [])
+    return "\n".join(f"- {item}" for item in items)
+
+
+def summarize_feedback(feedbacks: Sequence[CodeReviewFeedback], max_item_chars: int = 160) -> str:
+    lines = []
+    for iteration, feedback in enumerate(feedbacks):
+        verdict = "passed" if feedback.passed_review else "failed"
+        lines.append(f"Iteration {iteration} ({verdict}):")
+        for item in review_items(feedback):
+            if len(item) > max_item_chars:
+                item = item[: max_item_chars - 3] + "..."
+            lines.append(f"- {item}")
+    return "\n".join(lines)
+
+
+def review_input(code: str, previously_reviewed: Optional[str], feedbacks: Sequence[CodeReviewFeedback]) -> str:
+    """What the reviewer sees for `code`: the full code on the first pass, afterwards a
+    unified diff against the last reviewed version plus a summary of earlier feedback.
+    Falls back to the full code when the diff would not be smaller."""
+    code = code or ""
+    if not previously_reviewed or not feedbacks:
+        return code
+
+    diff = "".join(
+        difflib.unified_diff(
+            previously_reviewed.splitlines(keepends=True),
+            code.splitlines(keepends=True),
+            fromfile="previously_reviewed.py",
+            tofile="latest.py",
+        )
+    )
+    payload = (
+        f"Unified diff against the version you reviewed in iteration {len(feedbacks) - 1}:\n"
+        f"{diff or '(no changes)'}\n"
+        f"Summary of your earlier feedback:\n{summarize_feedback(feedbacks)}"
+    )
+    return payload if len(payload) < len(code) else code
@@ -0,0 +1,133 @@
+"""Runtime knobs for the engineering crew, read once from the environment."""
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Undelivered events buffered per run before the oldest streamed token deltas are dropped (other events never are).
+EVENT_BUFFER_SIZE = _env_int("EVENT_BUFFER_SIZE", 1024)
+# Seconds a consumer blocks on an empty run channel before checking the run is still alive.
+EVENT_POLL_TIMEOUT = _env_float("EVENT_POLL_TIMEOUT", 0.5)
+
+# Chat streaming: pending text is flushed to the UI every STREAM_FLUSH_INTERVAL seconds
+# or once STREAM_FLUSH_BYTES characters are waiting, whichever comes first.
+STREAM_FLUSH_INTERVAL = _env_float("STREAM_FLUSH_INTERVAL", 0.05)
+STREAM_FLUSH_BYTES = _env_int("STREAM_FLUSH_BYTES", 2048)
+# When enabled, long outputs are revealed at most STREAM_FLUSH_BYTES characters per interval.
+CHAT_TYPING_EFFECT = _env_bool("CHAT_TYPING_EFFECT", True)
+
+# Opt-in on-disk cache of crew kickoff results, keyed on agent/task config, model and prompt inputs.
+KICKOFF_CACHE_ENABLED = _env_bool("KICKOFF_CACHE_ENABLED", False)
+KICKOFF_CACHE_DIR = os.getenv("KICKOFF_CACHE_DIR", ".cache/kickoff")
+KICKOFF_CACHE_MAX_ENTRIES = _env_int("KICKOFF_CACHE_MAX_ENTRIES", 2000)
+KICKOFF_CACHE_MAX_BYTES = _env_int("KICKOFF_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+# Entries not used for this many seconds are evicted (default: 7 days).
+KICKOFF_CACHE_MAX_AGE = _env_float("KICKOFF_CACHE_MAX_AGE", 7 * 24 * 3600)
+
+# "serial" builds the frontend after the backend passes review; "overlap" starts it from
+# the first backend draft and runs both review loops concurrently.
+FLOW_SCHEDULING = os.getenv("FLOW_SCHEDULING", "serial")
+
+# "thread" runs flows inside the web server process; "process" runs each slot's flows in a
+# child process that is recycled after FLOW_WORKER_MAX_TASKS runs or FLOW_WORKER_MAX_RSS_MB;
+# "async" runs all flows on one shared event loop, with at most FLOW_ASYNC_THREADS LLM calls
+# and other blocking steps in flight on its thread pool.
+FLOW_EXECUTION_MODE = os.getenv("FLOW_EXECUTION_MODE", "thread")
+FLOW_WORKER_MAX_TASKS = _env_int("FLOW_WORKER_MAX_TASKS", 20)
+FLOW_WORKER_MAX_RSS_MB = _env_int("FLOW_WORKER_MAX_RSS_MB", 2048)
+FLOW_ASYNC_THREADS = _env_int("FLOW_ASYNC_THREADS", 256)
+
+# Flow admission: at most FLOW_MAX_CONCURRENT runs execute at once, FLOW_MAX_BACKLOG may wait.
+# A running flow costs no thread of its own in async mode, so it admits far more by default.
+FLOW_MAX_CONCURRENT = _env_int("FLOW_MAX_CONCURRENT", 256 if FLOW_EXECUTION_MODE == "async" else 4)
+FLOW_MAX_BACKLOG = _env_int("FLOW_MAX_BACKLOG", 32)
+# Assumed run duration in seconds for queue ETAs until real runs have been measured.
+FLOW_ETA_DEFAULT = _env_float("FLOW_ETA_DEFAULT", 600)
+
+# Preload crewai, the crew prototypes and flow workers in the background once the server listens.
+WARMUP_ON_START = _env_bool("WARMUP_ON_START", True)
+
+# Incremental review: re-reviews get a unified diff plus a summary of earlier feedback, and
+# engineers get only the unresolved comments, instead of full code and full reviews every round.
+INCREMENTAL_REVIEW = _env_bool("INCREMENTAL_REVIEW", False)
+
+# Port of the Prometheus-text /metrics endpoint with per-step timings, tokens and cost (0 disables it).
+METRICS_PORT = _env_int("METRICS_PORT", 9464)
+
+# Forward LLM tokens to the chat while a step is still running (TaskInfo type "partial").
+STREAM_TOKENS = _env_bool("STREAM_TOKENS", True)
+
+# Global limit on crew kickoffs (LLM calls) per minute and the burst allowed on top of it (0 disables it).
+LLM_RATE_LIMIT_RPM = _env_float("LLM_RATE_LIMIT_RPM", 0)
+LLM_RATE_LIMIT_BURST = _env_int("LLM_RATE_LIMIT_BURST", 1)
+
+# Number of projects listed per page in the project explorer.
+PROJECT_PAGE_SIZE = _env_int("PROJECT_PAGE_SIZE", 20)
+
+# Disk budget of the zips/ directory holding cached project archives.
+ARCHIVE_CACHE_MAX_MB = _env_int("ARCHIVE_CACHE_MAX_MB", 512)
+
+# Generated project runs: lines kept per run in memory, how often the UI tail is refreshed (seconds),
+# and where the full logs are spilled to disk ("" keeps only the in-memory tail).
+RUN_LOG_MAX_LINES = _env_int("RUN_LOG_MAX_LINES", 500)
+RUN_LOG_FLUSH_INTERVAL = _env_float("RUN_LOG_FLUSH_INTERVAL", 0.5)
+RUN_LOG_DIR = os.getenv("RUN_LOG_DIR", ".cache/runs")
+# Disk budget of RUN_LOG_DIR: the oldest logs are deleted beyond it, and a single run stops spilling at it.
+RUN_LOG_MAX_MB = _env_int("RUN_LOG_MAX_MB", 256)
+
+# Generated project environments: where the shared venvs live (one per requirement set), how many
+# pre-warmed interpreters are kept per venv, and for how many recently used venvs.
+RUN_ENV_DIR = os.getenv("RUN_ENV_DIR", ".cache/envs")
+RUN_POOL_SIZE = _env_int("RUN_POOL_SIZE", 1)
+RUN_POOL_MAX_ENVS = _env_int("RUN_POOL_MAX_ENVS", 4)
+
+# Check generated code locally (fences, compile, backend imports, design functions) before the LLM
+# review; code that fails goes straight back to the engineer with machine-generated feedback.
+STATIC_REVIEW = _env_bool("STATIC_REVIEW", True)
+
+# Run the generated tests after write_test_cases: per-test timeout (seconds) and how many test
+# processes may run at once across all flows of this process.
+RUN_TESTS = _env_bool("RUN_TESTS", True)
+TEST_TIMEOUT = _env_float("TEST_TIMEOUT", 30)
+TEST_WORKERS = _env_int("TEST_WORKERS", os.cpu_count() or 1)
+
+# Reuse designs of earlier modules: an identical requirement reuses the design as is, one whose
+# estimated similarity reaches the threshold is given to the development lead to adapt (above 1: exact reuse only).
+DESIGN_REUSE = _env_bool("DESIGN_REUSE", True)
+DESIGN_REUSE_THRESHOLD = _env_float("DESIGN_REUSE_THRESHOLD", 0.5)
+DESIGN_INDEX_DIR = os.getenv("DESIGN_INDEX_DIR", ".cache/design_index")
+
+# Retrieval over knowledge/: every task gets the top-k chunks relevant to its inputs, within a token
+# budget ({knowledge} in tasks.yaml). The index is stored memory-mapped under KNOWLEDGE_INDEX_DIR.
+KNOWLEDGE_DIR = os.getenv("KNOWLEDGE_DIR", "knowledge")
+KNOWLEDGE_INDEX_DIR = os.getenv("KNOWLEDGE_INDEX_DIR", ".cache/knowledge")
+KNOWLEDGE_CHUNK_WORDS = _env_int("KNOWLEDGE_CHUNK_WORDS", 200)
+KNOWLEDGE_TOP_K = _env_int("KNOWLEDGE_TOP_K", 3)
+KNOWLEDGE_MAX_TOKENS = _env_int("KNOWLEDGE_MAX_TOKENS", 600)
+
+# Also enforce the JSON schema of structured answers (code reviews) as the provider's
+# response_format when litellm reports that the model supports it.
+STRUCTURED_OUTPUT_NATIVE = _env_bool("STRUCTURED_OUTPUT_NATIVE", True)
+
+# Flow log events: level (DEBUG adds the size-capped flow state to every step), "text" or
+# "json" lines, and the length at which string fields are cut.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_MAX_FIELD_CHARS = _env_int("LOG_MAX_FIELD_CHARS", 200)
+# crewai's verbose agent output: "all", "none", or a comma-separated list of agent names.
+AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "all")
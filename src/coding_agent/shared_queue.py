@@ -1,16 +1,143 @@
-import queue
-from typing import Any
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel, Field
 
+from . import settings
+
+# Event types a full channel may drop: streamed token deltas, superseded by the step's final output.
+DROPPABLE_TYPES = frozenset({"partial"})
+
+
 class TaskInfo(BaseModel):
     name: str = Field(description="Name of the task")
     type: str = Field(description="Task type. Could be markdown or code")
     output: Any = Field(description="Task output. could be any object")
 
 
-# shared task output queue. this is a singleton apparently :-).
-shared_task_output_queue: "queue.Queue[TaskInfo]" = queue.Queue()
+class RunChannel:
+    """Bounded event buffer for a single flow run.
+
+    When the consumer falls behind, the oldest undelivered droppable events (streamed
+    token deltas, which the step's final output supersedes) are dropped, so a stalled
+    UI can never block the flow that produces them. Step outputs, spans and results
+    are always delivered; they may take the buffer past `maxsize`, but there are only
+    a few per step. Events can be awaited with get_async() from any event loop;
+    producers wake those consumers through loop.call_soon_threadsafe, so waiting
+    costs no thread.
+    """
+
+    def __init__(self, run_id: str, maxsize: int):
+        self.run_id = run_id
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._events: deque[TaskInfo] = deque()
+        self._put_lock = threading.Lock()
+        self._available = threading.Condition(self._put_lock)
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def put(self, taskInfo: TaskInfo):
+        with self._put_lock:
+            if self.maxsize > 0 and len(self._events) >= self.maxsize and not self._make_room(taskInfo):
+                self.dropped += 1
+                return
+            self._events.append(taskInfo)
+            self._available.notify()
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:  # the consumer's loop is already closed
+                pass
+
+    def _make_room(self, taskInfo: TaskInfo) -> bool:
+        """Drops the oldest droppable event; False if `taskInfo` itself should be dropped instead."""
+        for index, event in enumerate(self._events):
+            if event.type in DROPPABLE_TYPES:
+                del self._events[index]
+                self.dropped += 1
+                return True
+        return taskInfo.type not in DROPPABLE_TYPES
+
+    def get(self, timeout: Optional[float] = None) -> Optional[TaskInfo]:
+        """Blocks until an event arrives, returning None if `timeout` elapses first."""
+        with self._available:
+            if not self._available.wait_for(lambda: self._events, timeout):
+                return None
+            return self._events.popleft()
+
+    async def get_async(self, timeout: Optional[float] = None) -> Optional[TaskInfo]:
+        """Awaits the next event, returning None if `timeout` elapses first."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._put_lock:
+                if self._events:
+                    return self._events.popleft()
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                if remaining is not None and remaining <= 0:
+                    return None
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                with self._put_lock:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+
+    def empty(self) -> bool:
+        with self._put_lock:
+            return not self._events
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class EventBus:
+    """Routes TaskInfo events to per-run channels keyed by the flow's run id."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._channels: Dict[str, RunChannel] = {}
+        self._lock = threading.Lock()
+        # events delivered to a channel since start (approximate under contention)
+        self.published = 0
+
+    def open(self, run_id: str) -> RunChannel:
+        with self._lock:
+            channel = self._channels.get(run_id)
+            if channel is None:
+                channel = self._channels[run_id] = RunChannel(run_id, self.maxsize)
+            return channel
+
+    def publish(self, run_id: str, taskInfo: TaskInfo) -> bool:
+        """Delivers an event to the run's channel. Events for runs nobody listens to are discarded."""
+        channel = self._channels.get(run_id)
+        if channel is None:
+            return False
+        channel.put(taskInfo)
+        self.published += 1
+        return True
+
+    def close(self, run_id: str):
+        with self._lock:
+            self._channels.pop(run_id, None)
+
+    def active_runs(self) -> list[str]:
+        with self._lock:
+            return list(self._channels)
+
+
+# process-wide bus; every run gets its own channel so concurrent flows never see each other's events.
+event_bus = EventBus(settings.EVENT_BUFFER_SIZE)
 
-def add_to_queue(taskInfo : TaskInfo):
-    shared_task_output_queue.put(taskInfo)
+def add_to_queue(taskInfo : TaskInfo, run_id: str):
+    event_bus.publish(run_id, taskInfo)
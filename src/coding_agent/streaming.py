@@ -0,0 +1,106 @@
+"""Coalescing of streamed chat text into time/size-bounded deltas, and LLM token forwarding."""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+
+class DeltaCoalescer:
+    """Buffers text and releases it in chunks on a time/size budget.
+
+    A delta is released once `flush_interval` seconds have passed since the last
+    release or `flush_bytes` characters are pending. With `typing_effect` enabled at
+    most `flush_bytes` characters are released per interval, which paces long
+    outputs like a typing animation; without it everything pending goes out at once.
+    """
+
+    def __init__(self, flush_interval: float, flush_bytes: int, typing_effect: bool):
+        self.flush_interval = flush_interval
+        self.flush_bytes = max(1, flush_bytes)
+        self.typing_effect = typing_effect
+        self._pending = ""
+        self._last_flush = time.monotonic()
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+
+    def push(self, text: str):
+        self._pending += text
+
+    def wait_time(self) -> float:
+        """Seconds until the next delta is due."""
+        if len(self._pending) >= self.flush_bytes and not self.typing_effect:
+            return 0.0
+        elapsed = time.monotonic() - self._last_flush
+        return max(0.0, self.flush_interval - elapsed)
+
+    def flush(self, force: bool = False) -> str:
+        """Returns the next delta, or an empty string if none is due yet."""
+        if not self._pending or (not force and self.wait_time() > 0):
+            return ""
+        if self.typing_effect and not force:
+            delta, self._pending = self._pending[: self.flush_bytes], self._pending[self.flush_bytes :]
+        else:
+            delta, self._pending = self._pending, ""
+        self._last_flush = time.monotonic()
+        return delta
+
+
+# Receiver of the LLM tokens streamed by the kickoff running in the current context.
+# A context variable rather than a thread-local, so it also follows asyncio.to_thread.
+_token_sink: ContextVar[Optional[Callable[[str], None]]] = ContextVar("token_sink", default=None)
+_listener_lock = threading.Lock()
+_listening = False
+
+
+def _on_stream_chunk(source, event):
+    sink = _token_sink.get()
+    if sink is not None and event.tool_call is None and event.chunk:
+        sink(event.chunk)
+
+
+def _ensure_listener():
+    """Registers the token forwarder and drops crewai's console handler for stream chunks.
+
+    crewai's console EventListener prints every chunk to stdout (whatever the agent's
+    verbosity) and keeps them all in memory, so its handler is dropped.
+    """
+    global _listening
+    with _listener_lock:
+        if not _listening:
+            from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+            from crewai.events.event_listener import EventListener
+
+            EventListener()  # registers its handlers on first use, so they exist before filtering
+            handlers = crewai_event_bus._handlers.get(LLMStreamChunkEvent, [])
+            handlers[:] = [handler for handler in handlers if handler.__module__ != EventListener.__module__]
+            crewai_event_bus.register_handler(LLMStreamChunkEvent, _on_stream_chunk)
+            _listening = True
+
+
+@contextmanager
+def stream_tokens(emit: Callable[[str], None], flush_interval: float, flush_bytes: int):
+    """Forwards the LLM tokens streamed inside this context to `emit`, coalesced into deltas.
+
+    crewai emits a stream chunk event per token on the thread that makes the LLM call,
+    so the handler finds the receiver through the context the kickoff runs in.
+    """
+    _ensure_listener()
+    coalescer = DeltaCoalescer(flush_interval, flush_bytes, typing_effect=False)
+
+    def sink(chunk: str):
+        coalescer.push(chunk)
+        delta = coalescer.flush()
+        if delta:
+            emit(delta)
+
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+        delta = coalescer.flush(force=True)
+        if delta:
+            emit(delta)
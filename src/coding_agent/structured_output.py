@@ -0,0 +1,101 @@
+"""Single-pass structured answers: the JSON schema goes into the prompt, the answer is parsed locally.
+
+With output_pydantic, crewai coerces an answer that is not plain JSON into the model
+with an extra LLM conversion call, and leaves the result None when that fails too.
+Here the task asks for JSON matching the schema (also enforced as the provider's
+response_format when the model supports it), the answer is extracted tolerantly
+(markdown fences, surrounding prose, trailing commas, Python literals) and only an
+answer that still does not validate costs a single repair call.
+"""
+import ast
+import json
+import re
+from typing import Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def schema_prompt(model: Type[BaseModel]) -> str:
+    """The model's JSON schema, compact enough to put in a task's expected output."""
+    return json.dumps(model.model_json_schema(), separators=(",", ":"))
+
+
+def supports_schema(llm) -> bool:
+    """Whether the provider of `llm` can enforce a JSON-schema response format."""
+    try:
+        from litellm.utils import supports_response_schema
+
+        return bool(supports_response_schema(model=getattr(llm, "model", str(llm))))
+    except Exception:
+        return False
+
+
+def _load(text: str) -> Optional[object]:
+    for candidate in (text, TRAILING_COMMA.sub(r"\1", text)):
+        try:
+            return json.loads(candidate, strict=False)
+        except ValueError:
+            pass
+    try:
+        return ast.literal_eval(text)  # a Python dict (single quotes, True/False/None)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def extract_json(text: str) -> Optional[dict]:
+    """The first JSON object in `text`: the whole text, a fenced block, or an object embedded in prose."""
+    text = (text or "").strip()
+    marker = text.rfind("Final Answer:")
+    if marker >= 0:
+        text = text[marker + len("Final Answer:") :].strip()
+    candidates = [text, *(match.group(1).strip() for match in FENCE.finditer(text))]
+    for candidate in candidates:
+        data = _load(candidate)
+        if isinstance(data, dict):
+            return data
+
+    decoder = json.JSONDecoder(strict=False)
+    start = text.find("{")
+    while start >= 0:
+        try:
+            data, _ = decoder.raw_decode(text, start)
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+        start = text.find("{", start + 1)
+    # an object with trailing commas or Python literals, surrounded by prose
+    data = _load(text[text.find("{") : text.rfind("}") + 1])
+    return data if isinstance(data, dict) else None
+
+
+def parse(text: str, model: Type[T]) -> Optional[T]:
+    """`text` validated as `model`, or None when no object in it does."""
+    data = extract_json(text)
+    if data is None:
+        return None
+    try:
+        return model.model_validate(data)
+    except ValidationError:
+        return None
+
+
+def repair(llm, text: str, model: Type[T], callbacks: Optional[list] = None, max_chars: int = 12000) -> Optional[T]:
+    """One direct LLM call (no agent loop) rewriting `text` as a JSON object for `model`.
+
+    `callbacks` are passed to the call, e.g. crewai's TokenCalcHandler to count its tokens.
+    """
+    messages = [
+        {
+            "role": "system",
+            "content": "Convert the user's text into a JSON object matching this JSON schema. "
+            f"Reply with the JSON object only.\n{schema_prompt(model)}",
+        },
+        {"role": "user", "content": text[-max_chars:]},
+    ]
+    return parse(llm.call(messages, callbacks=callbacks), model)
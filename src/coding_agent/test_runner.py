@@ -0,0 +1,295 @@
+"""Runs a module's generated test.py in parallel, one sandboxed process per test case.
+
+Test cases are discovered statically (unittest methods and pytest-style functions).
+Every case runs in its own process, in a temporary copy of the project's Python
+files, with a minimal environment (no API keys) and in its own process group, so
+a hanging or crashing test (e.g. one that imports app.py and launches the UI) is
+killed at its timeout without affecting the others. A process-wide pool of TEST_WORKERS slots is shared by all flows, so
+concurrent runs (batch mode) spread their tests over the cores instead of each
+starting a full set of processes.
+"""
+import ast
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from . import settings
+
+RESULT_MARKER = "@@TEST_RESULT "
+
+# Executed in the sandbox for a single case: pytest when the environment has it, else unittest or a plain call.
+# Coroutine test functions are run with asyncio.run (pytest alone would skip or fail them); an async
+# method of a TestCase that does not await it fails instead of passing unawaited.
+RUNNER = """
+import asyncio, importlib.util, inspect, io, json, sys, traceback, unittest
+file, case = sys.argv[1], sys.argv[2]
+outcome, message = "passed", ""
+# unittest's warning for a test method that returned a value, e.g. an async def it never awaited
+UNAWAITED = "error:It is deprecated to return a value that is not None from a test case:DeprecationWarning"
+try:
+    import pytest
+except ImportError:
+    pytest = None
+try:
+    if pytest is not None:
+
+        class AsyncFunctions:
+            @pytest.hookimpl(tryfirst=True)
+            def pytest_pyfunc_call(self, pyfuncitem):
+                if not inspect.iscoroutinefunction(pyfuncitem.obj):
+                    return None
+                argnames = pyfuncitem._fixtureinfo.argnames
+                asyncio.run(pyfuncitem.obj(**{name: pyfuncitem.funcargs[name] for name in argnames}))
+                return True
+
+        code = pytest.main(
+            ["-q", "-p", "no:cacheprovider", "-W", UNAWAITED, file + "::" + case.replace(".", "::")],
+            plugins=[AsyncFunctions()],
+        )
+        outcome = {0: "passed", 1: "failed", 5: "skipped"}.get(int(code), "error")
+    else:
+        spec = importlib.util.spec_from_file_location("test", file)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["test"] = module
+        spec.loader.exec_module(module)
+        if "." in case:
+            owner, name = case.split(".", 1)
+            owner = getattr(module, owner)
+            if inspect.iscoroutinefunction(getattr(owner, name)) and not issubclass(owner, unittest.IsolatedAsyncioTestCase):
+                raise TypeError(case + " is a coroutine, but " + owner.__name__ + " is not an IsolatedAsyncioTestCase")
+            stream = io.StringIO()
+            result = unittest.TextTestRunner(stream=stream, verbosity=0).run(
+                unittest.defaultTestLoader.loadTestsFromName(case, module)
+            )
+            if result.errors or result.failures:
+                outcome = "failed" if result.failures else "error"
+                message = (result.failures or result.errors)[0][1]
+            elif result.skipped:
+                outcome, message = "skipped", result.skipped[0][1]
+        else:
+            result = getattr(module, case)()
+            if inspect.iscoroutine(result):
+                asyncio.run(result)
+except AssertionError:
+    outcome, message = "failed", traceback.format_exc()
+except BaseException:
+    outcome, message = "error", traceback.format_exc()
+sys.stdout.flush()
+print("\\n@@TEST_RESULT " + json.dumps({"outcome": outcome, "message": message[-4000:]}), flush=True)
+"""
+
+# process-wide limit on concurrently running test processes, shared by every flow
+_slots = threading.BoundedSemaphore(max(1, settings.TEST_WORKERS))
+
+
+class TestCaseResult(BaseModel):
+    name: str
+    outcome: str  # "passed", "failed", "error", "skipped" or "timeout"
+    duration: float
+    message: str = ""
+    output: str = ""
+
+
+class TestReport(BaseModel):
+    module_name: str
+    total: int = 0
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0
+    skipped: int = 0
+    timeouts: int = 0
+    wall_time: float = 0.0
+    cases: list[TestCaseResult] = []
+
+    @property
+    def ok(self) -> bool:
+        return self.total > 0 and self.failed == self.errors == self.timeouts == 0
+
+
+def discover(code: str) -> list[str]:
+    """Case names in test.py: "Class.method" for TestCase-style tests, "function" for plain test functions."""
+    tree = ast.parse(code)
+    cases = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            cases.append(node.name)
+        elif isinstance(node, ast.ClassDef) and (
+            node.name.startswith("Test")
+            or any(getattr(base, "attr", getattr(base, "id", "")) == "TestCase" for base in node.bases)
+        ):
+            cases.extend(
+                f"{node.name}.{item.name}"
+                for item in node.body
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.startswith("test")
+            )
+    return cases
+
+
+def _kill_group(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _sandbox_env(sandbox: str) -> dict[str, str]:
+    """A minimal environment for generated tests: none of our variables (API keys etc.), a scratch HOME."""
+    home = Path(sandbox) / ".home"
+    home.mkdir()
+    return {
+        "PATH": os.environ.get("PATH", os.defpath),
+        "HOME": str(home),
+        "TMPDIR": str(home),
+        "PYTHONPATH": sandbox,
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "PYTHONUNBUFFERED": "1",
+        "PYTHONIOENCODING": "utf-8",
+    }
+
+
+def run_case(project_path: Path, case: str, python: str, timeout: float) -> TestCaseResult:
+    """Runs one case in a fresh copy of the project's .py files; never raises."""
+    with _slots, tempfile.TemporaryDirectory(prefix="coding-agent-test-") as sandbox:
+        for path in project_path.glob("*.py"):
+            shutil.copy2(path, sandbox)
+        env = _sandbox_env(sandbox)
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [python, "-c", RUNNER, "test.py", case],
+            cwd=sandbox,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env=env,
+            start_new_session=True,
+        )
+        try:
+            output, _ = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_group(process)
+            output, _ = process.communicate()
+            return TestCaseResult(
+                name=case,
+                outcome="timeout",
+                duration=round(time.perf_counter() - started, 3),
+                message=f"Timed out after {timeout:g}s",
+                output=output[-4000:],
+            )
+        _kill_group(process)  # anything the test left running
+        duration = round(time.perf_counter() - started, 3)
+
+    body, _, result = output.rpartition(RESULT_MARKER)
+    if not result:
+        return TestCaseResult(
+            name=case,
+            outcome="error",
+            duration=duration,
+            message=f"Test process exited with code {process.returncode}",
+            output=output[-4000:],
+        )
+    result = json.loads(result)
+    if result["outcome"] not in ("passed", "skipped") and not result["message"]:
+        result["message"] = body[-2000:]  # pytest prints the failure itself
+    return TestCaseResult(name=case, duration=duration, output=body[-4000:], **result)
+
+
+def run_tests(
+    project_path: str,
+    module_name: str,
+    python: Optional[str] = None,
+    timeout: float = 30,
+    workers: Optional[int] = None,
+) -> TestReport:
+    """Runs every case of {project_path}/test.py in parallel and summarizes the outcomes."""
+    project_path = Path(project_path)
+    started = time.perf_counter()
+    try:
+        cases = discover((project_path / "test.py").read_text(encoding="utf-8"))
+    except (OSError, SyntaxError) as e:
+        report = TestReport(module_name=module_name, total=1, errors=1)
+        report.cases = [TestCaseResult(name="test.py", outcome="error", duration=0.0, message=repr(e))]
+        return report
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or settings.TEST_WORKERS)) as pool:
+        results = list(pool.map(lambda case: run_case(project_path, case, python or sys.executable, timeout), cases))
+
+    report = TestReport(module_name=module_name, total=len(results), cases=results)
+    for result in results:
+        if result.outcome == "passed":
+            report.passed += 1
+        elif result.outcome == "failed":
+            report.failed += 1
+        elif result.outcome == "skipped":
+            report.skipped += 1
+        elif result.outcome == "timeout":
+            report.timeouts += 1
+        else:
+            report.errors += 1
+    report.wall_time = round(time.perf_counter() - started, 3)
+    return report
+
+
+def junit_xml(report: TestReport) -> str:
+    suite = ET.Element(
+        "testsuite",
+        name=report.module_name,
+        tests=str(report.total),
+        failures=str(report.failed),
+        errors=str(report.errors + report.timeouts),
+        skipped=str(report.skipped),
+        time=f"{report.wall_time:.3f}",
+    )
+    for case in report.cases:
+        classname, _, name = case.name.rpartition(".")
+        element = ET.SubElement(
+            suite, "testcase", classname=classname or "test", name=name, time=f"{case.duration:.3f}"
+        )
+        if case.outcome == "failed":
+            ET.SubElement(element, "failure", message=case.message.strip().splitlines()[-1] if case.message.strip() else "").text = case.message
+        elif case.outcome in ("error", "timeout"):
+            ET.SubElement(element, "error", message=case.outcome).text = case.message
+        elif case.outcome == "skipped":
+            ET.SubElement(element, "skipped", message=case.message)
+        if case.output:
+            ET.SubElement(element, "system-out").text = case.output
+    return ET.tostring(suite, encoding="unicode")
+
+
+def write_report(report: TestReport, directory: str) -> tuple[Path, Path]:
+    """Writes test_report.json and the JUnit test_report.xml next to the module's code."""
+    directory = Path(directory)
+    json_path, xml_path = directory / "test_report.json", directory / "test_report.xml"
+    json_path.write_text(report.model_dump_json(indent=2), encoding="utf-8")
+    xml_path.write_text(junit_xml(report), encoding="utf-8")
+    return json_path, xml_path
+
+
+def report_markdown(report: TestReport) -> str:
+    icons = {"passed": "✅", "failed": "❌", "error": "💥", "skipped": "⏭️", "timeout": "⏱️"}
+    lines = [
+        f"{report.passed}/{report.total} passed, {report.failed} failed, {report.errors} errors, "
+        f"{report.timeouts} timed out, {report.skipped} skipped in {report.wall_time:.1f}s",
+        "",
+        "| Test | Result | Time (s) |",
+        "|---|---|---:|",
+    ]
+    lines.extend(f"| {case.name} | {icons.get(case.outcome, '')} {case.outcome} | {case.duration:.2f} |" for case in report.cases)
+    failures = [case for case in report.cases if case.outcome in ("failed", "error", "timeout") and case.message]
+    for case in failures[:3]:
+        lines.extend(["", f"**{case.name}**", "```", case.message.strip()[-1500:], "```"])
+    return "\n".join(lines)
@@ -0,0 +1,52 @@
+"""Startup timing marks and background warm-up of the flow's heavy imports."""
+import threading
+import time
+from typing import Optional
+
+from .flow_log import flow_log
+
+# Process start reference; app.py overrides it with a timestamp taken before its own imports.
+PROCESS_STARTED_AT = time.perf_counter()
+
+
+class StartupTimer:
+    """Records the first occurrence of named startup milestones, in seconds since process start."""
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.marks: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> Optional[float]:
+        with self._lock:
+            if name in self.marks:
+                return None
+            elapsed = self.marks[name] = round(time.perf_counter() - self.started_at, 3)
+        flow_log.info("startup_mark", mark=name, seconds_since_start=elapsed)
+        return elapsed
+
+    def report(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self.marks)
+
+
+startup_timer = StartupTimer(PROCESS_STARTED_AT)
+
+
+def warm_up():
+    """Imports crewai and friends and builds the crew prototypes ahead of the first run."""
+    started = time.perf_counter()
+    from .crew_registry import crew_registry
+    from .executor import flow_executor
+    from . import main  # noqa: F401
+
+    crew_registry.preload()
+    flow_executor.prestart()
+    startup_timer.mark("warm_up_done")
+    flow_log.info("warm_up_done", seconds=round(time.perf_counter() - started, 3))
+
+
+def start_warm_up() -> threading.Thread:
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
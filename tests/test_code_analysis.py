@@ -0,0 +1,109 @@
+import textwrap
+
+from coding_agent.code_analysis import (
+    design_names,
+    public_interface,
+    static_review_backend,
+    static_review_frontend,
+    strip_code_fences,
+)
+
+DESIGN = textwrap.dedent(
+    """
+    # Design for accounts
+
+    ## Backend (backend.py)
+
+    - `class Account` holding the balance
+    - `def deposit(self, amount)` adds to the balance
+    - `def withdraw(self, amount)` fails when the balance is too low
+
+    ### Helpers
+
+    def get_share_price(symbol) returns a fixed test price
+
+    ## Frontend (app.py)
+
+    def create_ui() builds the Gradio Blocks
+
+    ## Tests
+
+    def test_deposit()
+    """
+)
+
+BACKEND = textwrap.dedent(
+    """
+    class Account:
+        def __init__(self):
+            self.balance = 0
+
+        def deposit(self, amount):
+            self.balance += amount
+
+        def _audit(self):
+            pass
+
+
+    def get_share_price(symbol):
+        return 1.0
+    """
+)
+
+
+def test_design_names_only_come_from_the_backend_section():
+    assert design_names(DESIGN) == ["Account", "deposit", "withdraw", "get_share_price"]
+
+
+def test_design_names_ignore_headings_and_prose():
+    design = "# Backend (backend.py)\n\nThe class keeps a list of trades; we define things in backend.py.\n"
+    assert design_names(design) == []
+    assert design_names(None) == []
+
+
+def test_design_without_backend_heading_excludes_frontend_sections():
+    design = "def add(a, b)\n\n## UI\n\ndef create_ui()\n\n## Storage\n\nclass Store\n"
+    assert design_names(design) == ["add", "Store"]
+
+
+def test_static_review_backend_reports_missing_design_names():
+    assert static_review_backend(BACKEND, DESIGN) == [
+        "Functions or classes from the design are not implemented: `withdraw`"
+    ]
+    assert static_review_backend(BACKEND + "\ndef withdraw(self, amount): pass\n", DESIGN) == []
+
+
+def test_static_review_backend_reports_compile_errors():
+    [problem] = static_review_backend("def f(:\n    pass\n")
+    assert problem.startswith("`backend.py` does not compile")
+    assert static_review_backend("return 1\n")[0].startswith("`backend.py` does not compile")
+    assert static_review_backend("") == ["`backend.py` is empty."]
+
+
+def test_static_review_frontend_checks_backend_imports():
+    assert static_review_frontend("from backend import Account\n", BACKEND, "accounts") == []
+    [problem] = static_review_frontend("from backend import Account, Portfolio\n", BACKEND, "accounts")
+    assert "`Portfolio`" in problem
+    problems = static_review_frontend("from accounts import Account\n", BACKEND, "accounts")
+    assert "the backend module is named `backend`" in problems[0]
+    assert "never imports the `backend` module" in problems[-1]
+
+
+def test_public_interface_ignores_private_members_and_bodies():
+    assert public_interface(BACKEND) == "\n".join(
+        [
+            "class Account:",
+            "    def __init__(self)",
+            "    def deposit(self, amount)",
+            "def get_share_price(symbol)",
+        ]
+    )
+    assert public_interface(BACKEND.replace("return 1.0", "return 2.0")) == public_interface(BACKEND)
+    assert public_interface("def broken(:") == "def broken(:"
+
+
+def test_strip_code_fences_keeps_python_blocks():
+    text = "Here is the code:\n```python\nx = 1\n```\nand the config:\n```yaml\na: 1\n```\n```\ny = 2\n```\n"
+    assert strip_code_fences(text) == "x = 1\n\ny = 2\n"
+    assert strip_code_fences("x = 1\n") == "x = 1\n"
+    assert strip_code_fences("```python\nx = 1\n") == "x = 1\n"
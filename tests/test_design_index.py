@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from coding_agent.design_index import DesignIndex, requirement_hash, shingles
+
+ACCOUNTS = "A simple account management system for a trading simulation platform with deposits and withdrawals"
+ACCOUNTS_SIMILAR = "A simple account management system for a trading simulation platform with deposits, withdrawals and reports"
+TODO = "A todo list application where users add, complete and delete tasks"
+
+
+@pytest.fixture
+def index(tmp_path):
+    return DesignIndex(root=str(tmp_path / "output"), directory=str(tmp_path / "index"))
+
+
+def write_design(index: DesignIndex, module_name: str, design: str):
+    path = index.root / module_name / "design.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(design, encoding="utf-8")
+
+
+def jaccard(a: str, b: str) -> float:
+    sa, sb = set(shingles(a).tolist()), set(shingles(b).tolist())
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_requirement_hash_ignores_case_and_punctuation():
+    assert requirement_hash("Build a  Calculator!") == requirement_hash("build a calculator")
+    assert requirement_hash("build a calculator") != requirement_hash("build a clock")
+
+
+def test_agreement_matches_a_plain_count(index):
+    rng = np.random.default_rng(0)
+    index._signatures = rng.integers(0, 4, (50, index.num_perm), dtype=np.uint16)
+    query = index._signatures[7].copy()
+    assert index._agreement(query).tolist() == (index._signatures == query).sum(axis=1).tolist()
+    assert index._agreement(query)[7] == index.num_perm
+
+
+def test_signature_estimates_jaccard_similarity(index):
+    estimate = (index.signature(ACCOUNTS) == index.signature(ACCOUNTS_SIMILAR)).mean()
+    assert abs(estimate - jaccard(ACCOUNTS, ACCOUNTS_SIMILAR)) < 0.15
+    assert (index.signature(ACCOUNTS) == index.signature(TODO)).mean() < 0.2
+
+
+def test_lookup_finds_exact_and_similar_requirements(index):
+    write_design(index, "accounts", "# accounts design")
+    write_design(index, "todo", "# todo design")
+    index.add("accounts", ACCOUNTS)
+    index.add("todo", TODO)
+
+    exact = index.lookup(ACCOUNTS.upper(), threshold=0.9)
+    assert (exact.module_name, exact.exact, exact.design) == ("accounts", True, "# accounts design")
+
+    similar = index.lookup(ACCOUNTS_SIMILAR, threshold=0.5)
+    assert (similar.module_name, similar.exact) == ("accounts", False)
+    assert index.lookup(ACCOUNTS_SIMILAR, threshold=0.99) is None
+    assert index.lookup("an unrelated weather dashboard", threshold=0.5) is None
+
+
+def test_lookup_skips_modules_without_design_and_superseded_entries(index):
+    index.add("accounts", ACCOUNTS)
+    assert index.lookup(ACCOUNTS, threshold=0.5) is None  # no design.md
+
+    write_design(index, "accounts", "# accounts design")
+    index.add("accounts", TODO)  # the module was regenerated for another requirement
+    assert index.lookup(ACCOUNTS, threshold=0.5) is None
+    assert index.lookup(TODO, threshold=0.5).module_name == "accounts"
+
+
+def test_entries_added_by_another_process_are_picked_up(index, tmp_path):
+    write_design(index, "todo", "# todo design")
+    assert index.lookup(TODO, threshold=0.5) is None
+    other = DesignIndex(root=str(index.root), directory=str(tmp_path / "index"))
+    other.add("todo", TODO)
+    assert index.lookup(TODO, threshold=0.5).module_name == "todo"
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from coding_agent import main
+from coding_agent.crew import ReviewVerdict
+from coding_agent.kickoff_cache import KickoffCache, KickoffResult
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return KickoffCache(str(tmp_path / "cache"), max_entries=3, max_bytes=1024 * 1024, max_age=3600)
+
+
+def test_key_ignores_inputs_outside_the_prompt(cache):
+    inputs = {"requirement": "a calculator", "module_name": "calc"}
+    key = cache.key("development_lead", "design_task", "gpt-4o-mini", inputs)
+    assert key == cache.key("development_lead", "design_task", "gpt-4o-mini", {**inputs, "id": "run-2"})
+    assert key != cache.key("development_lead", "design_task", "gpt-4o-mini", {**inputs, "requirement": "a clock"})
+    assert key != cache.key("development_lead", "design_task", "gpt-4o", inputs)
+
+
+def test_round_trip_validates_structured_answer(cache):
+    verdict = ReviewVerdict(review_comments_markdown="- ok", passed_review=True)
+    cache.put("k", KickoffResult(raw=verdict.model_dump_json(), pydantic=verdict))
+
+    cached = cache.get("k", ReviewVerdict)
+    assert cached.cached
+    assert cached.pydantic == verdict
+    assert cache.stats() == {"hits": 1, "misses": 0, "evictions": 0}
+
+
+def test_entry_that_no_longer_validates_is_a_miss(cache):
+    cache.put("k", KickoffResult(raw="{}", pydantic={"unexpected": 1}))
+    assert cache.get("k", ReviewVerdict) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used(cache):
+    for key in "abc":
+        cache.put(key, KickoffResult(raw=key))
+    cache.get("a")  # a is now more recently used than b
+    cache.put("d", KickoffResult(raw="d"))
+    assert cache.get("b") is None
+    assert [cache.get(key).raw for key in "acd"] == ["a", "c", "d"]
+
+
+def test_cached_review_hit_writes_output_file(cache, tmp_path, monkeypatch):
+    # review tasks have no output_pydantic; the verdict model comes from the caller
+    monkeypatch.setattr(main, "kickoff_cache", cache)
+    task = SimpleNamespace(output_pydantic=None, output_file=str(tmp_path / "{module_name}" / "review_{iteration}.json"))
+    inputs = {"module_name": "calc", "iteration": 0, "backend_code": "def add(a, b): return a + b"}
+    verdict = ReviewVerdict(review_comments_markdown="- fine", passed_review=True)
+    key = cache.key("code_reviewer", "code_review_task", "gpt-4o-mini", inputs)
+    cache.put(key, KickoffResult(raw=verdict.model_dump_json(), pydantic=verdict))
+
+    cache_key, cached = main.EngineeringFlow._cached_result(
+        None, "code_reviewer", "code_review_task", task, "gpt-4o-mini", inputs, ReviewVerdict
+    )
+    assert cache_key == key
+    assert cached.pydantic == verdict
+    assert ReviewVerdict.model_validate_json((tmp_path / "calc" / "review_0.json").read_text()) == verdict
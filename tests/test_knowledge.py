@@ -0,0 +1,61 @@
+import pytest
+
+from coding_agent.knowledge import KnowledgeBase, chunk_text
+
+STANDARDS = "Coding standards.\n\nAlways use type hints on public functions.\n\nPrefer dataclasses for records."
+GRADIO = "Gradio notes.\n\nBuild the UI with gr.Blocks and launch it with share disabled."
+
+
+@pytest.fixture
+def knowledge(tmp_path):
+    root = tmp_path / "knowledge"
+    root.mkdir()
+    (root / "standards.md").write_text(STANDARDS, encoding="utf-8")
+    (root / "gradio.txt").write_text(GRADIO, encoding="utf-8")
+    (root / "logo.png").write_bytes(b"\x89PNG")
+    return KnowledgeBase(str(root), str(tmp_path / "index"), chunk_words=20, refresh_interval=0)
+
+
+def test_chunk_text_packs_paragraphs_up_to_the_limit():
+    text = "one two three\n\nfour five\n\nsix seven eight nine"
+    assert chunk_text(text, 5) == ["one two three\n\nfour five", "six seven eight nine"]
+
+
+def test_chunk_text_splits_long_paragraphs():
+    words = " ".join(f"w{i}" for i in range(12))
+    chunks = chunk_text(f"intro\n\n{words}\n\noutro", 5)
+    assert chunks == ["intro", "w0 w1 w2 w3 w4", "w5 w6 w7 w8 w9", "w10 w11\n\noutro"]
+    assert all(len(chunk.split()) <= 5 for chunk in chunks)
+    assert chunk_text("  \n\n ", 5) == []
+
+
+def test_search_ranks_the_relevant_file_first(knowledge):
+    results = knowledge.search("how do I launch the gradio blocks ui", k=2)
+    assert results[0][1] == "gradio.txt"
+    assert knowledge.search("type hints for public functions", k=1)[0][1] == "standards.md"
+    assert knowledge.search("zzz qqq", k=3) == []
+
+
+def test_refresh_picks_up_changed_and_removed_files(knowledge):
+    assert knowledge.search("dataclasses", k=1)
+    (knowledge.root / "standards.md").write_text("Use pydantic models for records.", encoding="utf-8")
+    assert knowledge.search("dataclasses", k=1) == []
+    assert knowledge.search("pydantic", k=1)[0][1] == "standards.md"
+    (knowledge.root / "gradio.txt").unlink()
+    assert knowledge.search("gradio blocks", k=1) == []
+
+
+def test_index_on_disk_is_reused(knowledge):
+    knowledge.search("gradio", k=1)
+    manifest = knowledge.directory / "manifest.json"
+    built_at = manifest.stat().st_mtime_ns
+    other = KnowledgeBase(str(knowledge.root), str(knowledge.directory), chunk_words=20)
+    assert other.search("gradio", k=1)[0][1] == "gradio.txt"
+    assert manifest.stat().st_mtime_ns == built_at
+
+
+def test_context_respects_the_token_budget(knowledge):
+    context = knowledge.context("gradio blocks type hints", k=3, max_tokens=1000)
+    assert context.startswith("[")
+    assert "[gradio.txt]" in context and "[standards.md]" in context
+    assert len(knowledge.context("gradio blocks type hints", k=3, max_tokens=10)) <= 40
@@ -0,0 +1,30 @@
+from coding_agent.metrics import MetricsRegistry, Span
+
+
+def span(**fields) -> Span:
+    defaults = {"run_id": "run", "module_name": "calc", "step": "design_task", "agent": "development_lead"}
+    return Span(**{**defaults, "model": "gpt-4o-mini", "started_at": 0.0, **fields})
+
+
+def type_lines(text: str) -> list[str]:
+    return [line for line in text.splitlines() if line.startswith("# TYPE")]
+
+
+def test_render_declares_each_metric_once():
+    registry = MetricsRegistry(buckets=(1.0, 5.0))
+    registry.observe(span(wall_time=0.5, prompt_tokens=10, completion_tokens=5))
+    registry.observe(span(step="code_review_task", wall_time=3.0))
+    text = registry.render()
+    assert len(type_lines(text)) == len(set(type_lines(text)))
+    assert 'coding_agent_step_runs_total{step="design_task",model="gpt-4o-mini"} 1' in text
+    assert 'coding_agent_step_duration_seconds_bucket{step="code_review_task",le="1.0"} 0' in text
+    assert 'coding_agent_step_duration_seconds_bucket{step="code_review_task",le="5.0"} 1' in text
+
+
+def test_counter_sources_with_the_same_name_are_merged():
+    registry = MetricsRegistry()
+    registry.add_counter_source(lambda: {"coding_agent_kickoff_cache_hits_total": 2})
+    registry.add_counter_source(lambda: {"coding_agent_kickoff_cache_hits_total": 3})
+    text = registry.render()
+    assert type_lines(text) == ["# TYPE coding_agent_kickoff_cache_hits_total counter"]
+    assert "coding_agent_kickoff_cache_hits_total 5" in text.splitlines()
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from coding_agent.rate_limit import RateLimiter
+
+
+def test_zero_rate_never_waits():
+    limiter = RateLimiter(0)
+    assert all(limiter.acquire() == 0.0 for _ in range(100))
+
+
+def test_burst_is_free_then_calls_are_spaced():
+    limiter = RateLimiter(per_minute=600, burst=3)  # one token every 0.1s
+    assert max(limiter.acquire() for _ in range(3)) < 0.01
+    waited = limiter.acquire()
+    assert 0.05 < waited < 0.5
+
+
+def test_bucket_does_not_grow_past_burst():
+    limiter = RateLimiter(per_minute=6000, burst=2)  # refills within 20ms
+    time.sleep(0.1)
+    assert limiter._reserve() == 0.0
+    assert limiter._reserve() == 0.0
+    assert limiter._reserve() > 0
+
+
+def test_async_waiters_share_the_budget():
+    limiter = RateLimiter(per_minute=1200, burst=1)  # one token every 0.05s
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(5)))
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.15
+
+
+def test_configure_resets_the_bucket():
+    limiter = RateLimiter(per_minute=1, burst=1)
+    limiter.acquire()
+    limiter.configure(per_minute=60000, burst=5)
+    assert max(limiter.acquire() for _ in range(5)) < 0.01
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+from coding_agent.shared_queue import EventBus, RunChannel, TaskInfo
+
+
+def event(name: str, type: str = "markdown") -> TaskInfo:
+    return TaskInfo(name=name, type=type, output=name)
+
+
+def drain(channel: RunChannel) -> list[str]:
+    names = []
+    while not channel.empty():
+        names.append(channel.get(timeout=0).name)
+    return names
+
+
+def test_full_channel_drops_oldest_partial_first():
+    channel = RunChannel("run", maxsize=3)
+    channel.put(event("step-1"))
+    channel.put(event("token-1", "partial"))
+    channel.put(event("token-2", "partial"))
+    channel.put(event("span-1", "span"))
+    assert drain(channel) == ["step-1", "token-2", "span-1"]
+    assert channel.dropped == 1
+
+
+def test_step_events_are_never_dropped():
+    channel = RunChannel("run", maxsize=2)
+    for index in range(5):
+        channel.put(event(f"step-{index}"))
+    channel.put(event("token", "partial"))  # nothing droppable to make room for it
+    assert drain(channel) == [f"step-{index}" for index in range(5)]
+    assert channel.dropped == 1
+
+
+def test_get_times_out_and_wakes_on_put():
+    channel = RunChannel("run", maxsize=10)
+    assert channel.get(timeout=0.01) is None
+    threading.Timer(0.05, channel.put, [event("late")]).start()
+    assert channel.get(timeout=5).name == "late"
+
+
+def test_get_async_is_woken_from_another_thread():
+    channel = RunChannel("run", maxsize=10)
+
+    async def consume():
+        assert await channel.get_async(timeout=0.01) is None
+        threading.Timer(0.05, channel.put, [event("from-thread")]).start()
+        return await channel.get_async(timeout=5)
+
+    assert asyncio.run(consume()).name == "from-thread"
+
+
+def test_bus_discards_events_of_closed_runs():
+    bus = EventBus(maxsize=10)
+    channel = bus.open("a")
+    assert bus.publish("a", event("x"))
+    assert not bus.publish("b", event("y"))
+    bus.close("a")
+    assert not bus.publish("a", event("z"))
+    assert drain(channel) == ["x"]
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from coding_agent.crew import ReviewVerdict
+from coding_agent.structured_output import extract_json, parse, repair, schema_prompt
+
+VERDICT = {"review_comments_markdown": "- add input validation", "passed_review": False}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        json.dumps(VERDICT),
+        f"```json\n{json.dumps(VERDICT)}\n```",
+        f"Thought: done.\nFinal Answer: {json.dumps(VERDICT)}",
+        f"Here is my review:\n{json.dumps(VERDICT)}\nThanks!",
+        '{"review_comments_markdown": "- add input validation", "passed_review": false,}',
+        "{'review_comments_markdown': '- add input validation', 'passed_review': False}",
+        'Verdict: {"review_comments_markdown": "- add input validation", "passed_review": False,} end',
+    ],
+)
+def test_extract_json_tolerates_llm_formatting(text):
+    assert extract_json(text) == VERDICT
+
+
+def test_extract_json_skips_braces_that_are_not_objects():
+    assert extract_json('Use {x} in the template. {"passed_review": true}') == {"passed_review": True}
+    assert extract_json("no json here") is None
+    assert extract_json("") is None
+    assert extract_json("[1, 2]") is None
+
+
+def test_extract_json_is_linear_on_unbalanced_braces():
+    assert extract_json("{" * 20000) is None
+
+
+def test_parse_validates_against_the_model():
+    verdict = parse(json.dumps({**VERDICT, "open_items": ["add input validation"]}), ReviewVerdict)
+    assert verdict == ReviewVerdict(**VERDICT, open_items=["add input validation"])
+    assert parse('{"passed_review": "maybe"}', ReviewVerdict) is None
+
+
+def test_schema_prompt_is_compact_json():
+    schema = json.loads(schema_prompt(ReviewVerdict))
+    assert set(schema["required"]) == {"review_comments_markdown", "passed_review"}
+    assert "\n" not in schema_prompt(ReviewVerdict)
+
+
+def test_repair_makes_one_call_with_the_schema():
+    calls = []
+
+    class FakeLLM:
+        def call(self, messages, callbacks=None):
+            calls.append(messages)
+            return json.dumps(VERDICT)
+
+    assert repair(FakeLLM(), "The code fails review: add input validation.", ReviewVerdict) == ReviewVerdict(**VERDICT)
+    assert len(calls) == 1
+    assert schema_prompt(ReviewVerdict) in calls[0][0]["content"]
@@ -0,0 +1,83 @@
+import sys
+import textwrap
+
+import pytest
+
+from coding_agent import test_runner
+
+TESTS = textwrap.dedent(
+    """
+    import os
+    import unittest
+
+
+    def test_sync():
+        assert 1 + 1 == 2
+
+
+    async def test_async_fails():
+        assert False, "awaited"
+
+
+    async def test_async_passes():
+        assert True
+
+
+    def test_no_secrets():
+        assert "OPENAI_API_KEY" not in os.environ
+
+
+    class TestCalc(unittest.TestCase):
+        def test_add(self):
+            self.assertEqual(1 + 2, 3)
+
+        async def test_never_awaited(self):
+            self.fail("awaited")
+    """
+)
+
+
+@pytest.fixture(params=["pytest", "unittest"])
+def project(request, tmp_path):
+    (tmp_path / "test.py").write_text(TESTS, encoding="utf-8")
+    if request.param == "unittest":
+        # shadows the installed pytest inside the sandbox, so the runner falls back to unittest
+        (tmp_path / "pytest.py").write_text("raise ImportError('hidden')\n", encoding="utf-8")
+    return tmp_path
+
+
+def run(project, case):
+    return test_runner.run_case(project, case, sys.executable, timeout=60).outcome
+
+
+def test_discover():
+    assert test_runner.discover(TESTS) == [
+        "test_sync",
+        "test_async_fails",
+        "test_async_passes",
+        "test_no_secrets",
+        "TestCalc.test_add",
+        "TestCalc.test_never_awaited",
+    ]
+
+
+def test_async_functions_are_awaited(project):
+    assert run(project, "test_sync") == "passed"
+    assert run(project, "test_async_passes") == "passed"
+    assert run(project, "test_async_fails") == "failed"
+
+
+def test_unawaited_async_method_does_not_pass(project):
+    assert run(project, "TestCalc.test_add") == "passed"
+    assert run(project, "TestCalc.test_never_awaited") != "passed"
+
+
+def test_sandbox_gets_no_secrets(project, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "secret")
+    assert run(project, "test_no_secrets") == "passed"
+
+
+def test_report_counts_outcomes(project):
+    report = test_runner.run_tests(str(project), "calc", sys.executable, 60)
+    assert (report.total, report.passed) == (6, 4)
+    assert not report.ok